@@ -2,142 +2,510 @@
 Cache Manager for LLM Responses
 ================================
 Provides intelligent caching with:
-- Hash-based keys (text + prompt version)
+- Content-addressed keys (exact prompt input + prompt version)
+- Secondary index by (resolved page title, revision id), so an unchanged
+  page is never re-extracted even if the windowing of its text changes
+- Fallback to the legacy keys (first 5000 chars of the raw page text)
 - Automatic invalidation on prompt change
-- Statistics and hit rate tracking
+- Negative entries (no usable LLM answer) expire after NEGATIVE_CACHE_TTL
+- Statistics and hit rate tracking, per tier (memory / disk) with lookup times
+- Bounded in-memory LRU tier (size + TTL) in front of the disk tier
+- Pluggable storage: single SQLite file (default) or one JSON file per entry
 """
 
 import hashlib
 import json
 import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, Tuple
 
 # Cache configuration
 CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
 PROMPT_VERSION = "v2.0-fewshot-cot"  # Increment when prompt changes significantly
+CACHE_BACKEND = "sqlite"  # "sqlite" (single file) or "json" (legacy: one file per entry)
+SQLITE_FILENAME = "llm_cache.sqlite3"
+MEMORY_CACHE_SIZE = 2048  # Entries kept in the in-process LRU tier (0 disables it)
+MEMORY_CACHE_TTL = 3600   # Seconds before a memory entry is re-read from disk (None = no expiry)
+NEGATIVE_CACHE_TTL = 6 * 3600  # Seconds an unusable extraction (no valid LLM answer) stays cached
+
+
+class MemoryTier:
+    """Thread-safe LRU of recently read/written entries, bounded by size and age."""
+    
+    def __init__(self, max_size: int = MEMORY_CACHE_SIZE, ttl: Optional[float] = MEMORY_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (stored_at, entry)
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            stored_at, entry = item
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+    
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class JsonDirBackend:
+    """Legacy storage: one pretty-printed JSON file per entry in the cache directory."""
+    
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+    
+    def _get_cache_path(self, key: str) -> str:
+        """Get the file path for a cache entry."""
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def _get_revision_path(self, title: str, revision_id: int, version: str) -> str:
+        digest = hashlib.sha256(f"{title}|{revision_id}|{version}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"rev-{digest}.rev")
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        cache_path = self._get_cache_path(key)
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return None
+    
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        # Write to a temp file then rename, so readers never see a half-written entry
+        cache_path = self._get_cache_path(key)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+        
+        # Secondary index: one tiny file (title, revision, version) -> key
+        if entry.get("page_title") and entry.get("revision_id") is not None:
+            revision_path = self._get_revision_path(entry["page_title"], entry["revision_id"], entry.get("prompt_version"))
+            with open(f"{revision_path}.tmp", 'w', encoding='utf-8') as f:
+                f.write(key)
+            os.replace(f"{revision_path}.tmp", revision_path)
+    
+    def get_by_revision(self, title: str, revision_id: int, version: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._get_revision_path(title, revision_id, version), 'r', encoding='utf-8') as f:
+                return self.get(f.read().strip())
+        except IOError:
+            return None
+    
+    def iter_entries(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.json'):
+                entry = self.get(filename[:-len('.json')])
+                if entry is not None:
+                    yield filename[:-len('.json')], entry
+    
+    def count(self) -> int:
+        try:
+            return len([f for f in os.listdir(self.cache_dir) if f.endswith('.json')])
+        except OSError:
+            return 0
+    
+    def count_by_version(self) -> Dict[str, int]:
+        counts = {}
+        for _, entry in self.iter_entries():
+            version = entry.get("prompt_version")
+            counts[version] = counts.get(version, 0) + 1
+        return counts
+    
+    def delete_version(self, version: str) -> int:
+        count = 0
+        for key, entry in list(self.iter_entries()):
+            if entry.get("prompt_version") == version:
+                try:
+                    os.remove(self._get_cache_path(key))
+                    count += 1
+                except OSError:
+                    pass
+        return count
+    
+    def clear(self) -> int:
+        count = 0
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(('.json', '.rev')):
+                try:
+                    os.remove(os.path.join(self.cache_dir, filename))
+                    count += filename.endswith('.json')
+                except OSError:
+                    pass
+        return count
+    
+    def compact(self) -> None:
+        """Nothing to compact: each entry is its own file."""
+
+
+class SqliteBackend:
+    """
+    All entries in one SQLite file: O(1) lookups by key, indexed counts by
+    prompt version, atomic writes (WAL journal) and compaction via VACUUM.
+    """
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.created = not os.path.exists(db_path)
+        # One connection shared by the crawler threads, serialised by a lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    scientist_name TEXT,
+                    prompt_version TEXT,
+                    timestamp TEXT,
+                    entry TEXT NOT NULL,
+                    page_title TEXT,
+                    revision_id INTEGER
+                )
+            """)
+            # Databases created before the revision index
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+            for column, kind in (("page_title", "TEXT"), ("revision_id", "INTEGER")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE entries ADD COLUMN {column} {kind}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_version ON entries(prompt_version)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_revision ON entries(page_title, revision_id, prompt_version)")
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT entry FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0])
+        except json.JSONDecodeError:
+            return None
+    
+    def get_by_revision(self, title: str, revision_id: int, version: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT entry FROM entries WHERE page_title = ? AND revision_id = ? AND prompt_version = ? "
+                "ORDER BY timestamp DESC LIMIT 1",
+                (title, revision_id, version),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        self.put_many([(key, entry)])
+    
+    def put_many(self, items) -> None:
+        rows = [
+            (key, entry.get("scientist_name"), entry.get("prompt_version"), entry.get("timestamp"),
+             json.dumps(entry, ensure_ascii=False), entry.get("page_title"), entry.get("revision_id"))
+            for key, entry in items
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, scientist_name, prompt_version, timestamp, entry, page_title, revision_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+    
+    def iter_entries(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, entry FROM entries").fetchall()
+        for key, entry in rows:
+            yield key, json.loads(entry)
+    
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    
+    def count_by_version(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT prompt_version, COUNT(*) FROM entries GROUP BY prompt_version").fetchall()
+        return dict(rows)
+    
+    def delete_version(self, version: str) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM entries WHERE prompt_version = ?", (version,)).rowcount
+    
+    def clear(self) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM entries").rowcount
+    
+    def compact(self) -> None:
+        """Reclaim the space of deleted/overwritten entries."""
+        with self._lock:
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def migrate_json_dir(cache_dir: str, backend: SqliteBackend) -> int:
+    """Import every legacy `cache_dir/*.json` entry into `backend`. Returns the number imported."""
+    legacy = JsonDirBackend(cache_dir)
+    batch = []
+    count = 0
+    for key, entry in legacy.iter_entries():
+        # Skip files that are not LLM cache entries
+        if "result" not in entry:
+            continue
+        batch.append((key, entry))
+        if len(batch) >= 500:
+            backend.put_many(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        backend.put_many(batch)
+        count += len(batch)
+    return count
+
 
 class CacheManager:
     """Manages caching of LLM extraction results."""
     
-    def __init__(self, cache_dir: str = CACHE_DIR, prompt_version: str = PROMPT_VERSION):
+    def __init__(self, cache_dir: str = CACHE_DIR, prompt_version: str = PROMPT_VERSION, backend: str = CACHE_BACKEND,
+                 memory_size: int = MEMORY_CACHE_SIZE, memory_ttl: Optional[float] = MEMORY_CACHE_TTL):
         self.cache_dir = cache_dir
         self.prompt_version = prompt_version
-        self.stats = {"hits": 0, "misses": 0}
+        self.memory = MemoryTier(memory_size, memory_ttl)
+        # Counters are updated by the crawl workers, the prefetch pool and the batcher at once
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
         
         # Ensure cache directory exists
         os.makedirs(self.cache_dir, exist_ok=True)
         
+        if backend == "sqlite":
+            self.backend = SqliteBackend(os.path.join(self.cache_dir, SQLITE_FILENAME))
+            # First run on SQLite: one-shot import of the legacy JSON entries
+            if self.backend.created:
+                imported = migrate_json_dir(self.cache_dir, self.backend)
+                if imported:
+                    print(f"📦 Cache: imported {imported} JSON entries into {SQLITE_FILENAME}")
+        else:
+            self.backend = JsonDirBackend(self.cache_dir)
+    
+    def _reset_stats(self) -> None:
+        with self._stats_lock:
+            self.stats = {"hits": 0, "misses": 0, "revision_hits": 0, "legacy_hits": 0}
+            # Per tier: lookups answered / not answered and cumulated lookup time
+            self.tier_stats = {tier: {"hits": 0, "misses": 0, "seconds": 0.0} for tier in ("memory", "disk")}
+    
+    def _timed_lookup(self, tier: str, lookup, *args) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        entry = lookup(*args)
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            stats = self.tier_stats[tier]
+            stats["seconds"] += elapsed
+            stats["hits" if entry is not None else "misses"] += 1
+        return entry
+    
+    def _lookup(self, memory_key: str, disk_lookup, *args) -> Optional[Dict[str, Any]]:
+        """Memory tier first, then the disk backend (whose answer is kept in memory)."""
+        entry = self._timed_lookup("memory", self.memory.get, memory_key)
+        if entry is None:
+            entry = self._timed_lookup("disk", disk_lookup, *args)
+            if entry is not None:
+                self.memory.put(memory_key, entry)
+        return entry
+    
+    @staticmethod
+    def _revision_memory_key(page_title: str, revision_id: int) -> str:
+        return f"rev|{page_title}|{revision_id}"
+        
     def _generate_key(self, text: str, scientist_name: str) -> str:
-        """Generate a unique cache key based on text content and prompt version."""
-        # Use first 5000 chars of text to speed up hashing while maintaining uniqueness
+        """Content-addressed key: the exact text sent to the model, the name and the prompt version."""
+        content = f"{scientist_name}|{self.prompt_version}|{text}"
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    
+    def _legacy_key(self, text: str, scientist_name: str) -> str:
+        """Key used before content addressing (first 5000 chars of the raw page text)."""
         content = f"{scientist_name}|{self.prompt_version}|{text[:5000]}"
         return hashlib.md5(content.encode('utf-8')).hexdigest()
     
-    def _get_cache_path(self, key: str) -> str:
-        """Get the file path for a cache entry."""
-        return os.path.join(self.cache_dir, f"{key}.json")
+    def _valid(self, cached: Optional[Dict[str, Any]]) -> bool:
+        # Validate prompt version, and expiry of negative entries
+        if cached is None or cached.get("prompt_version") != self.prompt_version:
+            return False
+        expires_at = cached.get("expires_at")
+        return expires_at is None or time.time() < expires_at
     
-    def get(self, text: str, scientist_name: str) -> Optional[Dict[str, Any]]:
+    def get(self, text: str, scientist_name: str, page_title: Optional[str] = None,
+            revision_id: Optional[int] = None, raw_text: Optional[str] = None,
+            second_lookup: bool = False) -> Optional[Dict[str, Any]]:
         """
         Retrieve a cached result if available.
+        `text` is the exact prompt input. Lookup order: content key, then
+        (page_title, revision_id), then the legacy key computed on `raw_text`.
         Returns None if not cached or if cache is from different prompt version.
+        `second_lookup`: same extraction looked up again under another text (e.g. a reduced
+        window) after a counted miss; a hit turns that miss into a hit, a miss is not counted again.
         """
-        key = self._generate_key(text, scientist_name)
-        cache_path = self._get_cache_path(key)
-        
-        if not os.path.exists(cache_path):
-            self.stats["misses"] += 1
-            return None
-            
-        try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                cached = json.load(f)
-                
-            # Validate prompt version
-            if cached.get("prompt_version") != self.prompt_version:
-                self.stats["misses"] += 1
+        result, source = self._find(text, scientist_name, page_title, revision_id, raw_text)
+        with self._stats_lock:
+            if result is None:
+                if not second_lookup:
+                    self.stats["misses"] += 1
                 return None
-                
-            self.stats["hits"] += 1
-            return cached.get("result")
             
-        except (json.JSONDecodeError, IOError):
-            self.stats["misses"] += 1
-            return None
+            if second_lookup:
+                self.stats["misses"] -= 1
+            self.stats["hits"] += 1
+            if source == "revision":
+                self.stats["revision_hits"] += 1
+            elif source == "legacy":
+                self.stats["legacy_hits"] += 1
+        return result
     
-    def set(self, text: str, scientist_name: str, result: Dict[str, Any]) -> None:
-        """Store a result in the cache."""
+    def prefetch(self, text: str, scientist_name: str, page_title: Optional[str] = None,
+                 revision_id: Optional[int] = None, raw_text: Optional[str] = None) -> bool:
+        """
+        Same lookup as get(), run ahead of time to load the entry into the memory tier.
+        Does not count as a hit or a miss. Returns True if the entry exists.
+        """
+        return self._find(text, scientist_name, page_title, revision_id, raw_text)[0] is not None
+    
+    def _find(self, text: str, scientist_name: str, page_title: Optional[str],
+              revision_id: Optional[int], raw_text: Optional[str]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """(result, source) with source in "content", "revision", "legacy"; (None, None) if not cached."""
+        key = self._generate_key(text, scientist_name)
+        cached = self._lookup(key, self.backend.get, key)
+        if self._valid(cached):
+            return cached.get("result"), "content"
+        
+        # Same page, same revision: the text is unchanged, only its windowing may differ
+        if page_title and revision_id is not None:
+            cached = self._lookup(self._revision_memory_key(page_title, revision_id),
+                                  self.backend.get_by_revision, page_title, revision_id, self.prompt_version)
+            if self._valid(cached):
+                self._promote(text, scientist_name, cached, page_title, revision_id)
+                return cached.get("result"), "revision"
+        
+        # Entries written before content addressing: promoted to the new key
+        if raw_text is not None:
+            legacy_key = self._legacy_key(raw_text, scientist_name)
+            cached = self._lookup(legacy_key, self.backend.get, legacy_key)
+            if self._valid(cached):
+                self._promote(text, scientist_name, cached, page_title, revision_id)
+                return cached.get("result"), "legacy"
+        
+        return None, None
+    
+    def _promote(self, text: str, scientist_name: str, cached: Dict[str, Any],
+                 page_title: Optional[str], revision_id: Optional[int]) -> None:
+        """Re-save an entry found by revision or legacy key under the content key, keeping its expiry."""
+        self.set(text, scientist_name, cached["result"], page_title, revision_id,
+                 expires_at=cached.get("expires_at"))
+    
+    def set(self, text: str, scientist_name: str, result: Dict[str, Any],
+            page_title: Optional[str] = None, revision_id: Optional[int] = None,
+            negative: bool = False, expires_at: Optional[float] = None) -> None:
+        """
+        Store a result in the cache, indexed by content and, when known, by page revision.
+        A negative result (no usable answer) expires after NEGATIVE_CACHE_TTL seconds;
+        `expires_at` keeps the expiry of an existing negative entry.
+        """
         key = self._generate_key(text, scientist_name)
-        cache_path = self._get_cache_path(key)
         
         cache_entry = {
             "scientist_name": scientist_name,
             "prompt_version": self.prompt_version,
-            "text_hash": hashlib.md5(text.encode('utf-8')).hexdigest(),
+            "text_hash": hashlib.sha256(text.encode('utf-8')).hexdigest(),
             "text_length": len(text),
+            "page_title": page_title,
+            "revision_id": revision_id,
             "result": result,
             "timestamp": datetime.now().isoformat(),
         }
+        if negative:
+            expires_at = time.time() + NEGATIVE_CACHE_TTL
+        if expires_at is not None:
+            cache_entry["expires_at"] = expires_at
+        
+        self.memory.put(key, cache_entry)
+        if page_title and revision_id is not None:
+            self.memory.put(self._revision_memory_key(page_title, revision_id), cache_entry)
         
         try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(cache_entry, f, indent=2, ensure_ascii=False)
-        except IOError as e:
+            self.backend.put(key, cache_entry)
+        except (IOError, sqlite3.Error) as e:
             print(f"  ⚠️ Cache write error: {e}")
     
     def get_stats(self) -> Dict[str, Any]:
         """Return cache statistics."""
-        total = self.stats["hits"] + self.stats["misses"]
-        hit_rate = (self.stats["hits"] / total * 100) if total > 0 else 0
+        with self._stats_lock:
+            counters = dict(self.stats)
+            tier_stats = {tier: dict(stats) for tier, stats in self.tier_stats.items()}
+        total = counters["hits"] + counters["misses"]
+        hit_rate = (counters["hits"] / total * 100) if total > 0 else 0
+        
+        tiers = {}
+        for tier, stats in tier_stats.items():
+            lookups = stats["hits"] + stats["misses"]
+            tiers[tier] = {
+                "hits": stats["hits"],
+                "misses": stats["misses"],
+                "hit_rate": f"{(stats['hits'] / lookups * 100) if lookups else 0:.1f}%",
+                "total_ms": round(stats["seconds"] * 1000, 2),
+                "avg_ms": round(stats["seconds"] * 1000 / lookups, 3) if lookups else 0,
+            }
+        tiers["memory"]["entries"] = len(self.memory)
         
-        # Count total cached files
-        try:
-            cached_files = len([f for f in os.listdir(self.cache_dir) if f.endswith('.json')])
-        except OSError:
-            cached_files = 0
-            
         return {
-            "hits": self.stats["hits"],
-            "misses": self.stats["misses"],
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "revision_hits": counters["revision_hits"],
+            "legacy_hits": counters["legacy_hits"],
             "hit_rate": f"{hit_rate:.1f}%",
-            "cached_entries": cached_files,
+            "cached_entries": self.backend.count(),
+            "entries_by_version": self.backend.count_by_version(),
             "prompt_version": self.prompt_version,
+            "tiers": tiers,
         }
     
     def clear(self, confirm: bool = False) -> int:
-        """Clear all cached entries. Returns number of files deleted."""
+        """Clear all cached entries. Returns number of entries deleted."""
         if not confirm:
             print("⚠️ Pass confirm=True to actually clear cache.")
             return 0
             
-        count = 0
-        for filename in os.listdir(self.cache_dir):
-            if filename.endswith('.json'):
-                try:
-                    os.remove(os.path.join(self.cache_dir, filename))
-                    count += 1
-                except OSError:
-                    pass
+        count = self.backend.clear()
+        self.memory.clear()
         
-        self.stats = {"hits": 0, "misses": 0}
+        self._reset_stats()
         return count
     
     def invalidate_version(self, old_version: str) -> int:
         """Remove cache entries from a specific prompt version."""
-        count = 0
-        for filename in os.listdir(self.cache_dir):
-            if filename.endswith('.json'):
-                path = os.path.join(self.cache_dir, filename)
-                try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        cached = json.load(f)
-                    if cached.get("prompt_version") == old_version:
-                        os.remove(path)
-                        count += 1
-                except (json.JSONDecodeError, IOError, OSError):
-                    pass
-        return count
+        self.memory.clear()
+        return self.backend.delete_version(old_version)
+    
+    def compact(self) -> None:
+        """Reclaim storage space (SQLite VACUUM)."""
+        self.backend.compact()
 
 
 # Global cache instance
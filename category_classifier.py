@@ -0,0 +1,147 @@
+"""
+Category Classifier
+===================
+Classifies a Wikipedia page from its categories in a single pass:
+- Scientist verdict (scientist stems first, then exclusion stems, fail open)
+- Score of every scientific field (number of (category, keyword) matches)
+
+All keywords are compiled into one lookahead regex: at each position it
+reports the longest keyword starting there, and a prefix table adds the
+shorter keywords starting at the same position ('chemist' inside
+'chemistry'). The result is exactly the one of the per-keyword substring
+tests it replaces.
+"""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Racines de mots qui indiquent un scientifique (matchent singulier ET pluriel)
+# Ex: 'physic' match 'physicist', 'physicists', 'physics'
+# NOTE: 'philosoph' trop large (inclut Gandhi) - on limite aux philosophes des sciences
+SCIENTIST_STEMS = [
+    'physic', 'chemi', 'mathematic', 'biolog', 'astronom',
+    'engineer', 'computer scien', 'genetic', 'geolog',
+    'neuroscien', 'biochem', 'astrophysic', 'pharmacolog',
+    'microbiolog', 'ecolog', 'botan', 'zoolog',
+    'crystallograph', 'immunolog', 'virolog', 'inventor',
+    'logician', 'statistic', 'epidemiolog',
+    'paleontolog', 'anatom', 'physiolog', 'patholog',
+    'naturalist', 'cosmolog', 'oceanograph', 'meteorolog',
+    'scientist', 'women in science', 'nobel laureate',
+    # Philosophes des sciences spécifiquement
+    'philosophy of science', 'analytic philosoph', 'philosophy of mind',
+    'philosophy of math', 'epistemolog'
+]
+
+# Racines qui excluent (définitivement pas un scientifique)
+EXCLUDE_STEMS = [
+    'actor', 'actress', 'film director', 'screenwriter', 'television',
+    'singer', 'musician', 'composer', 'rapper', 'songwriter',
+    'politician', 'diplomat', 'monarch', 'king of', 'queen of', 'emperor',
+    'military', 'general of', 'admiral', 'colonel', 'soldier',
+    'president of', 'prime minister', 'governors of', 'senator', 'minister of',
+    'journalist', 'editor', 'newspaper', 'broadcaster',
+    'novelist', 'poet', 'playwright', 'literary',
+    'athlete', 'footballer', 'cricketer', 'basketball', 'tennis player',
+    'religious leader', 'bishop', 'cardinal', 'pope', 'imam', 'rabbi',
+    'businesspeople', 'entrepreneur', 'banker',
+    'criminal', 'murderer', 'revolutionary leader'
+]
+
+# Dictionnaire de mapping catégories → domaines
+FIELD_KEYWORDS = {
+    'Physics': ['physicist', 'physics', 'quantum', 'relativity', 'thermodynamics'],
+    'Mathematics': ['mathematician', 'mathematics', 'geometry', 'algebra', 'topology'],
+    'Chemistry': ['chemist', 'chemistry', 'chemical', 'molecule'],
+    'Biology': ['biologist', 'biology', 'evolution', 'genetics', 'botany', 'zoology'],
+    'Computer Science': ['computer scientist', 'computer science', 'programming', 'algorithm'],
+    'Medicine': ['physician', 'medical', 'medicine', 'anatomist'],
+    'Astronomy': ['astronomer', 'astronomy', 'astrophysics', 'cosmology'],
+    'Engineering': ['engineer', 'engineering'],
+    'Philosophy': ['philosopher', 'philosophy'],
+    'Economics': ['economist', 'economics']
+}
+
+
+@dataclass
+class CategoryVerdict:
+    """Scientist verdict and field scores of one page."""
+    is_scientist: bool
+    field_scores: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def field(self) -> Optional[str]:
+        """Best scoring field (first in FIELD_KEYWORDS order on ties), None if nothing matched."""
+        if not self.field_scores:
+            return None
+        return max(self.field_scores, key=self.field_scores.get)
+
+
+class CategoryClassifier:
+    """Scientist stems, exclusion stems and field keywords matched in one regex scan."""
+
+    def __init__(self, scientist_stems: List[str] = SCIENTIST_STEMS, exclude_stems: List[str] = EXCLUDE_STEMS,
+                 field_keywords: Dict[str, List[str]] = FIELD_KEYWORDS):
+        self.scientist_stems = set(scientist_stems)
+        self.exclude_stems = set(exclude_stems)
+        self.field_keywords = field_keywords
+        self._fields_of: Dict[str, List[str]] = {}
+        for name, keywords in field_keywords.items():
+            for keyword in keywords:
+                self._fields_of.setdefault(keyword, []).append(name)
+
+        keywords = self.scientist_stems | self.exclude_stems | set(self._fields_of)
+        alternation = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+        # Lookahead : une correspondance (la plus longue) à chaque position, chevauchements compris
+        self._regex = re.compile(f"(?=({alternation}))")
+        # Mots-clés qui commencent à la même position qu'un mot-clé plus long
+        self._prefixes = {k: [p for p in keywords if k.startswith(p)] for k in keywords}
+
+    def classify(self, categories: List[str]) -> CategoryVerdict:
+        lowered = [cat.lower() for cat in categories]
+        # Les racines sont cherchées dans le texte joint (comme avant), les domaines catégorie par catégorie
+        text = ' '.join(lowered)
+        starts = []
+        offset = 0
+        for cat in lowered:
+            starts.append(offset)
+            offset += len(cat) + 1
+
+        scientist = excluded = False
+        field_hits = set()     # (index de catégorie, mot-clé) : un mot-clé compte une fois par catégorie
+        for match in self._regex.finditer(text):
+            position = match.start()
+            for keyword in self._prefixes[match.group(1)]:
+                if keyword in self.scientist_stems:
+                    scientist = True
+                if keyword in self.exclude_stems:
+                    excluded = True
+                if keyword in self._fields_of:
+                    index = bisect_right(starts, position) - 1
+                    if position + len(keyword) <= starts[index] + len(lowered[index]):
+                        field_hits.add((index, keyword))
+
+        scores = {}
+        for _, keyword in field_hits:
+            for name in self._fields_of[keyword]:
+                scores[name] = scores.get(name, 0) + 1
+        # Ordre de FIELD_KEYWORDS conservé (départage des égalités)
+        field_scores = {name: scores[name] for name in self.field_keywords if name in scores}
+
+        # PRIORITÉ AUX SCIENTIFIQUES : si on trouve une catégorie scientifique, on accepte ;
+        # sinon les exclusions ; si aucun match, on accepte par défaut (fail open)
+        is_scientist = scientist or not excluded
+        return CategoryVerdict(is_scientist, field_scores)
+
+
+_default_classifier = None
+
+
+def get_classifier() -> CategoryClassifier:
+    """Shared classifier built from the module keyword lists."""
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = CategoryClassifier()
+    return _default_classifier
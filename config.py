@@ -6,6 +6,7 @@
 
 # Clé API OpenAI (laisser vide si vous utilisez Ollama)
 OPENAI_API_KEY = ""
+OPENAI_MODEL = "gpt-3.5-turbo"
 
 # True = utiliser Ollama (gratuit, local)
 # False = utiliser OpenAI (payant, nécessite clé API)
@@ -49,6 +50,16 @@ START_SCIENTIST = "Albert Einstein"
 # Langue Wikipedia ('fr' pour français, 'en' pour anglais)
 WIKIPEDIA_LANGUAGE = "en"
 
+# Dump Wikipedia local (JSON Lines, voir wiki_dump.py) pour crawler sans réseau.
+# Vide = API Wikipedia en ligne
+WIKIPEDIA_DUMP = ""
+
+# Ordre d'analyse de la file (voir crawl_frontier.py) :
+# "bfs" (par profondeur, historique), "mentions" (les plus cités d'abord),
+# "pagerank" (PageRank du graphe partiel), "diversity" (quotas siècle / domaine)
+CRAWL_POLICY = "bfs"
+PAGERANK_REFRESH_EVERY = 25  # nœuds analysés entre deux recalculs du PageRank
+
 # ============================================================
 # LISTE NOIRE (personnes à exclure du graphe)
 # ============================================================
@@ -125,3 +136,131 @@ EXCLUSION_PATTERNS = [
     r"professor at",    # e.g., "first-year physics professor at..."
     r"^first-year",
 ]
+
+# ============================================================
+# PARALLÉLISME ET LIMITES DE DÉBIT
+# ============================================================
+
+# Nombre de scientifiques analysés en parallèle (Wikipedia + LLM sont limités par le réseau)
+# 1 = comportement séquentiel historique
+CRAWL_WORKERS = 4
+
+# Préchargement : les PREFETCH_DEPTH prochains noms de la file sont récupérés en tâche de fond
+# (page Wikipedia + consultation du cache LLM) pendant que les workers analysent les nœuds courants.
+# 0 = désactivé. La profondeur est bornée par la taille du cache de pages de WikipediaClient.
+PREFETCH_DEPTH = 8
+PREFETCH_WORKERS = 2
+
+# Enrichissement en masse (scripts/enrich_*.py, clean_graph.py) : lots de titres traités en parallèle.
+# Le débit vers chaque hôte reste borné par RATE_LIMITS ci-dessous.
+ENRICH_WORKERS = 4
+
+# Connexions HTTP persistantes maximum par fournisseur LLM (keep-alive, partagées entre threads)
+LLM_POOL_SIZE = 8
+
+# Budget (tokens estimés) du texte envoyé au LLM : seuls les passages les plus pertinents
+# de la biographie (introduction, sections "Influences", "Students", "Legacy"...) sont gardés
+LLM_TEXT_TOKEN_BUDGET = 1200
+
+# Taille maximale (tokens) du prompt complet par fournisseur : consignes + fenêtres de texte
+# + liste des personnes liées depuis la page. Les tokens sont comptés avec tiktoken s'il est
+# installé (pip install tiktoken), sinon estimés (~4 caractères par token).
+LLM_PROMPT_BUDGETS = {
+    "cerebras": 6000,
+    "groq": 4000,
+    "mistral": 6000,
+    "openai": 3000,
+    "ollama": 3000,
+}
+LLM_DEFAULT_PROMPT_BUDGET = 3000
+# Liste de liens insérée dans le prompt : nombre de noms maximum et part du budget
+LLM_LINK_HINT_MAX = 150
+LLM_LINK_HINT_SHARE = 0.2
+
+# Consommation de tokens de chaque appel LLM (fournisseur, nœud, tokens, durée), une ligne JSON par appel
+# None = pas de journal
+LLM_USAGE_LOG = "output/llm_usage.jsonl"
+
+# Requêtes groupées : les biographies courtes analysées en même temps par les workers
+# partagent une seule requête LLM (une clé JSON par scientifique)
+LLM_BATCHING = True
+LLM_BATCH_MAX_CHARS = 6000       # page brute plus longue : texte envoyé seul (liens, streaming)
+LLM_BATCH_TOKEN_BUDGET = 6000    # taille maximale (estimée) des textes d'une requête groupée
+LLM_BATCH_MAX_ITEMS = 8
+LLM_BATCH_WAIT = 0.5             # secondes d'attente maximum pour compléter un lot
+
+# Réponses en streaming (extractions non groupées) : chaque nom est transmis au crawler dès qu'il est
+# complet, qui précharge sa page et ses dates pendant que le modèle génère encore la suite
+LLM_STREAMING = True
+
+# Intervalle minimum (secondes) entre deux requêtes vers un même hôte.
+# La clé est comparée à la fin du nom d'hôte ("wikipedia.org" couvre "en.wikipedia.org").
+RATE_LIMITS = {
+    "wikipedia.org": 0.1,
+    "api.cerebras.ai": 0.2,
+    "api.groq.com": 0.5,
+    "api.mistral.ai": 0.5,
+    "api.openai.com": 0.2,
+}
+
+# Intervalle par défaut pour les hôtes non listés (Ollama local, etc.)
+DEFAULT_RATE_LIMIT = 0.0
+
+# ============================================================
+# PRÉ-FILTRE LOCAL AVANT EXTRACTION LLM
+# ============================================================
+
+# Score local (personnes liées citées dans le texte, expressions "studied under", "influenced"...,
+# sections "Influences" / "Students"...) calculé avant chaque extraction non présente en cache :
+# "off"       : toutes les pages sont envoyées au LLM
+# "log"       : score affiché sans effet (pour calibrer les seuils)
+# "downgrade" : pages peu prometteuses envoyées avec un budget de texte réduit
+# "skip"      : idem, et pages sans aucun signal ignorées (aucun appel LLM)
+PREFILTER_MODE = "skip"
+PREFILTER_SKIP_BELOW = 2          # score < 2 : ni personne liée citée, ni déclencheur, ni section
+PREFILTER_DOWNGRADE_BELOW = 8
+PREFILTER_DOWNGRADE_BUDGET = 400  # tokens de texte envoyés pour une page réduite
+
+# ============================================================
+# SAUVEGARDE ET REPRISE DU CRAWL
+# ============================================================
+
+# Chaque nœud analysé est ajouté au journal (output/scientist_graph.journal.jsonl) ;
+# le GEXF complet n'est réécrit (et le journal vidé) que tous les N nœuds
+JOURNAL_COMPACT_EVERY = 500
+
+# Crawl distribué (crawl_coordinator.py) : file, réservations et graphe partagés par les workers
+COORDINATOR_DB = "output/crawl.sqlite3"
+# Secondes après lesquelles un scientifique réservé par un worker silencieux est remis dans la file
+COORDINATOR_LEASE = 900
+# Tentatives d'un scientifique après erreurs transitoires (réseau, API) avant de l'abandonner,
+# et pause (secondes, multipliée par le nombre de tentatives) du worker après une telle erreur
+COORDINATOR_MAX_ATTEMPTS = 3
+COORDINATOR_RETRY_DELAY = 5
+
+# ============================================================
+# ROUTAGE ENTRE FOURNISSEURS LLM
+# ============================================================
+
+# Requête parallèle vers le fournisseur suivant quand le premier dépasse sa latence p95
+ROUTER_HEDGING = True
+
+# Délai minimum (secondes) avant une requête de couverture, même si le p95 est plus court
+ROUTER_HEDGE_MIN_DELAY = 2.0
+
+# Requêtes de couverture en vol au maximum (la requête perdante d'une course continue jusqu'à
+# sa réponse ou son timeout : ce budget borne ces appels orphelins, le pool principal en est protégé)
+ROUTER_HEDGE_BUDGET = 4
+
+# Nombre d'appels récents pris en compte pour les statistiques (latence, erreurs)
+ROUTER_WINDOW = 50
+
+# Nombre minimum d'appels avant de calculer p95 / taux d'erreur
+ROUTER_MIN_SAMPLES = 5
+
+# Circuit ouvert après N échecs consécutifs ou au-delà de ce taux d'erreur
+ROUTER_FAILURE_THRESHOLD = 3
+ROUTER_ERROR_RATE = 0.5
+
+# Durée (secondes) pendant laquelle un fournisseur en échec (ou en 429) est ignoré
+ROUTER_COOLDOWN = 60
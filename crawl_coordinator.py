@@ -0,0 +1,330 @@
+"""
+Crawl Coordinator
+=================
+Multi-seed crawl shared by several worker processes (or machines sharing
+a filesystem), coordinated through one SQLite database:
+- frontier: (name, depth, parent) entries queued by any worker
+- claims:   one row per scientist ever handed to a worker; the name is the
+            primary key, so a scientist can never be expanded twice
+- attempts: a claim released after a transient error (network, API) goes
+            back to the frontier; after COORDINATOR_MAX_ATTEMPTS it is failed
+- nodes / edges: the graph store every worker streams its results into
+
+Workers reuse GraphBuilder._expand_node (Wikipedia + LLM + validation);
+only the scheduling and the graph storage differ from a single crawl.
+A claim not committed within the lease (crashed worker) is handed out again.
+
+Usage:
+    python crawl_coordinator.py seed "Albert Einstein" "Marie Curie" "Charles Darwin"
+    python crawl_coordinator.py worker [worker_id]
+    python crawl_coordinator.py run 4            # 4 local worker processes
+    python crawl_coordinator.py status
+    python crawl_coordinator.py export [output/scientist_graph.gexf]
+"""
+
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+
+from config import (
+    MAX_DEPTH,
+    MAX_SCIENTISTS,
+    COORDINATOR_DB,
+    COORDINATOR_LEASE,
+    COORDINATOR_MAX_ATTEMPTS,
+    COORDINATOR_RETRY_DELAY,
+)
+from name_filter import get_name_filter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    parent TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_frontier_order ON frontier(depth, seq);
+CREATE TABLE IF NOT EXISTS claims (
+    name TEXT PRIMARY KEY,
+    depth INTEGER NOT NULL,
+    parent TEXT,
+    worker TEXT,
+    status TEXT NOT NULL,          -- 'claimed', 'done', 'failed'
+    claimed_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(status, claimed_at);
+CREATE TABLE IF NOT EXISTS nodes (
+    name TEXT PRIMARY KEY,
+    depth INTEGER,
+    field TEXT,
+    birth_year INTEGER,
+    worker TEXT
+);
+CREATE TABLE IF NOT EXISTS edges (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    relation TEXT,
+    PRIMARY KEY (source, target)
+);
+"""
+
+
+class CrawlStore:
+    """Shared frontier, claim table and graph store in one SQLite file."""
+
+    def __init__(self, db_path: str = COORDINATOR_DB):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        # isolation_level=None : transactions explicites (BEGIN IMMEDIATE) pour verrouiller entre processus
+        self.conn = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        # Base créée avant le compteur de tentatives
+        for table in ("frontier", "claims"):
+            columns = [row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")]
+            if "attempts" not in columns:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction holding the database lock from the start (no lost updates between processes)."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    # ------------------------------------------------------------
+    # File partagée
+    # ------------------------------------------------------------
+
+    def add_seeds(self, names: List[str]) -> None:
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO frontier (name, depth, parent) VALUES (?, 0, NULL)",
+                [(name,) for name in names],
+            )
+
+    def claim(self, worker: str, max_scientists: int = MAX_SCIENTISTS, lease: float = COORDINATOR_LEASE) -> Optional[Tuple[str, int, int]]:
+        """
+        Hand the next scientist to `worker` (BFS order across all seeds).
+        Returns (name, depth, attempts), or None if the frontier is empty or the budget is spent.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            # Réservations expirées (worker arrêté) : le nom retourne dans la file
+            conn.execute(
+                "INSERT INTO frontier (name, depth, parent, attempts) "
+                "SELECT name, depth, parent, attempts FROM claims WHERE status = 'claimed' AND claimed_at < ?",
+                (now - lease,),
+            )
+            conn.execute(
+                "DELETE FROM claims WHERE status = 'claimed' AND claimed_at < ?", (now - lease,)
+            )
+            claimed = conn.execute("SELECT COUNT(*) FROM claims WHERE status != 'failed'").fetchone()[0]
+            if claimed >= max_scientists:
+                return None
+
+            while True:
+                row = conn.execute(
+                    "SELECT seq, name, depth, parent, attempts FROM frontier ORDER BY depth, seq LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    return None
+                seq, name, depth, parent, attempts = row
+                conn.execute("DELETE FROM frontier WHERE seq = ?", (seq,))
+
+                if depth > MAX_DEPTH or get_name_filter().is_blacklisted(name):
+                    continue
+                # Clé primaire sur le nom : un scientifique déjà réservé (par n'importe quel worker) est ignoré
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO claims (name, depth, parent, worker, status, claimed_at, attempts) "
+                    "VALUES (?, ?, ?, ?, 'claimed', ?, ?)",
+                    (name, depth, parent, worker, now, attempts),
+                ).rowcount
+                if inserted:
+                    return name, depth, attempts
+
+    def fail(self, name: str, worker: str) -> None:
+        """The expansion gave nothing (no page, not a person): never hand it out again."""
+        with self._transaction() as conn:
+            conn.execute("UPDATE claims SET status = 'failed' WHERE name = ? AND worker = ?", (name, worker))
+
+    def release(self, name: str, worker: str, max_attempts: int = COORDINATOR_MAX_ATTEMPTS) -> bool:
+        """
+        The expansion hit a transient error: put the scientist back at the end of the frontier
+        with one more attempt, or fail it once `max_attempts` is reached. Returns True if requeued.
+        """
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT depth, parent, attempts FROM claims WHERE name = ? AND worker = ? AND status = 'claimed'",
+                (name, worker),
+            ).fetchone()
+            if row is None:
+                return False
+            depth, parent, attempts = row
+            if attempts + 1 >= max_attempts:
+                conn.execute("UPDATE claims SET status = 'failed', attempts = ? WHERE name = ?", (attempts + 1, name))
+                return False
+            conn.execute("DELETE FROM claims WHERE name = ?", (name,))
+            conn.execute(
+                "INSERT INTO frontier (name, depth, parent, attempts) VALUES (?, ?, ?, ?)",
+                (name, depth, parent, attempts + 1),
+            )
+        return True
+
+    def commit(self, name: str, depth: int, expansion: dict, worker: str) -> bool:
+        """
+        Store the node, its edges and the newly discovered scientists in one transaction.
+        Returns False if the claim was lost (lease expired and re-claimed elsewhere).
+        """
+        with self._transaction() as conn:
+            owner = conn.execute("SELECT worker, status FROM claims WHERE name = ?", (name,)).fetchone()
+            if owner is None or owner != (worker, "claimed"):
+                return False
+
+            conn.execute("UPDATE claims SET status = 'done' WHERE name = ?", (name,))
+            conn.execute(
+                "INSERT OR REPLACE INTO nodes (name, depth, field, birth_year, worker) VALUES (?, ?, ?, ?, ?)",
+                (name, depth, expansion["field"], expansion["birth_year"], worker),
+            )
+            edges = [(person, name) for person in expansion["inspired_by"]] + [(name, person) for person in expansion["inspired"]]
+            conn.executemany(
+                "INSERT OR IGNORE INTO edges (source, target, relation) VALUES (?, ?, 'inspired')", edges
+            )
+            neighbours = expansion["inspired_by"] + expansion["inspired"]
+            conn.executemany(
+                "INSERT INTO frontier (name, depth, parent) "
+                "SELECT ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM claims WHERE name = ?)",
+                [(person, depth + 1, name, person) for person in neighbours],
+            )
+        return True
+
+    # ------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------
+
+    def status(self) -> Dict[str, int]:
+        counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM claims GROUP BY status").fetchall())
+        return {
+            "frontier": self.conn.execute("SELECT COUNT(*) FROM frontier").fetchone()[0],
+            "claimed": counts.get("claimed", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "edges": self.conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0],
+        }
+
+    def to_graph(self) -> nx.DiGraph:
+        graph = nx.DiGraph()
+        for source, target, relation in self.conn.execute("SELECT source, target, relation FROM edges"):
+            graph.add_edge(source, target, relation=relation)
+        for name, depth, field, birth_year in self.conn.execute("SELECT name, depth, field, birth_year FROM nodes"):
+            graph.add_node(name, depth=depth, field=field, birth_year=birth_year)
+        return graph
+
+
+# ============================================================
+# WORKERS
+# ============================================================
+
+def run_worker(worker_id: Optional[str] = None, db_path: str = COORDINATOR_DB) -> int:
+    """Claim, expand and commit scientists until the shared frontier is exhausted. Returns the count."""
+    # Import tardif : chaque processus crée ses propres clients (Wikipedia, LLM, cache)
+    from graph_builder import GraphBuilder
+
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    store = CrawlStore(db_path)
+    builder = GraphBuilder()
+    processed = 0
+
+    print(f"👷 Worker {worker_id} démarré ({db_path})")
+    while True:
+        claim = store.claim(worker_id)
+        if claim is None:
+            # D'autres workers peuvent encore alimenter la file : on attend qu'ils aient terminé
+            if store.status()["claimed"] == 0:
+                break
+            time.sleep(2)
+            continue
+
+        name, depth, attempts = claim
+        print(f"🔎 [{worker_id}] Analyse de: {name} (Prof: {depth})")
+        try:
+            expansion = builder._expand_node(name, depth, raise_errors=True)
+        except Exception as e:
+            # Erreur transitoire (réseau, API) : le scientifique est remis dans la file, pas abandonné
+            if store.release(name, worker_id):
+                print(f"  ⚠️ [{worker_id}] Erreur sur {name}: {e} -> remis dans la file "
+                      f"(tentative {attempts + 1}/{COORDINATOR_MAX_ATTEMPTS})")
+            else:
+                print(f"  ❌ [{worker_id}] Erreur sur {name}: {e} -> abandonné après {attempts + 1} tentatives")
+            time.sleep(COORDINATOR_RETRY_DELAY * (attempts + 1))
+            continue
+
+        # Pas de page, ou page rejetée (concept, non-personne) : définitif
+        if expansion is None:
+            store.fail(name, worker_id)
+            continue
+        if store.commit(name, depth, expansion, worker_id):
+            processed += 1
+            # Le graphe local sert aux vérifications chronologiques des nœuds suivants
+            builder.graph.add_node(name, depth=depth, field=expansion["field"], birth_year=expansion["birth_year"])
+        else:
+            print(f"  ⚠️ [{worker_id}] Réservation de {name} expirée, résultat ignoré.")
+
+    print(f"🏁 Worker {worker_id} terminé: {processed} scientifiques analysés")
+    return processed
+
+
+def run_local(workers: int, db_path: str = COORDINATOR_DB) -> None:
+    """Start `workers` worker processes on this machine and wait for them."""
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(f"{socket.gethostname()}-w{i}", db_path))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+def export_gexf(filename: str = "output/scientist_graph.gexf", db_path: str = COORDINATOR_DB) -> None:
+    """Write the shared graph store as GEXF (same format as GraphBuilder.save_graph)."""
+    graph = CrawlStore(db_path).to_graph()
+    for _, data in graph.nodes(data=True):
+        for key, value in data.items():
+            if value is None:
+                data[key] = 0 if key == 'birth_year' else ""
+    nx.write_gexf(graph, filename + ".tmp")
+    os.replace(filename + ".tmp", filename)
+    print(f"💾 Graphe exporté vers: {filename} ({graph.number_of_nodes()} nœuds, {graph.number_of_edges()} arêtes)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("seed", "worker", "run", "status", "export"):
+        print(__doc__)
+        sys.exit(1)
+
+    command = sys.argv[1]
+    if command == "seed":
+        CrawlStore().add_seeds(sys.argv[2:])
+        print(f"🌱 {len(sys.argv) - 2} scientifiques de départ ajoutés")
+    elif command == "worker":
+        run_worker(sys.argv[2] if len(sys.argv) > 2 else None)
+    elif command == "run":
+        run_local(int(sys.argv[2]) if len(sys.argv) > 2 else 4)
+    elif command == "status":
+        print(CrawlStore().status())
+    else:
+        export_gexf(sys.argv[2] if len(sys.argv) > 2 else "output/scientist_graph.gexf")
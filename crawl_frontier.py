@@ -0,0 +1,335 @@
+"""
+Crawl Frontier
+==============
+Queue of scientists waiting to be analysed, with what is needed to pause
+and resume a crawl exactly:
+- Every entry has a sequence number, its depth and the node it was
+  discovered from
+- Entries stay "pending" from push() until done(): an entry popped by a
+  worker but not yet committed is still part of the saved state
+- pending() is the exact frontier to persist; restore() rebuilds it
+  (O(frontier), nothing re-derived from the graph)
+
+The order in which entries are popped is decided by a pluggable policy
+(see POLICIES): entries live in a heap keyed by the policy's priority,
+and priority changes are applied lazily (a fresh heap item is pushed,
+the outdated one is skipped when it reaches the top).
+- "bfs":       push order, i.e. breadth-first by depth (historical behaviour)
+- "mentions":  scientists cited by the most analysed nodes first
+- "pagerank":  highest PageRank on the partial graph first
+- "diversity": under-represented (century, field) buckets first
+"""
+
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import networkx as nx
+
+
+@dataclass
+class FrontierEntry:
+    seq: int
+    name: str
+    depth: int
+    parent: Optional[str] = None
+
+    def to_record(self) -> dict:
+        return {"seq": self.seq, "name": self.name, "depth": self.depth, "parent": self.parent}
+
+    @classmethod
+    def from_record(cls, record: dict) -> "FrontierEntry":
+        return cls(record["seq"], record["name"], record["depth"], record.get("parent"))
+
+
+# ============================================================
+# POLITIQUES D'ORDONNANCEMENT
+# ============================================================
+
+class FrontierPolicy:
+    """Breadth-first order: entries are popped in push order."""
+
+    name = "bfs"
+
+    def priority(self, entry: FrontierEntry) -> Tuple:
+        """Smaller pops first. The entry's seq is always appended as the final tie-breaker."""
+        return ()
+
+    def on_push(self, entry: FrontierEntry) -> Iterable[str]:
+        """Names whose queued entries must be re-prioritised after this push."""
+        return ()
+
+    def on_commit(self, name: str) -> Optional[Iterable[str]]:
+        """
+        Called when a node has been analysed. Returns the names to re-prioritise,
+        or None to re-prioritise the whole frontier.
+        """
+        return ()
+
+    def prepare(self) -> None:
+        """Called once the graph and frontier are loaded, before the first pop."""
+
+
+class MentionsPolicy(FrontierPolicy):
+    """Most mentioned first: number of distinct analysed nodes citing the scientist."""
+
+    name = "mentions"
+
+    def __init__(self, get_graph: Callable[[], nx.DiGraph]):
+        self.get_graph = get_graph
+        self.mentions: Dict[str, Set[str]] = defaultdict(set)
+
+    def prepare(self) -> None:
+        # Reprise : mentions déjà présentes dans le graphe (arêtes entre nœuds analysés et candidats)
+        graph = self.get_graph()
+        for node, data in graph.nodes(data=True):
+            if "depth" not in data:
+                neighbours = set(graph.predecessors(node)) | set(graph.successors(node))
+                self.mentions[node] |= {n for n in neighbours if "depth" in graph.nodes[n]}
+
+    def priority(self, entry: FrontierEntry) -> Tuple:
+        return (-len(self.mentions[entry.name]), entry.depth)
+
+    def on_push(self, entry: FrontierEntry) -> Iterable[str]:
+        if entry.parent is not None:
+            self.mentions[entry.name].add(entry.parent)
+        return (entry.name,)
+
+
+def estimate_pagerank(graph: nx.DiGraph, damping: float = 0.85, iterations: int = 20) -> Dict[str, float]:
+    """
+    A few power iterations of PageRank in pure Python (no numpy/scipy needed).
+    Precise enough to rank the frontier, and cheap enough to rerun during a crawl.
+    """
+    n = graph.number_of_nodes()
+    if n == 0:
+        return {}
+    rank = dict.fromkeys(graph, 1.0 / n)
+    out_degree = dict(graph.out_degree())
+    for _ in range(iterations):
+        # Les nœuds sans arête sortante redistribuent leur score uniformément
+        dangling = sum(rank[node] for node, degree in out_degree.items() if degree == 0)
+        base = (1.0 - damping) / n + damping * dangling / n
+        new_rank = dict.fromkeys(graph, base)
+        for u, v in graph.edges():
+            new_rank[v] += damping * rank[u] / out_degree[u]
+        rank = new_rank
+    return rank
+
+
+class PageRankPolicy(FrontierPolicy):
+    """Highest (estimated) PageRank on the partial graph first, recomputed every `refresh_every` commits."""
+
+    name = "pagerank"
+
+    def __init__(self, get_graph: Callable[[], nx.DiGraph], refresh_every: int = 25):
+        self.get_graph = get_graph
+        self.refresh_every = max(1, refresh_every)
+        self.scores: Dict[str, float] = {}
+        self._commits = 0
+
+    def refresh(self) -> None:
+        graph = self.get_graph()
+        self.scores = estimate_pagerank(graph)
+
+    def prepare(self) -> None:
+        self.refresh()
+
+    def priority(self, entry: FrontierEntry) -> Tuple:
+        return (-self.scores.get(entry.name, 0.0), entry.depth)
+
+    def on_commit(self, name: str) -> Optional[Iterable[str]]:
+        self._commits += 1
+        if self._commits % self.refresh_every:
+            return ()
+        self.refresh()
+        return None
+
+
+class DiversityPolicy(FrontierPolicy):
+    """
+    Era / field quotas: entries from the (century, field) buckets with the fewest
+    analysed scientists first. A candidate's century comes from its known birth
+    year, its field from the node it was discovered from.
+    """
+
+    name = "diversity"
+
+    def __init__(self, get_graph: Callable[[], nx.DiGraph], birth_year_of: Callable[[str], Optional[int]]):
+        self.get_graph = get_graph
+        self.birth_year_of = birth_year_of
+        self.counts: Dict[Tuple, int] = defaultdict(int)
+        self._bucket_names: Dict[Tuple, Set[str]] = defaultdict(set)
+
+    @staticmethod
+    def _century(year) -> Optional[int]:
+        try:
+            year = int(year)
+        except (TypeError, ValueError):
+            return None
+        return year // 100 if year else None
+
+    def _bucket(self, name: str, parent: Optional[str]) -> Tuple:
+        graph = self.get_graph()
+        field = graph.nodes[parent].get("field") if parent in graph.nodes else None
+        return (self._century(self.birth_year_of(name)), field or "Other")
+
+    def prepare(self) -> None:
+        # Reprise : les nœuds déjà analysés comptent dans leur compartiment
+        for _, data in self.get_graph().nodes(data=True):
+            if "depth" in data:
+                self.counts[(self._century(data.get("birth_year")), data.get("field") or "Other")] += 1
+
+    def priority(self, entry: FrontierEntry) -> Tuple:
+        bucket = self._bucket(entry.name, entry.parent)
+        self._bucket_names[bucket].add(entry.name)
+        return (self.counts[bucket], entry.depth)
+
+    def on_commit(self, name: str) -> Optional[Iterable[str]]:
+        data = self.get_graph().nodes[name]
+        bucket = (self._century(data.get("birth_year")), data.get("field") or "Other")
+        self.counts[bucket] += 1
+        # Seules les entrées du même compartiment changent de priorité
+        return list(self._bucket_names.get(bucket, ()))
+
+
+POLICIES = {
+    "bfs": FrontierPolicy,
+    "mentions": MentionsPolicy,
+    "pagerank": PageRankPolicy,
+    "diversity": DiversityPolicy,
+}
+
+
+def make_policy(name: str, get_graph: Callable[[], nx.DiGraph],
+                birth_year_of: Callable[[str], Optional[int]] = lambda name: None,
+                pagerank_refresh: int = 25) -> FrontierPolicy:
+    """Instantiate a policy from its configuration name."""
+    if name not in POLICIES:
+        raise ValueError(f"Politique de crawl inconnue: {name} (choix: {', '.join(POLICIES)})")
+    if name == "pagerank":
+        return PageRankPolicy(get_graph, pagerank_refresh)
+    if name == "diversity":
+        return DiversityPolicy(get_graph, birth_year_of)
+    if name == "mentions":
+        return MentionsPolicy(get_graph)
+    return FrontierPolicy()
+
+
+# ============================================================
+# FILE D'ATTENTE
+# ============================================================
+
+class Frontier:
+    """Heap-based frontier with pending-entry tracking and lazy priority updates."""
+
+    def __init__(self, policy: Optional[FrontierPolicy] = None):
+        self.policy = policy or FrontierPolicy()
+        self._heap: List[Tuple[Tuple, int]] = []
+        self._pending: Dict[int, FrontierEntry] = {}
+        self._queued: Dict[int, Tuple] = {}          # seq -> priorité actuelle (entrées pas encore sorties)
+        self._by_name: Dict[str, Set[int]] = defaultdict(set)
+        self.next_seq = 0
+
+    def push(self, name: str, depth: int, parent: Optional[str] = None) -> FrontierEntry:
+        entry = FrontierEntry(self.next_seq, name, depth, parent)
+        self._add(entry)
+        return entry
+
+    def _add(self, entry: FrontierEntry) -> None:
+        if entry.seq in self._pending:
+            return
+        self._pending[entry.seq] = entry
+        self._by_name[entry.name].add(entry.seq)
+        self.next_seq = max(self.next_seq, entry.seq + 1)
+        self.reprioritize(self.policy.on_push(entry))
+        self._enqueue(entry)
+
+    def _enqueue(self, entry: FrontierEntry) -> None:
+        priority = self.policy.priority(entry) + (entry.seq,)
+        if self._queued.get(entry.seq) == priority:
+            return
+        self._queued[entry.seq] = priority
+        heapq.heappush(self._heap, (priority, entry.seq))
+
+    def reprioritize(self, names: Optional[Iterable[str]] = None) -> None:
+        """Recompute the priority of the queued entries of `names` (all of them if None)."""
+        if names is None:
+            seqs = list(self._queued)
+        else:
+            seqs = [seq for name in names for seq in self._by_name.get(name, ()) if seq in self._queued]
+        for seq in seqs:
+            self._enqueue(self._pending[seq])
+        # Le tas ne doit pas grossir indéfiniment avec les éléments périmés
+        if len(self._heap) > 4 * len(self._queued) + 64:
+            self._heap = [(priority, seq) for seq, priority in self._queued.items()]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, item: Tuple[Tuple, int]) -> bool:
+        priority, seq = item
+        return self._queued.get(seq) == priority
+
+    def pop(self) -> FrontierEntry:
+        """Next entry to analyse. It stays pending until done() is called."""
+        while True:
+            item = heapq.heappop(self._heap)
+            # Élément périmé (priorité mise à jour depuis) ou entrée terminée pendant la relecture du journal
+            if self._is_current(item):
+                del self._queued[item[1]]
+                return self._pending[item[1]]
+
+    def done(self, seq: int) -> None:
+        entry = self._pending.pop(seq, None)
+        self._queued.pop(seq, None)
+        if entry is not None:
+            self._by_name[entry.name].discard(seq)
+            if not self._by_name[entry.name]:
+                del self._by_name[entry.name]
+
+    def prepare(self) -> None:
+        """Let the policy initialise from the loaded graph, then re-rank the whole frontier."""
+        self.policy.prepare()
+        self.reprioritize()
+
+    def committed(self, name: str) -> None:
+        """Tell the policy a node has been analysed (its neighbours may change priority)."""
+        self.reprioritize(self.policy.on_commit(name))
+
+    def peek(self, n: int) -> Iterator[FrontierEntry]:
+        """Up to `n` entries that pop() would return next, without removing them."""
+        count = 0
+        # Les éléments périmés sont ignorés : on en examine un peu plus que n
+        for item in heapq.nsmallest(n * 4, self._heap):
+            if count >= n:
+                break
+            if self._is_current(item):
+                count += 1
+                yield self._pending[item[1]]
+
+    def pending(self) -> List[FrontierEntry]:
+        """Every entry not done yet (queued or being analysed), in push order."""
+        return sorted(self._pending.values(), key=lambda entry: entry.seq)
+
+    @classmethod
+    def restore(cls, entries: List[dict], next_seq: int = 0, policy: Optional[FrontierPolicy] = None) -> "Frontier":
+        frontier = cls(policy)
+        for record in entries:
+            frontier._add(FrontierEntry.from_record(record))
+        frontier.next_seq = max(frontier.next_seq, next_seq)
+        return frontier
+
+    def replay(self, record: dict) -> None:
+        """Apply a "push" or "done" journal record."""
+        if record["op"] == "push":
+            self._add(FrontierEntry.from_record(record))
+        elif record["op"] == "done":
+            self.done(record["seq"])
+
+    def __len__(self) -> int:
+        """Entries not done yet, including those being analysed."""
+        return len(self._pending)
+
+    def __bool__(self) -> bool:
+        """True if pop() has an entry to return (entries being analysed do not count)."""
+        return bool(self._queued)
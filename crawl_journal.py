@@ -0,0 +1,145 @@
+"""
+Crawl Journal
+=============
+Append-only record of the graph mutations made by GraphBuilder:
+- One JSON line per record, flushed (and fsynced) after every analysed node
+- Records: "visit" (node analysed at a depth), "attrs" (node attributes),
+  "edge" (edge added with its attributes), "push" / "done" (frontier
+  entry queued / finished, see crawl_frontier.py)
+- The snapshot is the GEXF file plus a small state file holding the exact
+  frontier and visited set; on compaction both are rewritten atomically
+  and the journal is emptied
+- Resume = load the snapshot, then replay the journal (records are
+  idempotent, so replaying records already in the snapshot is harmless)
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+import networkx as nx
+
+
+def journal_path_for(snapshot_path: str) -> str:
+    """output/scientist_graph.gexf -> output/scientist_graph.journal.jsonl"""
+    return f"{os.path.splitext(snapshot_path)[0]}.journal.jsonl"
+
+
+def state_path_for(snapshot_path: str) -> str:
+    """output/scientist_graph.gexf -> output/scientist_graph.state.json"""
+    return f"{os.path.splitext(snapshot_path)[0]}.state.json"
+
+
+class CrawlJournal:
+    """Append-only journal of graph mutations, paired with a GEXF snapshot."""
+
+    def __init__(self, snapshot_path: str):
+        self.snapshot_path = snapshot_path
+        self.path = journal_path_for(snapshot_path)
+        self.state_path = state_path_for(snapshot_path)
+        self._file = None
+
+    # ------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        """Write the records of one node and force them to disk."""
+        f = self._open()
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+    @staticmethod
+    def node_records(name: str, depth: int, attrs: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {"op": "visit", "name": name, "depth": depth},
+            {"op": "attrs", "name": name, "attrs": attrs},
+        ]
+
+    @staticmethod
+    def edge_record(source: str, target: str, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        return {"op": "edge", "u": source, "v": target, "attrs": attrs}
+
+    @staticmethod
+    def push_record(entry) -> Dict[str, Any]:
+        return {"op": "push", **entry.to_record()}
+
+    @staticmethod
+    def done_record(seq: int) -> Dict[str, Any]:
+        return {"op": "done", "seq": seq}
+
+    def write_state(self, state: Dict[str, Any]) -> None:
+        """Atomically replace the crawl state (frontier + visited) saved with the snapshot."""
+        with open(self.state_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.state_path + ".tmp", self.state_path)
+
+    def load_state(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.state_path):
+            return None
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def reset(self) -> None:
+        """Empty the journal once its records are in the snapshot."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        # Troncature atomique : un journal vide remplace l'ancien
+        with open(self.path + ".tmp", "w", encoding="utf-8"):
+            pass
+        os.replace(self.path + ".tmp", self.path)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ------------------------------------------------------------
+    # Relecture
+    # ------------------------------------------------------------
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Dernière ligne tronquée par un arrêt brutal : le nœud sera réanalysé
+                    continue
+
+    def replay(self, graph: nx.DiGraph, frontier=None, visited: Optional[set] = None) -> int:
+        """
+        Apply the journal to `graph` (and to the frontier / visited set when given).
+        Returns the number of records applied.
+        """
+        count = 0
+        for record in self.records():
+            op = record.get("op")
+            if op in ("push", "done"):
+                if frontier is not None:
+                    frontier.replay(record)
+            elif op == "visit":
+                graph.add_node(record["name"], depth=record["depth"])
+                if visited is not None:
+                    visited.add(record["name"])
+            elif op == "attrs":
+                graph.add_node(record["name"], **record.get("attrs", {}))
+            elif op == "edge":
+                graph.add_edge(record["u"], record["v"], **record.get("attrs", {}))
+            else:
+                continue
+            count += 1
+        return count
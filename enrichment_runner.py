@@ -0,0 +1,147 @@
+"""
+Enrichment Runner
+=================
+Bulk enrichment of graph nodes (years, fields...) shared by the scripts:
+- Nodes are looked up in batches by a pool of worker threads; the request
+  rate to each host stays bounded by the shared rate limiter
+- Every finished batch is appended to a JSONL checkpoint next to the graph
+  (output/scientist_graph.<task>.jsonl) instead of rewriting the GEXF
+- An interrupted run resumes from the checkpoint: nodes already looked up
+  are not requested again
+- The GEXF is written once, atomically, when the run is complete
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+import networkx as nx
+
+from config import ENRICH_WORKERS
+
+
+def checkpoint_path_for(graph_path: str, task: str) -> str:
+    """output/scientist_graph.gexf, "years" -> output/scientist_graph.years.jsonl"""
+    return f"{os.path.splitext(graph_path)[0]}.{task}.jsonl"
+
+
+def write_gexf_atomic(graph: nx.DiGraph, path: str) -> None:
+    """Write the GEXF to a temporary file, then replace the previous one."""
+    nx.write_gexf(graph, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+class EnrichmentCheckpoint:
+    """Append-only {node: value} store, one JSON line per looked-up node."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Any]:
+        results = {}
+        if not os.path.exists(self.path):
+            return results
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Dernière ligne tronquée par un arrêt brutal : le nœud sera redemandé
+                    continue
+                results[record["node"]] = record["value"]
+        return results
+
+    def append(self, results: Dict[str, Any]) -> None:
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                for node, value in results.items():
+                    f.write(json.dumps({"node": node, "value": value}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def remove(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class EnrichmentRunner:
+    """
+    Runs `lookup` (list of nodes -> {node: JSON-serialisable value}) over many nodes,
+    `batch_size` nodes per call and `workers` calls in parallel.
+    """
+
+    def __init__(self, task: str, graph_path: str, lookup: Callable[[List[str]], Dict[str, Any]],
+                 batch_size: int = 1, workers: int = ENRICH_WORKERS):
+        self.task = task
+        self.lookup = lookup
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.checkpoint = EnrichmentCheckpoint(checkpoint_path_for(graph_path, task))
+
+    def run(self, nodes: List[str]) -> Dict[str, Any]:
+        """
+        Look up every node (resuming from the checkpoint) and return {node: value}.
+        A batch that raises is reported and left out: it is retried on the next run.
+        """
+        done = self.checkpoint.load()
+        todo = [node for node in dict.fromkeys(nodes) if node not in done]
+        if len(todo) < len(nodes):
+            print(f"♻️ Reprise ({self.task}): {len(nodes) - len(todo)} nœuds déjà traités ({self.checkpoint.path})")
+
+        batches = [todo[i:i + self.batch_size] for i in range(0, len(todo), self.batch_size)]
+        processed = 0
+        failed = 0
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = {executor.submit(self.lookup, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    results = {node: value for node, value in future.result().items() if node in batch}
+                except Exception as e:
+                    failed += len(batch)
+                    print(f"  ⚠️ Erreur sur un lot de {len(batch)} nœuds ({batch[0]}...): {e}")
+                    continue
+                # Les nœuds sans résultat sont enregistrés aussi : ils ne seront pas redemandés
+                results = {node: results.get(node) for node in batch}
+                self.checkpoint.append(results)
+                done.update(results)
+                processed += len(batch)
+                print(f"  [{processed}/{len(todo)}] {self.task}: lot de {len(batch)} nœuds terminé")
+        except KeyboardInterrupt:
+            print(f"\n⚠️ Interruption : {processed} nœuds sauvegardés dans {self.checkpoint.path}, relancez pour reprendre.")
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        executor.shutdown(wait=True)
+
+        if failed:
+            print(f"  ⚠️ {failed} nœuds en erreur (seront retentés à la prochaine exécution)")
+        return {node: done[node] for node in nodes if node in done}
+
+    def finish(self) -> None:
+        """Drop the checkpoint once its results are in the saved graph."""
+        self.checkpoint.remove()
+
+
+# ============================================================
+# RECHERCHES PRÊTES À L'EMPLOI
+# ============================================================
+
+def years_lookup(wiki) -> Callable[[List[str]], Dict[str, Optional[List[int]]]]:
+    """
+    Birth / death years from Wikipedia: WikipediaClient.lookup_years reads categories of
+    50 titles per request, falls back to the summary patterns (extract_years) for the nodes
+    still without dates, and persists every year found in the PersonStore.
+    """
+    def lookup(names: List[str]) -> Dict[str, Optional[List[int]]]:
+        return {name: list(value) for name, value in wiki.lookup_years(names).items()}
+    return lookup
+
+
+def fields_lookup(wiki) -> Callable[[List[str]], Dict[str, Optional[str]]]:
+    """Scientific field from the Wikipedia categories (50 titles per request)."""
+    return wiki.lookup_fields
@@ -1,11 +1,18 @@
 import networkx as nx
 import os
-import time
 from collections import deque
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Tuple, List, Optional
-from wikipedia_client import WikipediaClient
+from wikipedia_client import WikipediaClient, BUNDLE_CACHE_SIZE
 from llm_extractor import LLMExtractor
-from config import MAX_DEPTH, MAX_SCIENTISTS, BLACKLIST, EXCLUSION_PATTERNS
+from crawl_journal import CrawlJournal
+from crawl_frontier import Frontier, make_policy
+from name_filter import get_name_filter
+from config import (
+    MAX_DEPTH, MAX_SCIENTISTS, CRAWL_WORKERS, PREFETCH_DEPTH, PREFETCH_WORKERS,
+    JOURNAL_COMPACT_EVERY, CRAWL_POLICY, PAGERANK_REFRESH_EVERY,
+)
 
 class GraphBuilder:
     def __init__(self):
@@ -13,113 +20,90 @@ class GraphBuilder:
         self.wiki_client = WikipediaClient()
         self.llm = LLMExtractor()
         self.visited = set()
+        self.name_filter = get_name_filter()
+        self.journal = None
+        self.frontier = None
+        # Noms reçus en streaming pendant une extraction LLM : page et dates préchargées aussitôt
+        self._warm_pool = ThreadPoolExecutor(max_workers=max(1, PREFETCH_WORKERS))
         
     def build_influence_graph(self, start_scientist: str) -> nx.DiGraph:
         """
-        Construit le graphe d'influence en utilisant un parcours BFS (Largeur d'abord).
+        Construit le graphe d'influence en utilisant un parcours BFS (Largeur d'abord),
+        ou l'ordre de priorité choisi par CRAWL_POLICY.
         Reprend le travail existant si un fichier est trouvé.
+
+        Les nœuds sont analysés en parallèle par CRAWL_WORKERS threads (Wikipedia + LLM),
+        mais leurs résultats sont appliqués au graphe dans l'ordre de la file :
+        l'ordre BFS, la déduplication et le plafond MAX_SCIENTISTS sont conservés.
+        Les PREFETCH_DEPTH noms suivants de la file sont préchargés en tâche de fond.
         """
         filename = "output/scientist_graph.gexf"
-        queue = self._load_existing_graph(filename, start_scientist)
+        self.journal = CrawlJournal(filename)
+        queue = self.frontier = self._load_existing_graph(filename, start_scientist)
+        committed_since_snapshot = 0
 
         print(f"\n🚀 DÉMARRAGE de la construction du graphe")
-        print(f"   Max Profondeur: {MAX_DEPTH} | Max Scientifiques: {MAX_SCIENTISTS}")
+        print(f"   Max Profondeur: {MAX_DEPTH} | Max Scientifiques: {MAX_SCIENTISTS} | Workers: {CRAWL_WORKERS} | Ordre: {CRAWL_POLICY}")
         print("-" * 60)
         
-        while queue and len(self.visited) < MAX_SCIENTISTS:
-            current_scientist, depth = queue.popleft()
+        # Nœuds en cours d'analyse, dans l'ordre où ils ont quitté la file
+        in_flight = deque()
+        claimed = set()
+        # Préchargements en cours ou terminés : nom -> future (borné par la profondeur de préchargement)
+        prefetching = {}
             
-            # 1. Vérifications préliminaires
-            if current_scientist in self.visited:
-                continue
-            if depth > MAX_DEPTH:
-                continue
-            # Vérifier la liste noire
-            if any(bl.lower() in current_scientist.lower() for bl in BLACKLIST):
-                print(f"  🚫 {current_scientist} est dans la liste noire. Ignoré.")
-                continue
+        with ThreadPoolExecutor(max_workers=CRAWL_WORKERS) as pool, \
+                ThreadPoolExecutor(max_workers=max(1, PREFETCH_WORKERS)) as prefetch_pool:
+            while queue or in_flight:
+                # 1. Remplir le pool tant qu'il reste de la place (et du budget)
+                while queue and len(in_flight) < CRAWL_WORKERS and len(self.visited) + len(in_flight) < MAX_SCIENTISTS:
+                    entry = queue.pop()
+                    current_scientist, depth = entry.name, entry.depth
                 
-            print(f"🔎 [{len(self.visited)+1}/{MAX_SCIENTISTS}] Analyse de: {current_scientist} (Prof: {depth})")
+                    # Vérifications préliminaires
+                    # (entrées écartées sans trace dans le journal : à la reprise, elles le seraient de nouveau)
+                    if current_scientist in self.visited or current_scientist in claimed or depth > MAX_DEPTH:
+                        queue.done(entry.seq)
+                        continue
+                    # Vérifier la liste noire
+                    if self.name_filter.is_blacklisted(current_scientist):
+                        print(f"  🚫 {current_scientist} est dans la liste noire. Ignoré.")
+                        queue.done(entry.seq)
+                        continue
             
-            # 2. Récupération du texte
-            try:
-                result = self.wiki_client.get_scientist_text(current_scientist)
-            except Exception as e:
-                print(f"  ❌ Erreur critique récupération Wikipedia ({e}). On passe au suivant.")
-                continue
+                    print(f"🔎 [{len(self.visited) + len(in_flight) + 1}/{MAX_SCIENTISTS}] Analyse de: {current_scientist} (Prof: {depth})")
+                    claimed.add(current_scientist)
+                    in_flight.append((entry, pool.submit(self._expand_node, current_scientist, depth)))
             
-            if not result:
-                print(f"  ❌ Pas de page Wikipedia trouvée. Ignore.")
-                continue
+                if not in_flight:
+                    break
                 
-            wiki_text, links = result
-            print(f"  📄 {len(wiki_text)} caractères récupérés. {len(links)} liens identifiés.")
-            
-            # Extraction du domaine scientifique
-            # Safe access: check if node exists first
-            field = None
-            if current_scientist in self.graph.nodes:
-                field = self.graph.nodes[current_scientist].get('field')
-            
-            if not field or field == 'Other':
-                field = self.wiki_client.get_scientific_field(current_scientist)
-            
-            if not field:
-                field = 'Other'
-            
-            # 3. Ajout/Maj au graphe et marquage comme visité
-            self.visited.add(current_scientist)
-            
-            # Récupération de l'année de naissance si elle n'est pas déjà présente
-            birth_year = self.graph.nodes[current_scientist].get('birth_year') if current_scientist in self.graph.nodes else None
-            if not birth_year:
-                birth_year, _ = self.wiki_client.extract_years(current_scientist)
-            
-            # On met à jour ou crée le nœud avec les attributs complets
-            self.graph.add_node(current_scientist, depth=depth, field=field, birth_year=birth_year)
-            
-            # Si on atteint la profondeur max, on ne cherche pas les voisins
-            # (on l'ajoute juste comme feuille)
-            if depth == MAX_DEPTH:
-                continue
+                # Préchargement des prochains noms pendant que les workers travaillent
+                self._prefetch_frontier(queue, claimed, prefetching, prefetch_pool)
                 
-            # 4. Extraction des relations via LLM
-            relations = self.llm.extract_relations(wiki_text, current_scientist, links=links)
-            
-            # 5. Traitement des "inspirations" (A a inspiré current)
-            # Arc: A -> current
-            inspirations = relations.get('inspired_by', [])
-            for person in inspirations:
-                if person == current_scientist: continue
-                if self._is_valid_name(person):
-                    # Validation Chronologique
-                    if self._is_chronologically_valid(current_scientist, person, "inspired_by"): 
-                        self.graph.add_edge(person, current_scientist, relation="inspired")
-                        if person not in self.visited:
-                            queue.append((person, depth + 1))
-            
-            # 6. Traitement des "inspirés" (current a inspiré B)
-            # Arc: current -> B
-            inspired_list = relations.get('inspired', [])
-            for person in inspired_list:
-                if person == current_scientist: continue
-                if self._is_valid_name(person):
-                    # Validation Chronologique
-                    if self._is_chronologically_valid(current_scientist, person, "inspired"):
-                        self.graph.add_edge(current_scientist, person, relation="inspired")
-                        if person not in self.visited:
-                            queue.append((person, depth + 1))
-            
-            print(f"  ✅ Relations: {len(inspirations)} inspirations, {len(inspired_list)} inspirés.")
+                # 2. Appliquer le plus ancien résultat (ordre BFS)
+                entry, future = in_flight.popleft()
+                claimed.discard(entry.name)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Erreur inattendue d'un worker (réseau, API...) : seul ce nœud est abandonné, pas le crawl
+                    print(f"  ❌ Erreur lors de l'analyse de {entry.name} ({e}). On passe au suivant.")
+                    result = None
+                if result is None:
+                    queue.done(entry.seq)
+                    self.journal.append([CrawlJournal.done_record(entry.seq)])
+                    continue
             
-            # Petite pause pour être poli envers les APIs
-            time.sleep(0.5)
+                self._commit_node(entry.name, entry.depth, result, queue, seq=entry.seq)
+                committed_since_snapshot += 1
             
-            # --- AUTOSAVE ---
-            # Sauvegarde toutes les 20 personnes traitées pour éviter de tout perdre en cas de crash
-            if len(self.visited) % 20 == 0:
-                print(f"💾 Autosave: Sauvegarde intermédiaire ({len(self.visited)} nœuds)...")
-                self.save_graph(filename)
+                # --- AUTOSAVE ---
+                # Chaque nœud est déjà dans le journal ; le GEXF complet n'est réécrit que périodiquement
+                if committed_since_snapshot >= JOURNAL_COMPACT_EVERY:
+                    print(f"💾 Autosave: Compaction du journal ({len(self.visited)} nœuds)...")
+                    self.save_graph(filename)
+                    committed_since_snapshot = 0
         
         print("-" * 60)
         print(f"🏁 CONSTRUCTION TERMINÉE")
@@ -128,7 +112,196 @@ class GraphBuilder:
         
         return self.graph
 
-    def _is_chronologically_valid(self, current_node: str, target_node: str, relation_type: str) -> bool:
+    def _prefetch_frontier(self, queue: Frontier, claimed: set, prefetching: dict, prefetch_pool: ThreadPoolExecutor) -> None:
+        """
+        Lance en arrière-plan le chargement des prochains noms de la file : page Wikipedia
+        (gardée dans le cache de pages) et consultation du cache LLM (niveau mémoire).
+        Au plus `lookahead` préchargements sont gardés : au-delà, le cache de pages (LRU)
+        évincerait des pages avant qu'elles soient utilisées.
+        """
+        lookahead = min(PREFETCH_DEPTH, BUNDLE_CACHE_SIZE // 2)
+        if lookahead <= 0:
+            return
+        
+        upcoming = []
+        for entry in queue.peek(lookahead * 2):
+            name, depth = entry.name, entry.depth
+            if name in self.visited or name in claimed or depth > MAX_DEPTH or name in upcoming:
+                continue
+            upcoming.append(name)
+            if name not in prefetching:
+                prefetching[name] = prefetch_pool.submit(self._prefetch_node, name, depth)
+            if len(upcoming) >= lookahead:
+                break
+        
+        # On oublie les préchargements sortis de la fenêtre (nœuds analysés ou trop loin dans la file)
+        for name in [n for n, future in prefetching.items() if n not in upcoming and future.done()]:
+            del prefetching[name]
+    
+    def _prefetch_node(self, name: str, depth: int) -> None:
+        try:
+            page = self.wiki_client.get_page_bundle(name)
+            if page is None or depth == MAX_DEPTH:
+                return
+            result = self.wiki_client.get_scientist_text(name)
+            if result:
+                text, links = result
+                self.llm.prefetch_cache(text, name, links, page.title, page.revision_id)
+        except Exception:
+            # Simple optimisation : le worker refera l'appel et signalera l'erreur
+            pass
+    
+    def _expand_node(self, current_scientist: str, depth: int, raise_errors: bool = False) -> Optional[dict]:
+        """
+        Partie I/O de l'analyse d'un nœud (exécutée dans un thread du pool) :
+        texte Wikipedia, domaine, année de naissance, extraction LLM et validation des voisins.
+        Ne modifie pas le graphe ; retourne None si le nœud doit être ignoré (pas de page, pas une personne).
+        raise_errors : les erreurs de récupération Wikipedia (réseau, API) sont propagées au lieu
+        d'ignorer le nœud, pour que l'appelant puisse le retenter (crawl distribué).
+        """
+        # 1. Récupération du texte
+        try:
+            result = self.wiki_client.get_scientist_text(current_scientist)
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"  ❌ Erreur critique récupération Wikipedia ({e}). On passe au suivant.")
+            return None
+        
+        if not result:
+            print(f"  ❌ Pas de page Wikipedia trouvée pour {current_scientist}. Ignore.")
+            return None
+            
+        wiki_text, links = result
+        print(f"  📄 {current_scientist}: {len(wiki_text)} caractères récupérés. {len(links)} liens identifiés.")
+        
+        # 2. Extraction du domaine scientifique
+        # Safe access: check if node exists first
+        field = None
+        if current_scientist in self.graph.nodes:
+            field = self.graph.nodes[current_scientist].get('field')
+        
+        if not field or field == 'Other':
+            field = self.wiki_client.get_scientific_field(current_scientist)
+        
+        if not field:
+            field = 'Other'
+        
+        # Récupération de l'année de naissance si elle n'est pas déjà présente
+        birth_year = self.graph.nodes[current_scientist].get('birth_year') if current_scientist in self.graph.nodes else None
+        if not birth_year:
+            birth_year, _ = self.wiki_client.extract_years(current_scientist)
+        
+        expansion = {"field": field, "birth_year": birth_year, "inspired_by": [], "inspired": [], "raw_counts": (0, 0)}
+        
+        # Si on atteint la profondeur max, on ne cherche pas les voisins
+        # (on l'ajoute juste comme feuille)
+        if depth == MAX_DEPTH:
+            return expansion
+            
+        # 3. Extraction des relations via LLM
+        # Réponse en streaming : chaque nom complet lance le préchargement de sa page (is_scientist)
+        # et de ses dates (chronologie) pendant que le modèle génère encore la suite
+        warming = []
+        warmed = set()
+        warm_lock = threading.Lock()
+        
+        def on_name(relation_type: str, person: str) -> None:
+            with warm_lock:
+                if person == current_scientist or person in warmed:
+                    return
+                warmed.add(person)
+                warming.append(self._warm_pool.submit(self._warm_candidate, person))
+        
+        # (titre résolu, révision) : index secondaire du cache, réutilisé tant que la page n'a pas changé
+        page = self.wiki_client.get_page_bundle(current_scientist)
+        relations = self.llm.extract_relations(
+            wiki_text, current_scientist, links=links,
+            page_title=page.title if page else None,
+            revision_id=page.revision_id if page else None,
+            on_name=on_name,
+        )
+        # Les préchargements déjà lancés se terminent : la validation lira leurs résultats en cache
+        with warm_lock:
+            started = list(warming)
+        wait(started)
+        
+        # 4. Dates de naissance de tous les candidats en une fois (store persistant + requêtes groupées)
+        candidates = [
+            person for relation_type in ("inspired_by", "inspired") for person in relations.get(relation_type, [])
+            if isinstance(person, str) and person != current_scientist
+            and not (person in self.graph.nodes and self.graph.nodes[person].get('birth_year'))
+        ]
+        if candidates:
+            self.wiki_client.lookup_years(candidates)
+        
+        # 5. Validation des voisins (nom + chronologie)
+        # "inspired_by" : A a inspiré current (Arc: A -> current)
+        # "inspired" : current a inspiré B (Arc: current -> B)
+        for relation_type in ("inspired_by", "inspired"):
+            for person in relations.get(relation_type, []):
+                if person == current_scientist: continue
+                if self._is_valid_name(person):
+                    # Validation Chronologique
+                    if self._is_chronologically_valid(current_scientist, birth_year, person, relation_type):
+                        expansion[relation_type].append(person)
+        
+        expansion["raw_counts"] = (len(relations.get('inspired_by', [])), len(relations.get('inspired', [])))
+        return expansion
+
+    def _warm_candidate(self, name: str) -> None:
+        """Précharge ce dont la validation d'un voisin aura besoin (dates, catégories)."""
+        if len(name) < 3 or ' ' not in name or self.name_filter.is_rejected(name):
+            return
+        try:
+            self.wiki_client.lookup_years([name])
+            self.wiki_client.is_scientist(name)
+        except Exception:
+            # Simple optimisation : la validation refera l'appel et signalera l'erreur
+            pass
+
+    def _commit_node(self, current_scientist: str, depth: int, expansion: dict, queue: Frontier, seq: Optional[int] = None) -> None:
+        """
+        Applique au graphe le résultat de _expand_node (thread principal uniquement).
+        `seq` : entrée de la file terminée par ce nœud.
+        """
+        # Ajout/Maj au graphe et marquage comme visité
+        self.visited.add(current_scientist)
+        
+        # On met à jour ou crée le nœud avec les attributs complets
+        attrs = {"field": expansion["field"], "birth_year": expansion["birth_year"]}
+        self.graph.add_node(current_scientist, depth=depth, **attrs)
+        records = CrawlJournal.node_records(current_scientist, depth, attrs)
+        
+        # Arc: A -> current
+        for person in expansion["inspired_by"]:
+            self.graph.add_edge(person, current_scientist, relation="inspired")
+            records.append(CrawlJournal.edge_record(person, current_scientist, {"relation": "inspired"}))
+            if person not in self.visited:
+                records.append(CrawlJournal.push_record(queue.push(person, depth + 1, current_scientist)))
+        
+        # Arc: current -> B
+        for person in expansion["inspired"]:
+            self.graph.add_edge(current_scientist, person, relation="inspired")
+            records.append(CrawlJournal.edge_record(current_scientist, person, {"relation": "inspired"}))
+            if person not in self.visited:
+                records.append(CrawlJournal.push_record(queue.push(person, depth + 1, current_scientist)))
+        
+        if seq is not None:
+            queue.done(seq)
+            records.append(CrawlJournal.done_record(seq))
+        # Les priorités des candidats peuvent changer (mentions, PageRank, quotas)
+        queue.committed(current_scientist)
+        
+        # Journal écrit (et synchronisé sur disque) à chaque nœud
+        if self.journal is not None:
+            self.journal.append(records)
+        
+        if depth < MAX_DEPTH:
+            inspirations, inspired = expansion["raw_counts"]
+            print(f"  ✅ {current_scientist}: {inspirations} inspirations, {inspired} inspirés.")
+
+    def _is_chronologically_valid(self, current_node: str, current_birth: Optional[int], target_node: str, relation_type: str) -> bool:
         """
         Vérifie la cohérence temporelle d'une relation.
         
@@ -139,14 +312,7 @@ class GraphBuilder:
         Marge d'erreur de 5 ans pour les contemporains.
         Si une date manque, on laisse passer (fail open).
         """
-        # 1. Obtenir l'année de naissance du nœud courant
-        # Il devrait déjà être dans le graphe avec son attribut, sinon on le récupère
-        current_birth = self.graph.nodes[current_node].get('birth_year')
-        if not current_birth:
-             # Fallback si jamais (ne devrait pas arriver souvent vu l'ordre du code)
-             current_birth, _ = self.wiki_client.extract_years(current_node)
-             if current_birth:
-                 self.graph.nodes[current_node]['birth_year'] = current_birth
+        # 1. L'année de naissance du nœud courant est fournie par _expand_node
         
         # 2. Obtenir l'année de naissance du nœud cible
         target_birth = None
@@ -154,11 +320,10 @@ class GraphBuilder:
             target_birth = self.graph.nodes[target_node].get('birth_year')
         
         if not target_birth:
-            # On doit interroger wiki pour vérifier la date (coûteux mais nécessaire pour la validation)
-            target_birth, _ = self.wiki_client.extract_years(target_node)
-            # On peut stocker cette info provisoirement dans le graphe si le nœud n'existe pas encore
-            # Mais attention à ne pas créer un nœud "vide" qui perturberait le BFS.
+            # Lecture dans le PersonStore (préchargé en lot par _expand_node, persistant entre les exécutions)
+            # On ne crée pas de nœud "vide" dans le graphe : cela perturberait le BFS.
             # L'ajout se fera plus tard lors du visit.
+            target_birth, _ = self.wiki_client.lookup_years([target_node])[target_node]
         
         # 3. Validation (Fail Open)
         if not current_birth or not target_birth:
@@ -184,59 +349,99 @@ class GraphBuilder:
                  
         return True
 
-    def _load_existing_graph(self, filename: str, start_scientist: str) -> deque:
-        """Tente de charger un graphe existant et reconstruit la file d'attente."""
-        queue = deque([(start_scientist, 0)])
+    def _load_existing_graph(self, filename: str, start_scientist: str) -> Frontier:
+        """
+        Tente de charger un graphe existant (dernier snapshot GEXF + journal des nœuds
+        analysés depuis) et reconstruit la file d'attente.
+        La file et les nœuds visités sont repris tels quels depuis le fichier d'état
+        et le journal ; les anciens graphes sans état sont repris à partir des arêtes.
+        """
+        queue = Frontier(self._make_policy())
+        has_journal = self.journal is not None and os.path.exists(self.journal.path) and os.path.getsize(self.journal.path) > 0
         
-        if os.path.exists(filename):
+        if os.path.exists(filename) or has_journal:
             print(f"🔄 Reprise du graphe existant: {filename}")
             try:
-                self.graph = nx.read_gexf(filename)
-                print(f"   Graphe chargé: {self.graph.number_of_nodes()} nœuds, {self.graph.number_of_edges()} arêtes")
+                if os.path.exists(filename):
+                    self.graph = nx.read_gexf(filename)
                 
-                queue_candidates = {} # map name -> depth
-                
-                for node, data in self.graph.nodes(data=True):
-                    if 'depth' in data:
-                        self.visited.add(node)
-                    else:
-                        queue_candidates[node] = float('inf')
-
-                # Calculer la profondeur des candidats basée sur leurs voisins visités
-                for u, v in self.graph.edges():
-                    # u (visité) -> v (candidat)
-                    if u in self.visited and v in queue_candidates:
-                        parent_depth = self.graph.nodes[u].get('depth', 0)
-                        if isinstance(parent_depth, str): parent_depth = int(parent_depth)
-                        queue_candidates[v] = min(queue_candidates[v], parent_depth + 1)
-                    
-                    # v (candidat) -> u (visité)
-                    if u in queue_candidates and v in self.visited:
-                        parent_depth = self.graph.nodes[v].get('depth', 0)
-                        if isinstance(parent_depth, str): parent_depth = int(parent_depth)
-                        queue_candidates[u] = min(queue_candidates[u], parent_depth + 1)
-                
-                valid_candidates = [(n, d) for n, d in queue_candidates.items() if d != float('inf')]
-                valid_candidates.sort(key=lambda x: x[1])
+                # Reprise exacte : file (nom, profondeur, parent) et nœuds visités sauvegardés avec le snapshot
+                state = self.journal.load_state() if self.journal is not None else None
+                if state is not None:
+                    queue = Frontier.restore(state["frontier"], state.get("next_seq", 0), queue.policy)
+                    self.visited = set(state["visited"])
+                if has_journal:
+                    replayed = self.journal.replay(self.graph, queue, self.visited)
+                    print(f"   Journal rejoué: {replayed} enregistrements")
+                print(f"   Graphe chargé: {self.graph.number_of_nodes()} nœuds, {self.graph.number_of_edges()} arêtes")
                 
-                queue = deque(valid_candidates)
+                if state is None and queue.next_seq == 0:
+                    queue = self._rebuild_queue_from_edges()
                 print(f"   ✅ Reprise: {len(self.visited)} nœuds visités, {len(queue)} dans la file d'attente.")
                 
             except Exception as e:
                 print(f"⚠️ Erreur lors de la reprise du graphe: {e}")
                 print("⚠️ Démarrage d'un nouveau graphe.")
                 self.graph = nx.DiGraph()
-                queue = deque([(start_scientist, 0)])
+                self.visited = set()
+                queue = Frontier(self._make_policy())
         
         if not queue and len(self.visited) == 0:
-             queue = deque([(start_scientist, 0)])
-             
+             queue.push(start_scientist, 0)
+        
+        queue.prepare()
+        return queue
+    
+    def _make_policy(self):
+        """Politique d'ordonnancement de la file (CRAWL_POLICY)."""
+        def birth_year_of(name):
+            # Années déjà connues (requêtes groupées faites lors de l'analyse du parent)
+            record = self.wiki_client.people.get(name)
+            return record.get("birth_year") if record else None
+        return make_policy(CRAWL_POLICY, lambda: self.graph, birth_year_of, PAGERANK_REFRESH_EVERY)
+    
+    def _rebuild_queue_from_edges(self) -> Frontier:
+        """Graphe sauvegardé sans état de crawl : profondeurs estimées à partir des voisins visités."""
+        queue_candidates = {} # map name -> (depth, parent)
+        
+        for node, data in self.graph.nodes(data=True):
+            if 'depth' in data:
+                self.visited.add(node)
+            else:
+                queue_candidates[node] = (float('inf'), None)
+
+        # Calculer la profondeur des candidats basée sur leurs voisins visités
+        for u, v in self.graph.edges():
+            # u (visité) -> v (candidat)
+            if u in self.visited and v in queue_candidates:
+                parent_depth = self.graph.nodes[u].get('depth', 0)
+                if isinstance(parent_depth, str): parent_depth = int(parent_depth)
+                queue_candidates[v] = min(queue_candidates[v], (parent_depth + 1, u))
+            
+            # v (candidat) -> u (visité)
+            if u in queue_candidates and v in self.visited:
+                parent_depth = self.graph.nodes[v].get('depth', 0)
+                if isinstance(parent_depth, str): parent_depth = int(parent_depth)
+                queue_candidates[u] = min(queue_candidates[u], (parent_depth + 1, v))
+        
+        valid_candidates = [(n, d, p) for n, (d, p) in queue_candidates.items() if d != float('inf')]
+        valid_candidates.sort(key=lambda x: x[1])
+        
+        queue = Frontier(self._make_policy())
+        for name, depth, parent in valid_candidates:
+            queue.push(name, depth, parent)
         return queue
     
+    def _crawl_state(self) -> dict:
+        """État exact du crawl, sauvegardé avec chaque snapshot."""
+        return {
+            "next_seq": self.frontier.next_seq,
+            "frontier": [entry.to_record() for entry in self.frontier.pending()],
+            "visited": sorted(self.visited),
+        }
+    
     def _is_valid_name(self, name: str) -> bool:
         """Filtre pour s'assurer que le nom est celui d'un scientifique valide."""
-        import re
-        
         if not name or not isinstance(name, str):
             return False
         
@@ -244,15 +449,10 @@ class GraphBuilder:
         if len(name) < 3 or ' ' not in name:
             return False
         
-        # Vérifier la liste noire directe
-        if any(bl.lower() in name.lower() for bl in BLACKLIST):
+        # Vérifier la liste noire directe et les patterns d'exclusion (regex compilées, verdict mémorisé)
+        if self.name_filter.is_rejected(name):
             return False
         
-        # Vérifier les patterns d'exclusion (regex)
-        for pattern in EXCLUSION_PATTERNS:
-            if re.search(pattern, name, re.IGNORECASE):
-                return False
-        
         # 🔬 Auto-vérification via catégories Wikipedia
         if not self.wiki_client.is_scientist(name):
             print(f"  🚫 Auto-rejet: '{name}' n'est pas un scientifique (catégories Wikipedia)")
@@ -260,8 +460,12 @@ class GraphBuilder:
         
         return True
     
-    def save_graph(self, filename: str = "output/scientist_graph.gexf"):
-        """Exporte le graphe pour Gephi."""
+    def save_graph(self, filename: str = "output/scientist_graph.gexf") -> bool:
+        """
+        Exporte le graphe pour Gephi (écriture atomique).
+        Sert aussi de snapshot : l'état du crawl (file, visités) est écrit à côté
+        et le journal est vidé une fois les deux fichiers écrits.
+        """
         try:
             # Nettoyage des attributs None avant export (NetworkX/GEXF n'aime pas None)
             # On travaille sur une copie shallow pour ne pas casser le graphe en mémoire
@@ -275,7 +479,16 @@ class GraphBuilder:
                         else:
                             data[key] = ""
                             
-            nx.write_gexf(export_graph, filename)
+            # Fichier temporaire puis remplacement : un crash pendant l'écriture ne corrompt pas le snapshot
+            nx.write_gexf(export_graph, filename + ".tmp")
+            os.replace(filename + ".tmp", filename)
             print(f"💾 Graphe exporté vers: {filename}")
         except Exception as e:
             print(f"⚠️ Erreur lors de l'export: {e}")
+            return False
+        
+        if self.journal is not None and os.path.abspath(self.journal.snapshot_path) == os.path.abspath(filename):
+            if self.frontier is not None:
+                self.journal.write_state(self._crawl_state())
+            self.journal.reset()
+        return True
@@ -0,0 +1,97 @@
+"""
+Influence Pre-filter
+====================
+Cheap local check run before an LLM extraction: does the page say
+anything about influences at all?
+- Signals: people linked from the page AND named in its text, trigger
+  expressions ("studied under", "influenced"...), relation sections
+  ("Influences", "Students", "Doctoral advisor"...)
+- The weighted score decides between a full extraction, a downgraded
+  one (smaller text budget) and no extraction
+- PREFILTER_MODE selects what is done with the decision ("off", "log",
+  "downgrade", "skip"); cached results are always used first
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from config import PREFILTER_MODE, PREFILTER_SKIP_BELOW, PREFILTER_DOWNGRADE_BELOW
+from name_filter import get_name_filter
+from text_windowing import HEADING, TRIGGER_WORDS, person_link_titles
+
+# Titres de section qui annoncent directement des relations (plus strict que SECTION_KEYWORDS)
+RELATION_SECTIONS = re.compile(
+    r"influenc|student|doctoral|advis|mentor|teacher|disciple|successor|legacy|collaborat",
+    re.IGNORECASE,
+)
+
+MODES = ("off", "log", "downgrade", "skip")
+
+
+@dataclass
+class PrefilterVerdict:
+    score: float
+    people: int
+    triggers: int
+    sections: int
+    action: str  # "extract", "downgrade" ou "skip"
+
+
+class InfluencePrefilter:
+    """Keyword / link scorer predicting whether a page contains influence relations."""
+
+    def __init__(self, mode: str = PREFILTER_MODE, skip_below: float = PREFILTER_SKIP_BELOW,
+                 downgrade_below: float = PREFILTER_DOWNGRADE_BELOW):
+        if mode not in MODES:
+            raise ValueError(f"Mode de pré-filtre inconnu: {mode} (choix: {', '.join(MODES)})")
+        self.mode = mode
+        self.skip_below = skip_below
+        self.downgrade_below = downgrade_below
+        self.stats: Dict[str, int] = {"extract": 0, "downgrade": 0, "skip": 0}
+        self._lock = threading.Lock()
+
+    def assess(self, text: str, scientist_name: str, links: Optional[List[str]] = None) -> PrefilterVerdict:
+        name_filter = get_name_filter()
+        # Personnes liées depuis la page ET citées dans le texte : candidats directs à une relation
+        people = sum(
+            1 for name in person_link_titles(links)
+            if name != scientist_name and name in text and not name_filter.is_rejected(name)
+        )
+        triggers = len({match.group(0).lower() for match in TRIGGER_WORDS.finditer(text)})
+        headings = (HEADING.match(line) for line in text.split("\n"))
+        sections = sum(1 for match in headings if match and RELATION_SECTIONS.search(match.group(1)))
+        score = 2 * min(people, 10) + 2 * min(triggers, 5) + 3 * min(sections, 3)
+
+        if score < self.skip_below:
+            action = "skip"
+        elif score < self.downgrade_below:
+            action = "downgrade"
+        else:
+            action = "extract"
+        return PrefilterVerdict(score, people, triggers, sections, action)
+
+    def plan(self, text: str, scientist_name: str, links: Optional[List[str]] = None) -> str:
+        """Action decide() would apply, without logging or counting it (cache prefetch)."""
+        if self.mode in ("off", "log"):
+            return "extract"
+        action = self.assess(text, scientist_name, links).action
+        return "downgrade" if self.mode == "downgrade" and action == "skip" else action
+
+    def decide(self, text: str, scientist_name: str, links: Optional[List[str]] = None) -> str:
+        """Action to apply under the configured mode: "extract", "downgrade" or "skip"."""
+        if self.mode == "off":
+            return "extract"
+        verdict = self.assess(text, scientist_name, links)
+        action = verdict.action
+        # "downgrade" : les pages sans signal sont réduites, jamais ignorées
+        if self.mode == "downgrade" and action == "skip":
+            action = "downgrade"
+        if action != "extract" or self.mode == "log":
+            print(f"  🔬 Pré-filtre {scientist_name}: score {verdict.score:g} "
+                  f"({verdict.people} personnes, {verdict.triggers} déclencheurs, {verdict.sections} sections) -> {action}"
+                  + (" (non appliqué)" if self.mode == "log" else ""))
+        with self._lock:
+            self.stats[action] += 1
+        return "extract" if self.mode == "log" else action
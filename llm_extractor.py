@@ -1,8 +1,15 @@
+import asyncio
 import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
 import requests
-from typing import Dict, List, Optional, Any
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from config import (
     OPENAI_API_KEY,
+    OPENAI_MODEL,
     USE_OLLAMA,
     OLLAMA_URL,
     OLLAMA_MODEL,
@@ -17,8 +24,33 @@ from config import (
     CEREBRAS_API_KEY,
     CEREBRAS_MODEL,
     CEREBRAS_API_URL,
+    LLM_POOL_SIZE,
+    LLM_BATCHING,
+    LLM_BATCH_MAX_CHARS,
+    LLM_BATCH_TOKEN_BUDGET,
+    LLM_BATCH_MAX_ITEMS,
+    LLM_BATCH_WAIT,
+    LLM_STREAMING,
+    PREFILTER_DOWNGRADE_BUDGET,
 )
 from cache_manager import get_cache
+from influence_prefilter import InfluencePrefilter
+from prompt_builder import BatchRequest, ExtractionRequest, PromptBuilder, UsageLog
+from provider_router import ProviderRouter
+from rate_limiter import throttle
+from text_windowing import select_relevant_windows
+from structured_output import (
+    RELATIONS_SCHEMA,
+    RelationsStreamParser,
+    normalize_relations,
+    ollama_format,
+    parse_object,
+    parse_relations,
+    response_format,
+)
+
+# Longueur maximale du texte inséré dans le prompt (c'est aussi ce texte exact qui sert de clé de cache)
+PROMPT_TEXT_LIMIT = 15000
 
 class LLMExtractor:
     def __init__(self):
@@ -28,6 +60,92 @@ class LLMExtractor:
         self.use_cerebras = USE_CEREBRAS
         self.cache = get_cache()  # Initialize cache
 
+        # Connexions persistantes : une Session (keep-alive) et un client SDK par fournisseur,
+        # partagés par tous les threads du crawler au lieu d'être recréés à chaque appel
+        self._sessions = {}
+        self._clients = {}
+        self._pool_lock = threading.Lock()
+
+        # Santé des fournisseurs (latence, erreurs, 429) et requêtes de couverture
+        self.router = ProviderRouter()
+        
+        # Regroupement des biographies courtes envoyées en même temps par les threads du crawler
+        self.batcher = ExtractionBatcher(self._extract_batch)
+        
+        # Pré-filtre local : pages sans signal d'influence ignorées ou envoyées réduites
+        self.prefilter = InfluencePrefilter()
+        
+        # Prompt construit par fournisseur (budget de tokens) et consommation journalisée par appel
+        self.prompts = PromptBuilder(self._build_prompt, self._build_batch_prompt)
+        self.usage = UsageLog()
+
+    def _providers(self, schema: Optional[dict] = RELATIONS_SCHEMA,
+                   on_name: Optional[Callable[[str, str], None]] = None) -> list:
+        """
+        Fournisseurs activés, par ordre de priorité (Ollama local toujours en dernier recours).
+        schema : schéma JSON de la réponse attendue (None = objet JSON libre, ex. requête groupée).
+        on_name : appelé avec (relation, nom) pendant une réponse en streaming (voir LLM_STREAMING).
+        """
+        providers = []
+        if self.use_cerebras:
+            providers.append(("cerebras", self._call_cerebras))
+        if self.use_groq:
+            providers.append(("groq", self._call_groq))
+        if self.use_mistral:
+            providers.append(("mistral", self._call_mistral))
+        if OPENAI_API_KEY:
+            providers.append(("openai", self._call_openai))
+        providers.append(("ollama", self._call_ollama))
+        return [(name, partial(call, schema=schema, on_name=on_name)) for name, call in providers]
+
+    def _check_rate_limit(self, provider: str, response) -> None:
+        """Signale un 429 au routeur (avec Retry-After si le fournisseur l'indique)."""
+        if response.status_code != 429:
+            return
+        retry_after = response.headers.get("Retry-After")
+        try:
+            retry_after = float(retry_after) if retry_after else None
+        except ValueError:
+            retry_after = None
+        self.router.record_rate_limit(provider, retry_after)
+
+    def _session(self, provider: str) -> requests.Session:
+        """Session HTTP poolée (keep-alive) du fournisseur, créée au premier appel."""
+        with self._pool_lock:
+            if provider not in self._sessions:
+                session = requests.Session()
+                # pool_block : au plus LLM_POOL_SIZE connexions simultanées par fournisseur
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=LLM_POOL_SIZE, pool_block=True)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[provider] = session
+            return self._sessions[provider]
+
+    def _sdk_client(self, provider: str):
+        """Client Groq / OpenAI unique (pool httpx interne, HTTP/2 si le paquet 'h2' est installé)."""
+        with self._pool_lock:
+            if provider not in self._clients:
+                http_client = None
+                try:
+                    import h2  # noqa: F401 (active le support HTTP/2 de httpx)
+                    import httpx
+                    http_client = httpx.Client(http2=True, limits=httpx.Limits(max_connections=LLM_POOL_SIZE))
+                except ImportError:
+                    pass
+                
+                if provider == "groq":
+                    from groq import Groq
+                    client_class, api_key = Groq, GROQ_API_KEY
+                else:
+                    from openai import OpenAI
+                    client_class, api_key = OpenAI, OPENAI_API_KEY
+                
+                if http_client is not None:
+                    self._clients[provider] = client_class(api_key=api_key, http_client=http_client)
+                else:
+                    self._clients[provider] = client_class(api_key=api_key)
+            return self._clients[provider]
+
         
     def check_connection(self) -> bool:
         """Vérifie si le service LLM configuré est accessible."""
@@ -59,8 +177,7 @@ class LLMExtractor:
             print(f"  ❌ Clé API {name} manquante")
             return False
         try:
-            from groq import Groq
-            client = Groq(api_key=GROQ_API_KEY)
+            client = self._sdk_client("groq")
             client.chat.completions.create(messages=[{"role": "user", "content": "Ping"}], model=model)
             print(f"  ✅ Mode {name} configuré et fonctionnel (Modèle: {model})")
             return True
@@ -73,7 +190,7 @@ class LLMExtractor:
             print(f"  ❌ Clé API {name} manquante")
             return False
         try:
-            resp = requests.get(f"{MISTRAL_API_URL.rstrip('/')}/v1/models", headers={"Authorization": f"Bearer {MISTRAL_API_KEY}"}, timeout=10)
+            resp = self._session("mistral").get(f"{MISTRAL_API_URL.rstrip('/')}/v1/models", headers={"Authorization": f"Bearer {MISTRAL_API_KEY}"}, timeout=10)
             if resp.status_code == 200:
                 print(f"  ✅ Mode {name} configuré et fonctionnel (Modèle: {model})")
                 return True
@@ -87,7 +204,7 @@ class LLMExtractor:
             print(f"  ❌ Clé API {name} manquante")
             return False
         try:
-            resp = requests.get(f"{CEREBRAS_API_URL.rstrip('/')}/models", headers={"Authorization": f"Bearer {CEREBRAS_API_KEY}"}, timeout=10)
+            resp = self._session("cerebras").get(f"{CEREBRAS_API_URL.rstrip('/')}/models", headers={"Authorization": f"Bearer {CEREBRAS_API_KEY}"}, timeout=10)
             if resp.status_code == 200:
                 print(f"  ✅ Mode {name} configuré et fonctionnel (Modèle: {model})")
                 return True
@@ -98,7 +215,7 @@ class LLMExtractor:
 
     def _check_ollama(self, name: str, model: str) -> bool:
         try:
-            resp = requests.get(f"{OLLAMA_URL}/api/tags", timeout=2)
+            resp = self._session("ollama").get(f"{OLLAMA_URL}/api/tags", timeout=2)
             if resp.status_code == 200:
                 print(f"  ✅ Serveur {name} détecté ({OLLAMA_URL})")
                 return True
@@ -107,17 +224,109 @@ class LLMExtractor:
             print(f"  ❌ Impossible de se connecter à {name} sur {OLLAMA_URL}")
         return False
 
-    def extract_relations(self, text: str, scientist_name: str, links: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    def extract_relations(self, text: str, scientist_name: str, links: Optional[List[str]] = None,
+                          page_title: Optional[str] = None, revision_id: Optional[int] = None,
+                          on_name: Optional[Callable[[str, str], None]] = None) -> Dict[str, List[str]]:
         """
         Extrait les relations d'influence depuis un texte Wikipedia.
-        Retourne un dictionnaire {'inspirations': [], 'inspired': []}
+        Retourne un dictionnaire {'inspired_by': [], 'inspired': []}
+        Les textes courts peuvent être regroupés avec ceux d'autres threads en une seule requête.
+        page_title / revision_id (optionnels) permettent de réutiliser le résultat d'une révision déjà analysée.
+        on_name (optionnel) : appelé avec (relation, nom) dès qu'un nom est complet dans une réponse
+        en streaming, avant le résultat final (peut être appelé plusieurs fois pour un même nom
+        si deux fournisseurs répondent en parallèle).
         """
+        # Extraction en cours : les lots de l'ExtractionBatcher n'attendent que si d'autres sont en vol
+        with self.batcher.active():
+            return self._extract_relations(text, scientist_name, links, page_title, revision_id, on_name)
+
+    def _extract_relations(self, text: str, scientist_name: str, links: Optional[List[str]],
+                           page_title: Optional[str], revision_id: Optional[int],
+                           on_name: Optional[Callable[[str, str], None]]) -> Dict[str, List[str]]:
         links = links or []
-        links_hint = ", ".join(links[:200])
         
+        print(f"  🤖 Interrogation du LLM pour {scientist_name}...")
+        
+        # Seuls les passages pertinents (introduction, sections "Influences", "Students"...)
+        # sont envoyés, dans la limite de LLM_TEXT_TOKEN_BUDGET
+        window = select_relevant_windows(text, links)[:PROMPT_TEXT_LIMIT]
+        
+        # Check cache first : clé = texte exact vu par le modèle, puis (titre, révision), puis ancienne clé
+        cached_result = self.cache.get(window, scientist_name, page_title, revision_id, raw_text=text)
+        if cached_result is not None:
+            print(f"  📦 Résultat trouvé en cache!")
+            return cached_result
+        
+        # Pré-filtre (après le cache : un résultat déjà payé est toujours réutilisé)
+        action = self.prefilter.decide(text, scientist_name, links)
+        if action == "skip":
+            # Pas mis en cache : le pré-filtre ne coûte rien et ses seuils peuvent changer
+            return {"inspired_by": [], "inspired": []}
+        if action == "downgrade":
+            window = self._downgraded_window(text, links)
+            # Résultat réduit déjà obtenu (clé = fenêtre réduite) : indispensable sans numéro de révision
+            # (même extraction : le défaut de cache est déjà compté, pas une seconde fois)
+            cached_result = self.cache.get(window, scientist_name, second_lookup=True)
+            if cached_result is not None:
+                print(f"  📦 Résultat (réduit) trouvé en cache!")
+                return cached_result
+        
+        result = None
+        
+        # Biographie courte : requête groupée avec les autres extractions en attente.
+        # Le critère porte sur la page brute : la fenêtre, bornée par LLM_TEXT_TOKEN_BUDGET, serait
+        # toujours assez courte ; les pages longues gardent la requête simple (liens, streaming)
+        if LLM_BATCHING and len(text) <= LLM_BATCH_MAX_CHARS:
+            result = self.batcher.submit(scientist_name, window, links)
+        
+        # Routage : ordre de priorité Cerebras -> Groq -> Mistral -> OpenAI -> Ollama,
+        # en sautant les fournisseurs dont le circuit est ouvert (échecs répétés, 429)
+        if result is None:
+            # Le prompt est construit par chaque fournisseur : fenêtres + liens dans son budget de tokens
+            result = self.router.call(self._providers(on_name=on_name), ExtractionRequest(scientist_name, window, links))
+        
+        if result is None:
+            # Aucune réponse exploitable (fournisseurs en échec, JSON irréparable) : le résultat vide
+            # n'est gardé que NEGATIVE_CACHE_TTL secondes, le scientifique sera réinterrogé ensuite
+            final_result = {"inspired_by": [], "inspired": []}
+            self.cache.set(window, scientist_name, final_result, page_title, revision_id, negative=True)
+            return final_result
+        
+        # Store in cache
+        self.cache.set(window, scientist_name, result, page_title, revision_id)
+            
+        return result
+    
+    def prefetch_cache(self, text: str, scientist_name: str, links: Optional[List[str]] = None,
+                       page_title: Optional[str] = None, revision_id: Optional[int] = None) -> bool:
+        """
+        Consulte le cache pour un futur appel à extract_relations (même clé), sans appeler le LLM :
+        l'entrée trouvée est chargée dans le niveau mémoire du cache. Retourne True si elle existe.
+        """
+        window = select_relevant_windows(text, links or [])[:PROMPT_TEXT_LIMIT]
+        if self.cache.prefetch(window, scientist_name, page_title, revision_id, raw_text=text):
+            return True
+        # Page réduite par le pré-filtre : son résultat est rangé sous la fenêtre réduite
+        if self.prefilter.plan(text, scientist_name, links) == "downgrade":
+            return self.cache.prefetch(self._downgraded_window(text, links or []), scientist_name)
+        return False
+    
+    @staticmethod
+    def _downgraded_window(text: str, links: List[str]) -> str:
+        """Texte envoyé pour une page réduite par le pré-filtre (PREFILTER_DOWNGRADE_BUDGET tokens)."""
+        return select_relevant_windows(text, links, token_budget=PREFILTER_DOWNGRADE_BUDGET)[:PROMPT_TEXT_LIMIT]
+    
+    def _build_prompt(self, text: str, scientist_name: str, linked_names: Optional[List[str]] = None) -> str:
+        """Prompt d'extraction pour un seul scientifique (linked_names : personnes liées depuis sa page)."""
+        # Liens de la page : orthographe exacte des noms cités dans le texte
+        linked = ""
+        if linked_names:
+            linked = f"""
+## PEOPLE LINKED FROM THIS PAGE (use these exact spellings when a name in the text matches):
+{", ".join(linked_names)}
+"""
         # Enhanced Prompt with Strict Naming Rules
-        # Enhanced Prompt with Strict Naming Rules
-        prompt = f"""You are a world expert in the history of science.
+        return f"""You are a world expert in the history of science.
 
 TASK: Analyze the provided text about scientist "{scientist_name}" and extract their intellectual network.
 You must identify:
@@ -131,8 +340,8 @@ You must identify:
 - Do not invent information. Only extract what is implied in the text.
 
 ## TEXT TO ANALYZE:
-{text[:15000]}
-
+{text[:PROMPT_TEXT_LIMIT]}
+{linked}
 ### FINAL INSTRUCTION:
 Return ONLY the JSON object. 
 Format:
@@ -141,150 +350,373 @@ Format:
   "inspired": ["List of names"]
 }}
 """
-        
-        print(f"  🤖 Interrogation du LLM pour {scientist_name}...")
-        
-        # Check cache first
-        cached_result = self.cache.get(text, scientist_name)
-        if cached_result is not None:
-            print(f"  📦 Résultat trouvé en cache!")
-            return cached_result
-        
-        result = None
-        
-        # 1. Cerebras
-        if self.use_cerebras:
-            result = self._call_cerebras(prompt)
-        
-        # 2. Groq
-        if result is None and self.use_groq:
-            result = self._call_groq(prompt)
 
-        # 3. Mistral
-        if result is None and self.use_mistral:
-            result = self._call_mistral(prompt)
-            
-        # 4. OpenAI
-        if result is None and OPENAI_API_KEY:
-             result = self._call_openai(prompt)
-             
-        # 5. Ollama
-        if result is None:
-            if self.use_cerebras or self.use_groq or self.use_mistral or OPENAI_API_KEY:
-                print("  ⚠️ Échec de toutes les APIs cloud -> Tentative locale avec OLLAMA 🦙")
-            result = self._call_ollama(prompt)
-        
-        final_result = result if result else {"inspired_by": [], "inspired": []}
+    def _build_batch_prompt(self, items: List[Tuple[str, str, List[str]]]) -> str:
+        """
+        Prompt d'extraction pour plusieurs scientifiques : une clé JSON par scientifique.
+        items : (nom, texte, personnes liées depuis sa page).
+        """
+        texts = "\n\n".join(
+            f'### SCIENTIST: "{name}"\n{text}'
+            + (f"\nPeople linked from this page (exact spellings): {', '.join(linked)}" if linked else "")
+            for name, text, linked in items
+        )
+        example = ",\n".join(f'  "{name}": {{"inspired_by": [...], "inspired": [...]}}' for name, _, _ in items)
+        return f"""You are a world expert in the history of science.
+
+TASK: For EACH scientist below, analyze the provided text and extract their intellectual network.
+For each one you must identify:
+1. "inspired_by": Mentors, teachers, and scientists who influenced them.
+2. "inspired": Students, successors, and scientists influenced by them.
+
+### CRITICAL RULES:
+- OUTPUT MUST BE VALID JSON.
+- One top-level key per scientist, spelled EXACTLY as in the "### SCIENTIST:" headers.
+- USE "Firstname Lastname" format (No surname alone).
+- Inner keys MUST be exactly "inspired_by" and "inspired".
+- Only use the text of each scientist for that scientist. Do not invent information.
+
+## TEXTS TO ANALYZE:
+{texts}
+
+### FINAL INSTRUCTION:
+Return ONLY the JSON object. 
+Format:
+{{
+{example}
+}}
+"""
+
+    def _extract_batch(self, items: List[Tuple[str, str, List[str]]]) -> Dict[str, Optional[Dict]]:
+        """
+        Une requête pour plusieurs (nom, texte, liens). Retourne {nom: résultat}, résultat = None
+        si le scientifique manque dans la réponse (il sera alors interrogé seul).
+        """
+        names = [name for name, _, _ in items]
+        print(f"  📦 Requête groupée: {len(items)} scientifiques ({', '.join(names)})")
+        # Prompt groupé construit par chaque fournisseur, dans son budget de tokens
+        raw = self.router.call(self._providers(schema=None), BatchRequest(items)) or {}
         
-        # Store in cache
-        self.cache.set(text, scientist_name, final_result)
-            
-        return final_result
+        # Tolérance sur la casse des clés renvoyées par le modèle
+        by_lower = {str(key).strip().lower(): value for key, value in raw.items()}
+        # Chaque entrée est validée comme une réponse simple (alias de clés, noms uniquement)
+        return {name: normalize_relations(raw.get(name, by_lower.get(name.lower()))) for name in names}
     
-    def _call_cerebras(self, prompt: str) -> Optional[Dict]:
+    async def extract_relations_async(self, text: str, scientist_name: str, links: Optional[List[str]] = None,
+                                      page_title: Optional[str] = None, revision_id: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Version asynchrone de extract_relations.
+        L'appel bloquant tourne dans un thread : plusieurs extractions peuvent être en vol
+        en même temps (asyncio.gather) en partageant les connexions poolées de chaque fournisseur.
+        """
+        return await asyncio.to_thread(self.extract_relations, text, scientist_name, links, page_title, revision_id)
+
+    def _render(self, provider: str, prompt) -> Tuple[str, str]:
+        """(prompt du fournisseur, libellé du journal) pour un ExtractionRequest, un BatchRequest ou un prompt déjà construit."""
+        if isinstance(prompt, ExtractionRequest):
+            return self.prompts.build(provider, prompt), prompt.scientist_name
+        if isinstance(prompt, BatchRequest):
+            return self.prompts.build_batch(provider, prompt), "batch"
+        return prompt, "batch"
+
+    @staticmethod
+    def _stream_parser(on_name) -> Optional[RelationsStreamParser]:
+        """Lecteur incrémental si la réponse doit être reçue en streaming, None sinon."""
+        return RelationsStreamParser(on_name) if on_name is not None and LLM_STREAMING else None
+
+    @staticmethod
+    def _read_sse(response, parser: RelationsStreamParser) -> Tuple[str, dict]:
+        """Réponse en streaming d'une API compatible OpenAI (Server-Sent Events) : (texte, usage)."""
+        usage = {}
+        for line in response.iter_lines(chunk_size=None):
+            line = line.decode("utf-8") if isinstance(line, bytes) else line
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            usage = chunk.get("usage") or usage
+            for choice in chunk.get("choices") or []:
+                piece = (choice.get("delta") or {}).get("content")
+                if piece:
+                    parser.feed(piece)
+        return parser.text, usage
+
+    @staticmethod
+    def _read_sdk_stream(stream, parser: RelationsStreamParser) -> Tuple[str, Any]:
+        """Réponse en streaming des SDK Groq / OpenAI : (texte, usage du dernier fragment qui en porte un)."""
+        usage = None
+        for chunk in stream:
+            usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None) or usage
+            for choice in chunk.choices or []:
+                piece = getattr(choice.delta, "content", None)
+                if piece:
+                    parser.feed(piece)
+        return parser.text, usage
+
+    def _call_cerebras(self, prompt, schema: Optional[dict] = None, on_name=None) -> Optional[Dict]:
         """Appel à l'API Cerebras."""
         if not CEREBRAS_API_KEY: return None
+        prompt, label = self._render("cerebras", prompt)
+        parser = self._stream_parser(on_name)
         try:
-            response = requests.post(
+            throttle(CEREBRAS_API_URL)
+            start = time.monotonic()
+            response = self._session("cerebras").post(
                 f"{CEREBRAS_API_URL.rstrip('/')}/chat/completions",
                 headers={"Authorization": f"Bearer {CEREBRAS_API_KEY}", "Content-Type": "application/json"},
                 json={
                     "model": CEREBRAS_MODEL,
                     "messages": [{"role": "system", "content": "JSON only."}, {"role": "user", "content": prompt}],
                     "temperature": 0.1,
+                    "response_format": response_format("cerebras", schema),
+                    "stream": parser is not None,
                 },
                 timeout=60,
+                stream=parser is not None,
             )
             if response.status_code != 200:
+                self._check_rate_limit("cerebras", response)
                 print(f"  ⚠️ Erreur Cerebras: {response.status_code}")
                 return None
             
-            return self._parse_json_response(response.json()["choices"][0]["message"]["content"])
+            if parser is not None:
+                content, usage = self._read_sse(response, parser)
+            else:
+                data = response.json()
+                content, usage = data["choices"][0]["message"]["content"], data.get("usage") or {}
+            self.usage.record("cerebras", label, prompt, usage.get("prompt_tokens"), usage.get("completion_tokens"), time.monotonic() - start)
+            return self._parse_json_response(content, schema)
         except Exception as e:
             print(f"  ⚠️ Exception Cerebras: {e}")
             return None
             
-    def _call_groq(self, prompt: str) -> Optional[Dict]:
+    def _call_groq(self, prompt, schema: Optional[dict] = None, on_name=None) -> Optional[Dict]:
         """Appel à l'API Groq."""
+        prompt, label = self._render("groq", prompt)
+        parser = self._stream_parser(on_name)
         try:
-            from groq import Groq
-            client = Groq(api_key=GROQ_API_KEY)
+            client = self._sdk_client("groq")
+            throttle("api.groq.com")
+            start = time.monotonic()
             completion = client.chat.completions.create(
                 messages=[{"role": "system", "content": "JSON only."}, {"role": "user", "content": prompt}],
                 model=GROQ_MODEL,
                 temperature=0.1,
-                response_format={"type": "json_object"},
+                response_format=response_format("groq", schema),
+                stream=parser is not None,
             )
-            return self._parse_json_response(completion.choices[0].message.content)
+            if parser is not None:
+                content, usage = self._read_sdk_stream(completion, parser)
+            else:
+                content, usage = completion.choices[0].message.content, getattr(completion, "usage", None)
+            self._record_sdk_usage("groq", label, prompt, usage, start)
+            return self._parse_json_response(content, schema)
         except Exception as e:
+            if getattr(e, "status_code", None) == 429:
+                self.router.record_rate_limit("groq")
             print(f"  ⚠️ Erreur Groq: {e}")
             return None
 
-    def _call_mistral(self, prompt: str) -> Optional[Dict]:
+    def _call_mistral(self, prompt, schema: Optional[dict] = None, on_name=None) -> Optional[Dict]:
         """Appel à l'API Mistral."""
         if not MISTRAL_API_KEY: return None
+        prompt, label = self._render("mistral", prompt)
+        parser = self._stream_parser(on_name)
         try:
-            response = requests.post(
+            throttle(MISTRAL_API_URL)
+            start = time.monotonic()
+            response = self._session("mistral").post(
                 f"{MISTRAL_API_URL.rstrip('/')}/v1/chat/completions",
                 headers={"Authorization": f"Bearer {MISTRAL_API_KEY}", "Content-Type": "application/json"},
                 json={
                     "model": MISTRAL_MODEL,
                     "messages": [{"role": "system", "content": "JSON only."}, {"role": "user", "content": prompt}],
                     "temperature": 0.1,
+                    "response_format": response_format("mistral", schema),
+                    "stream": parser is not None,
                 },
                 timeout=60,
+                stream=parser is not None,
             )
             if response.status_code != 200:
+                self._check_rate_limit("mistral", response)
                 print(f"  ⚠️ Erreur Mistral: {response.status_code}")
                 return None
-            return self._parse_json_response(response.json()["choices"][0]["message"]["content"])
+            if parser is not None:
+                content, usage = self._read_sse(response, parser)
+            else:
+                data = response.json()
+                content, usage = data["choices"][0]["message"]["content"], data.get("usage") or {}
+            self.usage.record("mistral", label, prompt, usage.get("prompt_tokens"), usage.get("completion_tokens"), time.monotonic() - start)
+            return self._parse_json_response(content, schema)
         except Exception as e:
             print(f"  ⚠️ Exception Mistral: {e}")
             return None
     
-    def _call_ollama(self, prompt: str) -> Optional[Dict]:
+    def _call_ollama(self, prompt, schema: Optional[dict] = None, on_name=None) -> Optional[Dict]:
         """Appel à Ollama."""
+        prompt, label = self._render("ollama", prompt)
+        parser = self._stream_parser(on_name)
         try:
-            response = requests.post(
+            throttle(OLLAMA_URL)
+            start = time.monotonic()
+            response = self._session("ollama").post(
                 f"{OLLAMA_URL}/api/generate",
-                json={"model": OLLAMA_MODEL, "prompt": prompt, "stream": False, "options": {"temperature": 0.1}, "format": "json"},
-                timeout=120
+                json={"model": OLLAMA_MODEL, "prompt": prompt, "stream": parser is not None, "options": {"temperature": 0.1}, "format": ollama_format(schema)},
+                timeout=120,
+                stream=parser is not None,
             )
             if response.status_code != 200:
                 print(f"  ⚠️ Erreur Ollama: {response.status_code}")
                 return None
             
-            return self._parse_json_response(response.json().get('response', '{}'))
+            if parser is not None:
+                # Une ligne JSON par fragment ; la dernière (done) porte les compteurs de tokens
+                data = {}
+                for line in response.iter_lines(chunk_size=None):
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    parser.feed(data.get("response", ""))
+                    if data.get("done"):
+                        break
+                content = parser.text
+            else:
+                data = response.json()
+                content = data.get('response', '{}')
+            self.usage.record("ollama", label, prompt, data.get("prompt_eval_count"), data.get("eval_count"), time.monotonic() - start)
+            return self._parse_json_response(content, schema)
         except Exception as e:
             print(f"  ⚠️ Exception Ollama: {e}")
             return None
     
-    def _call_openai(self, prompt: str) -> Optional[Dict]:
+    def _call_openai(self, prompt, schema: Optional[dict] = None, on_name=None) -> Optional[Dict]:
         """Appel à l'API OpenAI (v1.0+)."""
         if not OPENAI_API_KEY: return None
+        prompt, label = self._render("openai", prompt)
+        parser = self._stream_parser(on_name)
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=OPENAI_API_KEY)
+            client = self._sdk_client("openai")
+            throttle("api.openai.com")
+            start = time.monotonic()
             response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
+                model=OPENAI_MODEL,
                 messages=[{"role": "user", "content": prompt}],
-                temperature=0.1
+                temperature=0.1,
+                response_format=response_format("openai", schema),
+                **({"stream": True, "stream_options": {"include_usage": True}} if parser is not None else {}),
             )
-            return self._parse_json_response(response.choices[0].message.content)
+            if parser is not None:
+                content, usage = self._read_sdk_stream(response, parser)
+            else:
+                content, usage = response.choices[0].message.content, getattr(response, "usage", None)
+            self._record_sdk_usage("openai", label, prompt, usage, start)
+            return self._parse_json_response(content, schema)
         except ImportError:
              print("  ⚠️ Module 'openai' non trouvé.")
              return None
         except Exception as e:
+            if getattr(e, "status_code", None) == 429:
+                self.router.record_rate_limit("openai")
             print(f"  ⚠️ Erreur OpenAI: {e}")
             return None
     
-    def _parse_json_response(self, response: str) -> Dict[str, List[str]]:
-        """Parse la réponse JSON."""
+    def _record_sdk_usage(self, provider: str, label: str, prompt: str, usage, start: float) -> None:
+        """Consommation d'une réponse des SDK Groq / OpenAI (objet usage, absent sur certains modèles)."""
+        self.usage.record(provider, label, prompt, getattr(usage, "prompt_tokens", None),
+                          getattr(usage, "completion_tokens", None), time.monotonic() - start)
+    
+    def _parse_json_response(self, response: str, schema: Optional[dict] = None) -> Optional[Dict]:
+        """
+        Parse la réponse JSON (réparée localement si besoin : virgules en trop, réponse tronquée...).
+        Avec un schéma, le résultat est validé (alias de clés acceptés). Retourne None si rien
+        d'exploitable : le routeur passe alors au fournisseur suivant.
+        """
+        result = parse_relations(response) if schema is not None else parse_object(response)
+        if result is None:
+            print(f"  ⚠️ Réponse JSON inexploitable: {(response or '')[:80]!r}")
+        return result
+
+
+class ExtractionBatcher:
+    """
+    Regroupe les extractions courtes soumises en parallèle (par les threads du crawler)
+    en une seule requête, dans la limite d'un budget de tokens.
+    
+    Le premier thread d'un lot en est le "leader" : il attend au plus LLM_BATCH_WAIT secondes
+    (ou que le lot soit plein, ou que toutes les extractions en cours y soient), envoie la requête
+    groupée et distribue les résultats. Sans autre extraction en cours (crawl séquentiel), il n'attend pas.
+    """
+    
+    def __init__(self, run_batch, token_budget: int = LLM_BATCH_TOKEN_BUDGET,
+                 max_items: int = LLM_BATCH_MAX_ITEMS, max_wait: float = LLM_BATCH_WAIT):
+        self.run_batch = run_batch
+        self.token_budget = token_budget
+        self.max_items = max_items
+        self.max_wait = max_wait
+        self._pending = []
+        self._tokens = 0
+        self._active = 0  # extractions en cours (voir active())
+        self._cond = threading.Condition()
+    
+    @contextmanager
+    def active(self):
+        """Marks one extraction in progress: a potential member of the next batch."""
+        with self._cond:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+    
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        # Approximation grossière : ~4 caractères par token
+        return len(text) // 4 + 1
+    
+    def _full(self) -> bool:
+        return self._tokens >= self.token_budget or len(self._pending) >= self.max_items
+    
+    def _ready(self) -> bool:
+        # Plus personne ne peut rejoindre le lot : inutile d'attendre la fin du délai
+        return self._full() or self._active <= len(self._pending)
+    
+    def submit(self, scientist_name: str, text: str, links: Optional[List[str]] = None) -> Optional[Dict]:
+        """Résultat de ce scientifique, ou None s'il doit être interrogé seul."""
+        item = {"name": scientist_name, "text": text, "links": links or [], "done": threading.Event(), "result": None}
+        cost = self.estimate_tokens(text)
+        
+        with self._cond:
+            # Le texte ne tient pas dans le lot en cours : on le laisse partir seul
+            if self._pending and self._tokens + cost > self.token_budget:
+                self._cond.notify_all()
+                return None
+            self._pending.append(item)
+            self._tokens += cost
+            leader = len(self._pending) == 1
+            if self._ready():
+                self._cond.notify_all()
+        
+        if leader:
+            with self._cond:
+                self._cond.wait_for(self._ready, timeout=self.max_wait)
+                batch, self._pending, self._tokens = self._pending, [], 0
+            self._dispatch(batch)
+        
+        item["done"].wait()
+        return item["result"]
+    
+    def _dispatch(self, batch: list) -> None:
         try:
-            start = response.find('{')
-            end = response.rfind('}') + 1
-            if start != -1 and end > start:
-                return json.loads(response[start:end])
-        except json.JSONDecodeError:
-            pass
-        return {"inspired_by": [], "inspired": []}
+            # Un seul texte : rien à regrouper, l'appelant fait une requête simple
+            if len(batch) > 1:
+                results = self.run_batch([(item["name"], item["text"], item["links"]) for item in batch])
+                for item in batch:
+                    item["result"] = results.get(item["name"])
+        finally:
+            for item in batch:
+                item["done"].set()
@@ -0,0 +1,98 @@
+"""
+Metadata Stores
+===============
+Small persistent key -> record stores kept next to the LLM cache:
+- Append-only JSON Lines file (one record per line, last write wins)
+- Loaded once in memory, so lookups never touch the disk
+- Thread-safe writes (shared by the crawler workers)
+"""
+
+import json
+import os
+import threading
+from typing import Optional, Dict, Any
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+
+class JsonlStore:
+    """Dictionary persisted as an append-only JSON Lines log."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self._records[entry["key"]] = entry["record"]
+                except (json.JSONDecodeError, KeyError):
+                    # Ligne tronquée (crash pendant l'écriture) : on l'ignore
+                    continue
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._records.get(key)
+
+    def put(self, key: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._records[key] = record
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({"key": key, "record": record}, ensure_ascii=False) + "\n")
+            except IOError as e:
+                print(f"  ⚠️ Store write error ({os.path.basename(self.path)}): {e}")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class PersonStore(JsonlStore):
+    """Birth/death years and resolved Wikipedia title, keyed by the name as written by the LLM."""
+
+    def __init__(self, path: str = os.path.join(STORE_DIR, "persons.jsonl")):
+        super().__init__(path)
+
+    def set_person(self, name: str, title: Optional[str], birth_year: Optional[int], death_year: Optional[int]) -> None:
+        self.put(name, {"title": title, "birth_year": birth_year, "death_year": death_year})
+
+
+class TitleIndex(JsonlStore):
+    """
+    Alias -> canonical Wikipedia title, as decided by the fuzzy search of WikipediaClient.
+    Rejected corrections are stored too, so a name is never searched twice.
+    """
+
+    def __init__(self, path: str = os.path.join(STORE_DIR, "titles.jsonl")):
+        super().__init__(path)
+
+    def set_resolution(self, alias: str, title: str, candidate: Optional[str], accepted: bool, similarity: Optional[float] = None) -> None:
+        self.put(alias, {
+            "title": title,
+            "candidate": candidate,
+            "accepted": accepted,
+            "similarity": round(similarity, 3) if similarity is not None else None,
+        })
+
+    def resolved(self, alias: str) -> Optional[str]:
+        """Title to load for this alias, or None if the alias was never resolved."""
+        record = self.get(alias)
+        return record["title"] if record else None
+
+    def accepted_corrections(self) -> Dict[str, str]:
+        """All accepted alias -> title corrections (aliases already canonical are skipped)."""
+        return {
+            alias: record["title"]
+            for alias, record in self._records.items()
+            if record["accepted"] and record["title"] != alias
+        }
@@ -0,0 +1,84 @@
+"""
+Name Filter
+===========
+Shared, precompiled filters for candidate scientist names:
+- BLACKLIST terms compiled into one case-insensitive alternation
+  (same result as `term.lower() in name.lower()` for every term)
+- EXCLUSION_PATTERNS compiled once into a single regex
+- Verdicts memoised per name (the same names come back from many pages)
+- KeywordMatcher: whole-word keyword lists of the cleaning scripts,
+  compiled once instead of one `re.search` per keyword and per node
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from config import BLACKLIST, EXCLUSION_PATTERNS
+
+# Noms mémorisés (un crawl complet en voit quelques dizaines de milliers)
+VERDICT_CACHE_SIZE = 65536
+
+
+def _alternation(terms: Iterable[str]) -> str:
+    # Les termes les plus longs d'abord : le premier terme trouvé est le plus spécifique
+    return "|".join(re.escape(term) for term in sorted(set(terms), key=len, reverse=True))
+
+
+class NameFilter:
+    """Blacklist + exclusion patterns, each compiled into one regex."""
+
+    def __init__(self, blacklist: Iterable[str] = BLACKLIST, patterns: Iterable[str] = EXCLUSION_PATTERNS):
+        blacklist = [term for term in blacklist if term]
+        patterns = list(patterns)
+        self._blacklist = re.compile(_alternation(blacklist), re.IGNORECASE) if blacklist else None
+        self._exclusion = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE) if patterns else None
+        self.rejection_reason = lru_cache(maxsize=VERDICT_CACHE_SIZE)(self._rejection_reason)
+
+    def blacklisted_term(self, name: str) -> Optional[str]:
+        """The blacklist term contained in `name`, or None."""
+        if self._blacklist is None:
+            return None
+        match = self._blacklist.search(name)
+        return match.group(0) if match else None
+
+    def is_blacklisted(self, name: str) -> bool:
+        return self.rejection_reason(name) == "blacklist"
+
+    def matches_exclusion(self, name: str) -> bool:
+        """True if an exclusion pattern (concept, institution, group...) matches `name`."""
+        return self._exclusion is not None and self._exclusion.search(name) is not None
+
+    def _rejection_reason(self, name: str) -> Optional[str]:
+        if self.blacklisted_term(name) is not None:
+            return "blacklist"
+        if self.matches_exclusion(name):
+            return "pattern"
+        return None
+
+    def is_rejected(self, name: str) -> bool:
+        """Blacklisted or matching an exclusion pattern (memoised)."""
+        return self.rejection_reason(name) is not None
+
+
+class KeywordMatcher:
+    """Whole-word, case-insensitive search for any keyword of a list."""
+
+    def __init__(self, keywords: Iterable[str]):
+        self._regex = re.compile(rf"\b(?:{_alternation(keywords)})\b", re.IGNORECASE)
+
+    def search(self, text: str) -> Optional[str]:
+        """The first keyword found in `text` (lower-cased), or None."""
+        match = self._regex.search(text)
+        return match.group(0).lower() if match else None
+
+
+_default_filter = None
+
+
+def get_name_filter() -> NameFilter:
+    """Filter built from config.BLACKLIST and config.EXCLUSION_PATTERNS (shared instance)."""
+    global _default_filter
+    if _default_filter is None:
+        _default_filter = NameFilter()
+    return _default_filter
@@ -0,0 +1,236 @@
+"""
+Prompt Builder
+==============
+Fits an extraction prompt into the token budget of each LLM provider:
+- Tokens counted with tiktoken when it is installed (encoding of the
+  provider's model, cl100k_base for non-OpenAI models), ~4 characters
+  per token otherwise
+- Link hint: page links that look like person names, deduplicated,
+  rejected names dropped, names cited in the text first; it takes at
+  most LLM_LINK_HINT_SHARE of the budget
+- The text windows get the rest of the budget (re-selected with
+  text_windowing when they do not fit)
+- Batch prompts (several short texts) fit the same budget: the link hint
+  share is dealt out in turn to the scientists, then short texts are
+  kept whole and the longer ones share what is left
+- UsageLog: token usage and duration of every call, one JSON line per
+  call, plus running totals per provider
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import (
+    CEREBRAS_MODEL,
+    GROQ_MODEL,
+    MISTRAL_MODEL,
+    OLLAMA_MODEL,
+    OPENAI_MODEL,
+    LLM_PROMPT_BUDGETS,
+    LLM_DEFAULT_PROMPT_BUDGET,
+    LLM_LINK_HINT_MAX,
+    LLM_LINK_HINT_SHARE,
+    LLM_USAGE_LOG,
+)
+from name_filter import get_name_filter
+from text_windowing import estimate_tokens, person_link_titles, select_relevant_windows
+
+PROVIDER_MODELS = {
+    "cerebras": CEREBRAS_MODEL,
+    "groq": GROQ_MODEL,
+    "mistral": MISTRAL_MODEL,
+    "openai": OPENAI_MODEL,
+    "ollama": OLLAMA_MODEL,
+}
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: Optional[str]):
+    """tiktoken encoding of `model`, or None if tiktoken is not installed."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model or "")
+    except KeyError:
+        # Modèle non-OpenAI (Llama, Mistral...) : approximation avec l'encodage GPT-4
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Token count of `text` for `model` (estimated if tiktoken is not installed)."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@dataclass
+class ExtractionRequest:
+    """
+    One single-scientist extraction, rendered into a prompt per provider.
+    `text` is the windowed text used as cache key; `links` are the page links.
+    """
+    scientist_name: str
+    text: str
+    links: List[str] = field(default_factory=list)
+
+
+@dataclass
+class BatchRequest:
+    """Several short extractions answered by one prompt (one JSON key per scientist)."""
+    items: List[Tuple[str, str, List[str]]]  # (nom, texte fenêtré, liens de la page)
+
+
+class PromptBuilder:
+    """Renders an ExtractionRequest or a BatchRequest within the prompt budget of a provider."""
+
+    def __init__(self, render: Callable[[str, str, List[str]], str],
+                 render_batch: Optional[Callable[[List[Tuple[str, str]]], str]] = None,
+                 budgets: Dict[str, int] = LLM_PROMPT_BUDGETS, default_budget: int = LLM_DEFAULT_PROMPT_BUDGET,
+                 hint_max: int = LLM_LINK_HINT_MAX, hint_share: float = LLM_LINK_HINT_SHARE):
+        # render(texte, nom, noms liés) -> prompt complet ; render_batch([(nom, texte, noms liés)]) -> prompt groupé
+        self.render = render
+        self.render_batch = render_batch
+        self.budgets = budgets
+        self.default_budget = default_budget
+        self.hint_max = hint_max
+        self.hint_share = hint_share
+
+    def budget(self, provider: str) -> int:
+        return self.budgets.get(provider, self.default_budget)
+
+    def link_candidates(self, request: ExtractionRequest) -> List[str]:
+        """Person-like links, names cited in the text first, then the others in page order."""
+        name_filter = get_name_filter()
+        names = [
+            name for name in person_link_titles(request.links)
+            if name != request.scientist_name and not name_filter.is_rejected(name)
+        ]
+        cited = [name for name in names if name in request.text]
+        return (cited + [name for name in names if name not in request.text])[:self.hint_max]
+
+    def build(self, provider: str, request: ExtractionRequest) -> str:
+        model = PROVIDER_MODELS.get(provider)
+        budget = self.budget(provider)
+        overhead = count_tokens(self.render("", request.scientist_name, []), model)
+
+        # 1. Liste de liens, dans la limite de sa part du budget
+        hint = []
+        hint_tokens = 0
+        hint_budget = int(budget * self.hint_share)
+        for name in self.link_candidates(request):
+            cost = count_tokens(name, model) + 1  # séparateur ", "
+            if hint_tokens + cost > hint_budget:
+                break
+            hint.append(name)
+            hint_tokens += cost
+
+        # 2. Le texte prend le reste ; resélection des fenêtres s'il dépasse
+        text = self._fit(request.text, request.links, max(budget - overhead - hint_tokens, 0), model)
+        return self.render(text, request.scientist_name, hint)
+
+    def build_batch(self, provider: str, request: BatchRequest) -> str:
+        model = PROVIDER_MODELS.get(provider)
+        budget = self.budget(provider)
+        overhead = count_tokens(self.render_batch([(name, "", []) for name, _, _ in request.items]), model)
+
+        # 1. Listes de liens : la part du budget est distribuée nom par nom, à tour de rôle
+        candidates = [self.link_candidates(ExtractionRequest(name, text, links)) for name, text, links in request.items]
+        hints: List[List[str]] = [[] for _ in request.items]
+        hint_tokens = 0
+        hint_budget = int(budget * self.hint_share)
+        for rank in range(max(map(len, candidates), default=0)):
+            for index, names in enumerate(candidates):
+                if rank >= len(names):
+                    continue
+                cost = count_tokens(names[rank], model) + 1  # séparateur ", "
+                if hint_tokens + cost > hint_budget:
+                    continue
+                hints[index].append(names[rank])
+                hint_tokens += cost
+        # En-tête de chaque liste non vide (mesuré sur le rendu d'un scientifique fictif)
+        header = max(count_tokens(self.render_batch([("", "", ["x"])]), model)
+                     - count_tokens(self.render_batch([("", "", [])]), model), 0)
+        hint_tokens += header * sum(1 for hint in hints if hint)
+        remaining = max(budget - overhead - hint_tokens, 0)
+
+        # 2. Partage équitable : les textes courts sont gardés entiers, les longs se partagent le reste
+        tokens = [count_tokens(text, model) for _, text, _ in request.items]
+        shares = [0] * len(tokens)
+        order = sorted(range(len(tokens)), key=tokens.__getitem__)
+        for rank, index in enumerate(order):
+            shares[index] = min(tokens[index], remaining // (len(order) - rank))
+            remaining -= shares[index]
+
+        items = [
+            (name, text if tokens[i] <= shares[i] else self._fit(text, links, shares[i], model), hints[i])
+            for i, (name, text, links) in enumerate(request.items)
+        ]
+        return self.render_batch(items)
+
+    @staticmethod
+    def _fit(text: str, links: List[str], text_budget: int, model: Optional[str]) -> str:
+        """`text` re-windowed (then cut) to at most `text_budget` tokens."""
+        tokens = count_tokens(text, model)
+        for _ in range(3):
+            if tokens <= text_budget:
+                break
+            # select_relevant_windows compte ~4 caractères par token : budget ajusté au ratio réel
+            ratio = estimate_tokens(text) / max(tokens, 1)
+            text = select_relevant_windows(text, links, token_budget=int(text_budget * ratio * 0.95))
+            tokens = count_tokens(text, model)
+        if tokens > text_budget:
+            text = text[:text_budget * 4]
+        return text
+
+
+class UsageLog:
+    """Token usage of every LLM call: JSONL log (LLM_USAGE_LOG) and totals per provider."""
+
+    def __init__(self, path: Optional[str] = LLM_USAGE_LOG):
+        self.path = path
+        self.totals: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, label: str, prompt: str, prompt_tokens: Optional[int],
+               completion_tokens: Optional[int], seconds: float) -> None:
+        """
+        `prompt_tokens` / `completion_tokens` as reported by the provider (None if not reported:
+        the prompt is then counted locally).
+        """
+        model = PROVIDER_MODELS.get(provider)
+        estimated = prompt_tokens is None
+        if estimated:
+            prompt_tokens = count_tokens(prompt, model)
+        record = {
+            "time": time.time(),
+            "provider": provider,
+            "model": model,
+            "node": label,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "estimated": estimated,
+            "seconds": round(seconds, 3),
+        }
+        print(f"  🧮 {provider}: {prompt_tokens} + {completion_tokens or '?'} tokens en {seconds:.1f}s")
+
+        with self._lock:
+            totals = self.totals.setdefault(provider, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0})
+            totals["calls"] += 1
+            totals["prompt_tokens"] += prompt_tokens
+            totals["completion_tokens"] += completion_tokens or 0
+            totals["seconds"] += seconds
+            if self.path:
+                try:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                except OSError as e:
+                    print(f"  ⚠️ Journal de consommation inaccessible: {e}")
@@ -0,0 +1,229 @@
+"""
+LLM Provider Router
+===================
+Health-aware routing across the configured LLM providers:
+- Rolling latency, error and 429 statistics per provider
+- Circuit breaker: a provider that keeps failing is skipped for a cool-down,
+  then a single probe call decides whether the circuit closes again
+- Optional hedged request: when the current provider exceeds its p95
+  latency, the next healthy provider is queried in parallel and the
+  first usable answer wins; at most ROUTER_HEDGE_BUDGET races are in
+  flight, so their losing calls cannot starve the primary calls
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+from config import (
+    CRAWL_WORKERS,
+    ROUTER_HEDGING,
+    ROUTER_HEDGE_MIN_DELAY,
+    ROUTER_HEDGE_BUDGET,
+    ROUTER_WINDOW,
+    ROUTER_MIN_SAMPLES,
+    ROUTER_FAILURE_THRESHOLD,
+    ROUTER_ERROR_RATE,
+    ROUTER_COOLDOWN,
+)
+
+Provider = Tuple[str, Callable[[str], Optional[Dict]]]
+
+
+class ProviderHealth:
+    """Rolling statistics and circuit state of one provider."""
+
+    def __init__(self, window: int = ROUTER_WINDOW):
+        self.samples = deque(maxlen=window)  # (latence en secondes, succès)
+        self.rate_limited = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.tripped = False   # circuit ouvert (ou semi-ouvert) jusqu'au prochain succès
+        self.probing = False   # appel de test en cours sur le circuit semi-ouvert
+        self._lock = threading.Lock()
+
+    def _trip(self, until: float) -> None:
+        self.tripped = True
+        self.probing = False
+        self.open_until = max(self.open_until, until)
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self.samples.append((latency, ok))
+            if ok:
+                self.consecutive_failures = 0
+                self.tripped = self.probing = False
+                return
+
+            self.consecutive_failures += 1
+            if self.probing:
+                # L'appel de test a échoué : nouveau délai complet
+                self._trip(time.monotonic() + ROUTER_COOLDOWN)
+                return
+            errors = sum(1 for _, success in self.samples if not success)
+            too_many_errors = (
+                len(self.samples) >= ROUTER_MIN_SAMPLES
+                and errors / len(self.samples) >= ROUTER_ERROR_RATE
+            )
+            if self.consecutive_failures >= ROUTER_FAILURE_THRESHOLD or too_many_errors:
+                self._trip(time.monotonic() + ROUTER_COOLDOWN)
+
+    def record_rate_limit(self, retry_after: Optional[float] = None) -> None:
+        """A 429 opens the circuit at once, for Retry-After seconds if the provider sent it."""
+        with self._lock:
+            self.rate_limited += 1
+            self._trip(time.monotonic() + (retry_after or ROUTER_COOLDOWN))
+
+    def is_available(self) -> bool:
+        """Circuit closed, or half-open with no probe in flight."""
+        with self._lock:
+            return not self.tripped or (time.monotonic() >= self.open_until and not self.probing)
+
+    def acquire(self) -> bool:
+        """
+        Permission to call the provider now. Once the delay has elapsed the circuit is
+        "half-open": a single caller gets through as the probe, the others wait for its result.
+        """
+        with self._lock:
+            if not self.tripped:
+                return True
+            if time.monotonic() < self.open_until or self.probing:
+                return False
+            self.probing = True
+            return True
+
+    def state(self) -> str:
+        with self._lock:
+            if not self.tripped:
+                return "closed"
+            return "open" if time.monotonic() < self.open_until or self.probing else "half-open"
+
+    def p95(self) -> Optional[float]:
+        """95th percentile of successful latencies, None until enough samples are collected."""
+        with self._lock:
+            latencies = sorted(latency for latency, ok in self.samples if ok)
+        if len(latencies) < ROUTER_MIN_SAMPLES:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = len(self.samples)
+            errors = sum(1 for _, ok in self.samples if not ok)
+        p95 = self.p95()
+        return {
+            "calls": total,
+            "error_rate": f"{(errors / total * 100) if total else 0:.1f}%",
+            "rate_limited": self.rate_limited,
+            "p95": f"{p95:.2f}s" if p95 is not None else None,
+            "circuit": self.state(),
+        }
+
+
+class ProviderRouter:
+    """Calls providers in priority order, skipping open circuits and hedging slow calls."""
+
+    def __init__(self, hedging: bool = ROUTER_HEDGING, max_workers: int = 2 * CRAWL_WORKERS):
+        self.hedging = hedging
+        self.health: Dict[str, ProviderHealth] = {}
+        self._health_lock = threading.Lock()
+        # Chaque course en vol peut garder un appel perdant dans le pool : places réservées en plus
+        self._pool = ThreadPoolExecutor(max_workers=max_workers + ROUTER_HEDGE_BUDGET, thread_name_prefix="llm-router")
+        self._hedge_slots = threading.Semaphore(ROUTER_HEDGE_BUDGET)
+
+    def _health(self, name: str) -> ProviderHealth:
+        with self._health_lock:
+            if name not in self.health:
+                self.health[name] = ProviderHealth()
+            return self.health[name]
+
+    def record_rate_limit(self, name: str, retry_after: Optional[float] = None) -> None:
+        print(f"  🚦 {name}: limite de débit atteinte (429), fournisseur mis en pause.")
+        self._health(name).record_rate_limit(retry_after)
+
+    def _ordered(self, providers: List[Provider]) -> Tuple[List[Provider], bool]:
+        """(candidates, forced): forced when every circuit is open and the candidate is called anyway."""
+        available = [p for p in providers if self._health(p[0]).is_available()]
+        if available:
+            return available, False
+        # Tous les circuits sont ouverts : on tente celui qui se rétablit le plus tôt
+        return ([min(providers, key=lambda p: self._health(p[0]).open_until)] if providers else []), True
+
+    def _release_when_done(self, futures) -> None:
+        """Give the hedge slot back once every call of the race has returned (winner and loser)."""
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    self._hedge_slots.release()
+
+        for future in futures:
+            future.add_done_callback(done)
+
+    def _timed(self, name: str, call: Callable[[str], Optional[Dict]], prompt: str) -> Optional[Dict]:
+        start = time.monotonic()
+        result = None
+        try:
+            result = call(prompt)
+        finally:
+            self._health(name).record(time.monotonic() - start, result is not None)
+        return result
+
+    def call(self, providers: List[Provider], prompt: str) -> Optional[Dict]:
+        """First usable result among the providers, or None if they all failed."""
+        candidates, forced = self._ordered(providers)
+
+        def usable(index: int) -> bool:
+            # Circuit semi-ouvert déjà testé par un autre thread : fournisseur sauté
+            return forced or self._health(candidates[index][0]).acquire()
+
+        i = 0
+        while i < len(candidates):
+            if not usable(i):
+                i += 1
+                continue
+            name, call = candidates[i]
+            pending = {self._pool.submit(self._timed, name, call, prompt)}
+
+            # Requête de couverture (hedge) si le fournisseur dépasse sa latence p95 habituelle
+            hedge_after = self._health(name).p95() if self.hedging else None
+            if hedge_after is not None and i + 1 < len(candidates):
+                # Plancher : on ne double pas une requête pour quelques millisecondes de gigue
+                hedge_after = max(hedge_after, ROUTER_HEDGE_MIN_DELAY)
+                done, _ = wait(pending, timeout=hedge_after)
+                # Budget de couverture épuisé : on attend simplement le premier fournisseur
+                if not done and self._hedge_slots.acquire(blocking=False):
+                    if usable(i + 1):
+                        i += 1
+                        hedge_name, hedge_call = candidates[i]
+                        print(f"  🏎️ {name} dépasse son p95 ({hedge_after:.1f}s) -> requête parallèle vers {hedge_name}")
+                        pending.add(self._pool.submit(self._timed, hedge_name, hedge_call, prompt))
+                        self._release_when_done(list(pending))
+                    else:
+                        self._hedge_slots.release()
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"  ⚠️ Erreur fournisseur LLM: {e}")
+                        result = None
+                    if result is not None:
+                        # Les requêtes encore en vol se terminent en arrière-plan (stats mises à jour)
+                        return result
+
+            i += 1
+            if i < len(candidates):
+                print(f"  ↪️ Échec -> tentative avec {candidates[i][0]}")
+        return None
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-provider health snapshot."""
+        return {name: health.snapshot() for name, health in list(self.health.items())}
@@ -0,0 +1,61 @@
+"""
+Per-Host Rate Limiter
+=====================
+Throttles outgoing requests host by host, shared by every crawler thread:
+- One minimum interval per host (see RATE_LIMITS in config.py)
+- Slots are reserved under a lock, the sleep happens outside of it
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+
+from config import RATE_LIMITS, DEFAULT_RATE_LIMIT
+
+
+class HostRateLimiter:
+    """Guarantees at least `min_interval` seconds between two requests."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Block until the caller is allowed to send its request."""
+        if self.min_interval <= 0:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def _interval_for(host: str) -> float:
+    for suffix, interval in RATE_LIMITS.items():
+        if host == suffix or host.endswith("." + suffix):
+            return interval
+    return DEFAULT_RATE_LIMIT
+
+
+def get_limiter(url_or_host: str) -> HostRateLimiter:
+    """Get or create the limiter of the host targeted by a URL (or a bare host name)."""
+    host = urlparse(url_or_host).hostname or url_or_host
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = HostRateLimiter(_interval_for(host))
+        return _limiters[host]
+
+
+def throttle(url_or_host: str) -> None:
+    """Wait for the next free slot of the host behind `url_or_host`."""
+    get_limiter(url_or_host).wait()
@@ -1,4 +1,9 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import networkx as nx
+from name_filter import KeywordMatcher
 
 def audit_graph(filename="output/scientist_graph.gexf"):
     print(f"🕵️‍♂️ Audit RAPIDE du graphe: {filename}")
@@ -23,6 +28,7 @@ def audit_graph(filename="output/scientist_graph.gexf"):
         "members", "followers", "residents", "list of", "history of",
         "nobel", "royal", "academy"
     ]
+    matcher = KeywordMatcher(keywords)
     
     for node_id, data in nodes:
         reason = None
@@ -41,14 +47,10 @@ def audit_graph(filename="output/scientist_graph.gexf"):
         
         # 2. Check Name Keywords (Concept/Orga)
         if not reason:
-            lower_name = node_id.lower()
-            for kw in keywords:
-                # On vérifie " word " ou " word" ou "word " pour éviter les faux positifs (ex: Law - Lawrence)
-                # Mais simplifions : si le mot est dans le nom
-                 import re
-                 if re.search(r'\b' + re.escape(kw) + r'\b', lower_name):
-                     reason = f"Mot-clé suspect: '{kw}'"
-                     break
+            # Mots entiers uniquement pour éviter les faux positifs (ex: Law - Lawrence)
+            kw = matcher.search(node_id)
+            if kw:
+                reason = f"Mot-clé suspect: '{kw}'"
 
         if reason:
             print(f"  🚩 SUSPECT: [{node_id}] -> {reason}")
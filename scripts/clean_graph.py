@@ -1,7 +1,7 @@
 import networkx as nx
-from wikipedia_client import WikipediaClient
-import re
-import time
+from wikipedia_client import WikipediaClient, BATCH_TITLES
+from name_filter import KeywordMatcher
+from enrichment_runner import EnrichmentRunner, years_lookup, write_gexf_atomic
 from llm_extractor import LLMExtractor
 
 def clean_and_repair(filename="output/scientist_graph.gexf"):
@@ -30,16 +30,15 @@ def clean_and_repair(filename="output/scientist_graph.gexf"):
     ]
     
     nodes_to_remove = []
+    # Une seule regex compilée pour tous les mots-clés (au lieu d'un re.search par mot-clé et par nœud)
+    matcher = KeywordMatcher(keywords)
     
     for node in list(graph.nodes()):
-        lower_name = node.lower()
-        
         # Keyword Check
-        for kw in keywords:
-             if re.search(r'\b' + re.escape(kw) + r'\b', lower_name):
-                 print(f"  🗑️ Suppression (Mot-clé '{kw}'): {node}")
-                 nodes_to_remove.append(node)
-                 break
+        kw = matcher.search(node)
+        if kw:
+             print(f"  🗑️ Suppression (Mot-clé '{kw}'): {node}")
+             nodes_to_remove.append(node)
         
         # Length Check (heuristic: nom trop long = description)
         if len(node) > 40:
@@ -59,40 +58,26 @@ def clean_and_repair(filename="output/scientist_graph.gexf"):
     nodes_to_repair = [n for n, d in graph.nodes(data=True) if int(d.get('birth_year', 0)) == 0]
     print(f"   {len(nodes_to_repair)} candidats à réparer.")
     
+    # Requêtes groupées en parallèle, point de reprise à côté du graphe (pas de GEXF intermédiaire)
+    runner = EnrichmentRunner("repair", filename, years_lookup(client), batch_size=BATCH_TITLES)
     try:
-        for i, node in enumerate(nodes_to_repair):
-            print(f"   [{i+1}/{len(nodes_to_repair)}] Réparation de: {node}")
-            try:
-                birth_year, _ = client.extract_years(node)
-                if birth_year:
-                    graph.nodes[node]['birth_year'] = int(birth_year)
-                    print(f"     ✅ Trouvé: {birth_year}")
-                    repaired_count += 1
-                else:
-                    print("     ❌ Pas trouvé.")
-            except Exception as e:
-                print(f"     ⚠️ Erreur: {e}")
-            
-            # Rate limit
-            if i % 10 == 0:
-                 time.sleep(0.5)
-
-            # Autosave periodically
-            if i > 0 and i % 50 == 0:
-                print(f"   💾 Autosave ({i}/{len(nodes_to_repair)})...")
-                nx.write_gexf(graph, filename)
-                
+        years = runner.run(nodes_to_repair)
     except KeyboardInterrupt:
-        print("\n🛑 Interruption utilisateur. Sauvegarde en cours...")
-        nx.write_gexf(graph, filename)
-        print("✅ Sauvegardé.")
+        print("🛑 Interruption utilisateur. Relancez pour reprendre la réparation.")
         return
 
+    for node, value in years.items():
+        birth_year = value[0] if value else None
+        if birth_year:
+            graph.nodes[node]['birth_year'] = int(birth_year)
+            repaired_count += 1
+
     print(f"✅ Étape 2 terminée: {repaired_count} nœuds réparés.")
 
     # --- SAVE ---
     final_nodes = graph.number_of_nodes()
-    nx.write_gexf(graph, filename)
+    write_gexf_atomic(graph, filename)
+    runner.finish()
     print("\n" + "="*40)
     print(f"🏁 TERMINÉ")
     print(f"Avant: {initial_nodes} -> Après: {final_nodes}")
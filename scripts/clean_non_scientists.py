@@ -11,7 +11,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import networkx as nx
 from visualizer import GraphVisualizer
-from config import BLACKLIST
+from name_filter import get_name_filter
 
 def main():
     gexf_path = "output/scientist_graph.gexf"
@@ -29,14 +29,16 @@ def main():
         'Engineering', 'Philosophy', 'Economics'
     ]
     
-    # Identifier les nœuds à supprimer (ceux sans domaine scientifique)
+    # Identifier les nœuds à supprimer (ceux sans domaine scientifique,
+    # ou rejetés par la liste noire / les patterns d'exclusion du crawler)
+    name_filter = get_name_filter()
     nodes_to_remove = []
     for node in g.nodes():
         field = g.nodes[node].get('field', None)
-        if not field or field == 'Other' or field not in scientific_fields:
+        if not field or field == 'Other' or field not in scientific_fields or name_filter.is_rejected(node):
             nodes_to_remove.append(node)
     
-    print(f"\n🗑️  {len(nodes_to_remove)} nœuds à supprimer (sans domaine scientifique)")
+    print(f"\n🗑️  {len(nodes_to_remove)} nœuds à supprimer (sans domaine scientifique ou exclus par nom)")
     
     # Quelques exemples de ce qui sera supprimé
     if nodes_to_remove:
@@ -2,6 +2,10 @@ import networkx as nx
 import os
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metadata_store import TitleIndex
+
 # Map of Variant -> Canonical Name
 DUPLICATE_MAPPING = {
     # Bose
@@ -83,7 +87,11 @@ def deduplicate_graph(input_file, output_file):
     
     merged_count = 0
     
-    for variant, canonical in DUPLICATE_MAPPING.items():
+    # Corrections already accepted by the crawler's fuzzy search (cache/titles.jsonl),
+    # the manual mapping takes precedence
+    corrections = {**TitleIndex().accepted_corrections(), **DUPLICATE_MAPPING}
+    
+    for variant, canonical in corrections.items():
         if variant == canonical:
             continue
             
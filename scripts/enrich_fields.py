@@ -1,6 +1,7 @@
 import networkx as nx
 import time
-from llm_extractor import LLMExtractor
+from wikipedia_client import WikipediaClient, BATCH_TITLES
+from enrichment_runner import EnrichmentRunner, fields_lookup, write_gexf_atomic
 import os
 
 def enrich_fields(input_file="output/scientist_graph.gexf", output_file="output/scientist_graph.gexf"):
@@ -11,11 +12,6 @@ def enrich_fields(input_file="output/scientist_graph.gexf", output_file="output/
         print("❌ Fichier introuvable.")
         return
 
-    llm = LLMExtractor()
-    if not llm.check_connection():
-        print("❌ Impossible de se connecter au LLM. Abandon.")
-        return
-
     nodes_to_process = []
     for node, data in graph.nodes(data=True):
         field = data.get('field', '').strip()
@@ -29,37 +25,28 @@ def enrich_fields(input_file="output/scientist_graph.gexf", output_file="output/
         print("✅ Tous les champs sont déjà remplis !")
         return
 
-    count = 0
     start_time = time.time()
-    
+    wiki = WikipediaClient()
+    # Domaine déduit des catégories Wikipedia (requêtes groupées en parallèle, reprise sur interruption)
+    runner = EnrichmentRunner("fields", output_file, fields_lookup(wiki), batch_size=BATCH_TITLES)
+
     try:
-        for scientist in nodes_to_process:
-            count += 1
-            print(f"[{count}/{total}] Enrichissement : {scientist}")
-            
-            field = llm.identify_field(scientist)
-            
-            # Mise à jour du graphe
+        fields = runner.run(nodes_to_process)
+    except KeyboardInterrupt:
+        return
+
+    count = 0
+    for scientist, field in fields.items():
+        if field:
             graph.nodes[scientist]['field'] = field
-            
-            # Autosave toutes les 20 requêtes
-            if count % 20 == 0:
-                nx.write_gexf(graph, output_file)
-                print(f"💾 Sauvegarde intermédiaire ({count} traités)...")
-                
-                # Petite pause pour éviter le rate limit si API
-                time.sleep(0.5)
+            count += 1
 
-    except KeyboardInterrupt:
-        print("\n⚠️ Interruption utilisateur. Sauvegarde en cours...")
-    except Exception as e:
-        print(f"\n❌ Erreur inattendue : {e}")
-    finally:
-        # Sauvegarde finale
-        nx.write_gexf(graph, output_file)
-        duration = time.time() - start_time
-        print(f"\n✅ Terminé ! {count}/{total} champs enrichis en {duration:.1f}s.")
-        print(f"💾 Graphe sauvegardé : {output_file}")
+    # Sauvegarde unique, puis le point de reprise devient inutile
+    write_gexf_atomic(graph, output_file)
+    runner.finish()
+    duration = time.time() - start_time
+    print(f"\n✅ Terminé ! {count}/{total} champs enrichis en {duration:.1f}s.")
+    print(f"💾 Graphe sauvegardé : {output_file}")
 
 if __name__ == "__main__":
     enrich_fields()
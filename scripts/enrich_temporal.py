@@ -13,7 +13,8 @@ import math
 # Add parent directory for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from wikipedia_client import WikipediaClient
+from wikipedia_client import WikipediaClient, BATCH_TITLES
+from enrichment_runner import EnrichmentRunner, years_lookup, write_gexf_atomic
 
 def temporal_weight(source_year: int, target_year: int, half_life: int = 50) -> float:
     """
@@ -48,31 +49,24 @@ def enrich_temporal_data(input_file: str, output_file: str):
     
     print(f"🕐 Enriching {len(nodes_to_enrich)} nodes with temporal data...")
     
+    # Batched lookups in parallel, checkpointed next to the output graph (resumable)
+    runner = EnrichmentRunner("years", output_file, years_lookup(wiki), batch_size=BATCH_TITLES)
+    try:
+        years = runner.run(nodes_to_enrich)
+    except KeyboardInterrupt:
+        return
+    
     enriched_count = 0
-    errors = 0
+    errors = len(nodes_to_enrich) - len(years)
     
-    for i, node in enumerate(nodes_to_enrich):
-        try:
-            birth, death = wiki.extract_years(node)
-            
-            if birth or death:
-                if birth:
-                    G.nodes[node]['birth_year'] = birth
-                if death:
-                    G.nodes[node]['death_year'] = death
-                enriched_count += 1
-                print(f"  [{i+1}/{len(nodes_to_enrich)}] {node}: {birth or '?'} - {death or '?'}")
-            else:
-                print(f"  [{i+1}/{len(nodes_to_enrich)}] {node}: No dates found")
-                
-        except Exception as e:
-            errors += 1
-            print(f"  [{i+1}/{len(nodes_to_enrich)}] {node}: Error - {e}")
-        
-        # Progress save every 50 nodes
-        if (i + 1) % 50 == 0:
-            print(f"  💾 Saving progress...")
-            nx.write_gexf(G, output_file)
+    for node, value in years.items():
+        birth, death = value or (None, None)
+        if birth or death:
+            if birth:
+                G.nodes[node]['birth_year'] = birth
+            if death:
+                G.nodes[node]['death_year'] = death
+            enriched_count += 1
     
     # Add temporal weights to edges
     print("\n⚡ Computing temporal edge weights...")
@@ -109,9 +103,10 @@ def enrich_temporal_data(input_file: str, output_file: str):
     
     print(f"   Added temporal weights to {weighted_count} edges")
     
-    # Final save
+    # Final save (the only GEXF write), then the checkpoint is no longer needed
     print(f"\n💾 Saving to: {output_file}")
-    nx.write_gexf(G, output_file)
+    write_gexf_atomic(G, output_file)
+    runner.finish()
     
     print(f"\n✅ Complete!")
     print(f"   Enriched: {enriched_count} nodes")
@@ -1,5 +1,9 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import networkx as nx
-import re
+from name_filter import KeywordMatcher
 
 def final_clean(filename="output/scientist_graph.gexf"):
     print(f"🧼 Finition du nettoyage sur: {filename}")
@@ -19,16 +23,14 @@ def final_clean(filename="output/scientist_graph.gexf"):
     ]
     
     nodes_to_remove = []
+    matcher = KeywordMatcher(keywords)
     
     for node in list(graph.nodes()):
-        lower_name = node.lower()
-        
         # Keyword Check
-        for kw in keywords:
-             if re.search(r'\b' + re.escape(kw) + r'\b', lower_name):
-                 print(f"  🗑️ Suppression Finale (Mot-clé '{kw}'): {node}")
-                 nodes_to_remove.append(node)
-                 break
+        kw = matcher.search(node)
+        if kw:
+             print(f"  🗑️ Suppression Finale (Mot-clé '{kw}'): {node}")
+             nodes_to_remove.append(node)
                  
     for n in nodes_to_remove:
         graph.remove_node(n)
@@ -1,7 +1,12 @@
 import networkx as nx
 import os
+import sys
 import shutil
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metadata_store import TitleIndex
+
 # Mapping of Duplicate -> Target (Canonical Name)
 MERGE_MAPPING = {
     # Henri Victor Regnault vs Henri Victor Régnault
@@ -84,8 +89,12 @@ def process_file(filepath):
         graph = nx.read_gexf(filepath)
         initial_count = graph.number_of_nodes()
         
+        # Corrections already accepted by the crawler's fuzzy search (cache/titles.jsonl),
+        # the manual mapping takes precedence
+        corrections = {**TitleIndex().accepted_corrections(), **MERGE_MAPPING}
+        
         merged_count = 0
-        for bad_name, good_name in MERGE_MAPPING.items():
+        for bad_name, good_name in corrections.items():
             # Check if both exist
             if bad_name in graph and good_name in graph:
                 merge_nodes(graph, bad_name, good_name)
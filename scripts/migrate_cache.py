@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Importe les entrées JSON historiques du cache LLM (cache/*.json) dans le cache SQLite.
+Usage: python3 scripts/migrate_cache.py [--compact] [--delete-json]
+"""
+
+import os
+import sys
+# Ajouter le dossier parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_manager import CACHE_DIR, SQLITE_FILENAME, JsonDirBackend, SqliteBackend, migrate_json_dir
+
+
+def main():
+    backend = SqliteBackend(os.path.join(CACHE_DIR, SQLITE_FILENAME))
+    before = backend.count()
+    imported = migrate_json_dir(CACHE_DIR, backend)
+    print(f"📦 {imported} entrées JSON importées ({before} -> {backend.count()} entrées dans {SQLITE_FILENAME})")
+    print(f"   Par version de prompt: {backend.count_by_version()}")
+
+    if "--delete-json" in sys.argv:
+        removed = JsonDirBackend(CACHE_DIR).clear()
+        print(f"🗑️ {removed} fichiers JSON supprimés")
+
+    if "--compact" in sys.argv:
+        backend.compact()
+        print("🧹 Base compactée (VACUUM)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Mock LLM Server
+===============
+Local stand-in for the LLM providers, for offline and deterministic
+throughput tests of LLMExtractor:
+- OpenAI-compatible chat completions (/v1/chat/completions and
+  /chat/completions, the Cerebras / Mistral / OpenAI / Groq shape) and
+  Ollama /api/generate, both with or without streaming (SSE / NDJSON)
+- Answers are replayed from the recorded extractions of the LLM cache
+  (cache/*.json and cache/llm_cache.sqlite3), looked up by the scientist
+  name of the prompt; unknown scientists get empty lists
+- Latency, server errors and 429 (with Retry-After) are injected at
+  configurable rates, with a fixed seed
+
+Usage:
+    python3 scripts/mock_llm_server.py [--port=8765] [--latency=0.5] [--jitter=0.2]
+        [--error-rate=0.05] [--rate-limit-rate=0.05] [--retry-after=2] [--chunk-delay=0.01] [--seed=0]
+    python3 scripts/mock_llm_server.py --bench=200 [--workers=16] [--provider=cerebras|mistral|ollama] [--stream] [--no-batching]
+
+Pointing the crawler at the server: OLLAMA_URL = "http://127.0.0.1:8765" and/or
+CEREBRAS_API_URL = "http://127.0.0.1:8765/v1", MISTRAL_API_URL = "http://127.0.0.1:8765"
+(any non-empty key) in config.py; the Groq / OpenAI SDKs follow GROQ_BASE_URL / OPENAI_BASE_URL.
+--bench starts the server in-process and drives LLMExtractor against it with a temporary cache.
+"""
+
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.request import pathname2url
+
+# Ajouter le dossier parent au path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_manager import CACHE_DIR, SQLITE_FILENAME, JsonDirBackend
+from structured_output import normalize_relations
+
+# Nom du scientifique dans les prompts de llm_extractor (simple, puis groupé)
+SINGLE_PROMPT = re.compile(r'about scientist "(.+?)"')
+BATCH_PROMPT = re.compile(r'^### SCIENTIST: "(.+?)"', re.MULTILINE)
+
+STREAM_PIECE = 12  # caractères par fragment envoyé en streaming
+
+
+def _option(name: str, default, cast=float):
+    """Valeur de --name=valeur dans la ligne de commande, `default` si absente."""
+    prefix = f"--{name}="
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            return cast(arg[len(prefix):])
+    return default
+
+
+def _sqlite_entries(db_path: str) -> Iterator[Dict[str, Any]]:
+    """Entries of the SQLite cache, opened read-only (no PRAGMA / schema change on the real cache)."""
+    if not os.path.exists(db_path):
+        return
+    conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("SELECT entry FROM entries").fetchall()
+    finally:
+        conn.close()
+    for (entry,) in rows:
+        try:
+            yield json.loads(entry)
+        except json.JSONDecodeError:
+            continue
+
+
+def load_recordings(cache_dir: str = CACHE_DIR) -> Dict[str, Dict[str, List[str]]]:
+    """
+    {scientist: {"inspired_by": [...], "inspired": [...]}} from the recorded extractions
+    of the LLM cache (most recent entry per scientist; negative entries ignored).
+    """
+    json_entries = (entry for _, entry in JsonDirBackend(cache_dir).iter_entries())
+    sqlite_entries = _sqlite_entries(os.path.join(cache_dir, SQLITE_FILENAME))
+
+    recordings = {}
+    stamps = {}
+    for entries in (json_entries, sqlite_entries):
+        for entry in entries:
+            # Entrée négative (aucune réponse exploitable) : marquée par son expiration
+            if entry.get("expires_at") is not None:
+                continue
+            result = normalize_relations(entry.get("result"))
+            name = entry.get("scientist_name")
+            if not name or result is None:
+                continue
+            stamp = entry.get("timestamp") or ""
+            if name not in recordings or stamp >= stamps[name]:
+                recordings[name] = result
+                stamps[name] = stamp
+    return recordings
+
+
+class MockLLM:
+    """Replayed answers, fault injection and counters shared by the request handlers."""
+
+    def __init__(self, recordings: Dict[str, Dict[str, List[str]]], latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: float = 1.0,
+                 chunk_delay: float = 0.0, seed: int = 0):
+        self.recordings = recordings
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.chunk_delay = chunk_delay
+        self.stats = {"requests": 0, "replayed": 0, "unknown": 0, "errors": 0, "rate_limited": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def fault(self) -> Optional[int]:
+        """Injected HTTP status (429 or 500) for the next request, None if it succeeds."""
+        with self._lock:
+            self.stats["requests"] += 1
+            draw = self._random.random()
+            if draw < self.rate_limit_rate:
+                self.stats["rate_limited"] += 1
+                return 429
+            if draw < self.rate_limit_rate + self.error_rate:
+                self.stats["errors"] += 1
+                return 500
+        return None
+
+    def delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _relations(self, name: str) -> Dict[str, List[str]]:
+        result = self.recordings.get(name)
+        with self._lock:
+            self.stats["replayed" if result is not None else "unknown"] += 1
+        return result or {"inspired_by": [], "inspired": []}
+
+    def answer(self, prompt: str) -> str:
+        """JSON text answering an extraction prompt (one key per scientist for a batch prompt)."""
+        batch = BATCH_PROMPT.findall(prompt)
+        if batch:
+            return json.dumps({name: self._relations(name) for name in batch}, ensure_ascii=False)
+        match = SINGLE_PROMPT.search(prompt)
+        return json.dumps(self._relations(match.group(1) if match else ""), ensure_ascii=False)
+
+
+def make_handler(mock: MockLLM):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 : connexions keep-alive et réponses en streaming découpées (chunked)
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict, headers: Optional[Dict[str, str]] = None) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _start_stream(self, content_type: str) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+        def _write_chunk(self, data: bytes) -> None:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def _pieces(self, text: str):
+            for i in range(0, len(text), STREAM_PIECE):
+                if i and mock.chunk_delay:
+                    time.sleep(mock.chunk_delay)
+                yield text[i:i + STREAM_PIECE]
+
+        def do_GET(self):
+            # Vérifications de connexion de LLMExtractor (liste des modèles)
+            if self.path.rstrip("/") in ("/v1/models", "/models"):
+                self._send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+            elif self.path.rstrip("/") == "/api/tags":
+                self._send_json(200, {"models": [{"name": "mock"}]})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self._send_json(400, {"error": "invalid JSON"})
+                return
+
+            path = self.path.rstrip("/")
+            if path in ("/v1/chat/completions", "/chat/completions", "/openai/v1/chat/completions"):
+                prompt = "\n".join(m.get("content") or "" for m in request.get("messages", []) if m.get("role") == "user")
+                reply = self._chat_completion
+            elif path == "/api/generate":
+                prompt = request.get("prompt", "")
+                reply = self._generate
+            else:
+                self._send_json(404, {"error": "not found"})
+                return
+
+            time.sleep(mock.delay())
+            status = mock.fault()
+            if status == 429:
+                self._send_json(429, {"error": {"message": "Rate limit exceeded (mock)", "type": "rate_limit"}},
+                                {"Retry-After": f"{mock.retry_after:g}"})
+                return
+            if status is not None:
+                self._send_json(status, {"error": {"message": "Injected server error (mock)", "type": "server_error"}})
+                return
+            reply(request, prompt, mock.answer(prompt))
+
+        def _chat_completion(self, request: dict, prompt: str, content: str) -> None:
+            model = request.get("model", "mock")
+            usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                     "total_tokens": (len(prompt) + len(content)) // 4}
+            created = int(time.time())
+            if not request.get("stream"):
+                self._send_json(200, {
+                    "id": "chatcmpl-mock", "object": "chat.completion", "created": created, "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                    "usage": usage,
+                })
+                return
+
+            self._start_stream("text/event-stream")
+            base = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": created, "model": model}
+            for piece in self._pieces(content):
+                chunk = dict(base, choices=[{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+                self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            # Dernier fragment : fin de réponse et compteurs de tokens (stream_options.include_usage)
+            final = dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}], usage=usage)
+            self._write_chunk(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+
+        def _generate(self, request: dict, prompt: str, content: str) -> None:
+            model = request.get("model", "mock")
+            counts = {"prompt_eval_count": len(prompt) // 4, "eval_count": len(content) // 4}
+            # Ollama diffuse par défaut : "stream" absent = streaming
+            if not request.get("stream", True):
+                self._send_json(200, dict({"model": model, "response": content, "done": True}, **counts))
+                return
+
+            self._start_stream("application/x-ndjson")
+            for piece in self._pieces(content):
+                line = {"model": model, "response": piece, "done": False}
+                self._write_chunk((json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8"))
+            final = dict({"model": model, "response": "", "done": True}, **counts)
+            self._write_chunk((json.dumps(final) + "\n").encode("utf-8"))
+            self._write_chunk(b"")
+
+    return Handler
+
+
+def start_server(mock: MockLLM, port: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(mock))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ============================================================
+# BANC D'ESSAI (--bench)
+# ============================================================
+
+def _bench_text(name: str, relations: Dict[str, List[str]], min_chars: int = 0) -> str:
+    """
+    Short biography citing the recorded relations (passes the local pre-filter),
+    padded to at least `min_chars` characters.
+    """
+    inspired_by = ", ".join(relations["inspired_by"]) or "several teachers"
+    inspired = ", ".join(relations["inspired"]) or "a generation of students"
+    text = (f"{name} was a scientist. {name} studied under {inspired_by}, "
+            f"whose work influenced the early research of {name}. {name} in turn influenced {inspired}.")
+    filler = f" {name} published papers and lectured at several universities."
+    while len(text) < min_chars:
+        text += filler
+    return text
+
+
+def run_bench(mock: MockLLM, url: str, count: int, workers: int, provider: str, stream: bool,
+              batching: bool = True) -> None:
+    import cache_manager
+    import llm_extractor
+    from prompt_builder import UsageLog
+
+    # Tous les fournisseurs HTTP pointent vers le serveur ; cache temporaire (le cache réel n'est ni lu ni modifié)
+    llm_extractor.OLLAMA_URL = url
+    llm_extractor.CEREBRAS_API_URL = f"{url}/v1"
+    llm_extractor.MISTRAL_API_URL = url
+    llm_extractor.CEREBRAS_API_KEY = llm_extractor.MISTRAL_API_KEY = "mock"
+    cache_manager._cache_instance = cache_manager.CacheManager(cache_dir=tempfile.mkdtemp(prefix="mock_llm_cache_"))
+    llm_extractor.LLM_BATCHING = llm_extractor.LLM_BATCHING and batching
+    # Les biographies du banc sont courtes et partent en requêtes groupées ; avec --stream elles
+    # prennent la longueur d'une vraie page pour être envoyées seules, en streaming
+    min_chars = llm_extractor.LLM_BATCH_MAX_CHARS + 1 if stream else 0
+
+    extractor = llm_extractor.LLMExtractor()
+    extractor.use_cerebras = provider == "cerebras"
+    extractor.use_mistral = provider == "mistral"
+    extractor.use_groq = False
+    extractor.usage = UsageLog(path=None)
+
+    names = sorted(mock.recordings)
+    random.Random(0).shuffle(names)
+    names = (names * (count // max(len(names), 1) + 1))[:count]
+    if not names:
+        print("❌ Aucune extraction enregistrée dans le cache : rien à rejouer")
+        return
+    timings = []
+    found = 0
+    streamed_names = 0
+    lock = threading.Lock()
+
+    def count_name(relation: str, name: str) -> None:
+        nonlocal streamed_names
+        with lock:
+            streamed_names += 1
+
+    on_name = count_name if stream else None
+
+    def one(index: int, name: str) -> None:
+        nonlocal found
+        # Suffixe unique : chaque requête est un défaut de cache, même pour un nom répété
+        text = _bench_text(name, mock.recordings[name], min_chars) + f" (run {index})"
+        start = time.monotonic()
+        result = extractor.extract_relations(text, name, on_name=on_name)
+        elapsed = time.monotonic() - start
+        with lock:
+            timings.append(elapsed)
+            found += bool(result.get("inspired_by") or result.get("inspired"))
+
+    print(f"🏁 Banc d'essai: {count} extractions, {workers} threads, fournisseur {provider}"
+          f"{' (streaming)' if stream else ''}{'' if llm_extractor.LLM_BATCHING else ', sans regroupement'}")
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(one, range(count), names))
+    total = time.monotonic() - start
+
+    timings.sort()
+    print("\n" + "=" * 60)
+    print(f"⏱️ {count} extractions en {total:.2f}s ({count / total:.1f}/s)")
+    print(f"   Latence p50 {timings[len(timings) // 2]:.3f}s, p95 {timings[int(len(timings) * 0.95) - 1]:.3f}s, "
+          f"max {timings[-1]:.3f}s")
+    print(f"   Résultats non vides: {found}/{count}")
+    if stream:
+        print(f"   Noms reçus en streaming: {streamed_names}")
+    print(f"   Serveur: {mock.stats}")
+    print(f"   Consommation: {extractor.usage.totals}")
+    print(f"   Pré-filtre: {extractor.prefilter.stats}")
+
+
+def main():
+    port = _option("port", 8765, int)
+    print(f"📂 Chargement des extractions enregistrées ({CACHE_DIR})...")
+    recordings = load_recordings()
+    print(f"   {len(recordings)} scientifiques rejouables")
+
+    mock = MockLLM(
+        recordings,
+        latency=_option("latency", 0.0),
+        jitter=_option("jitter", 0.0),
+        error_rate=_option("error-rate", 0.0),
+        rate_limit_rate=_option("rate-limit-rate", 0.0),
+        retry_after=_option("retry-after", 1.0),
+        chunk_delay=_option("chunk-delay", 0.0),
+        seed=_option("seed", 0, int),
+    )
+    server = start_server(mock, port)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    bench = _option("bench", None, int)
+    if bench is not None:
+        run_bench(mock, url, bench, _option("workers", 16, int), _option("provider", "cerebras", str),
+                  "--stream" in sys.argv, batching="--no-batching" not in sys.argv)
+        server.shutdown()
+        return
+
+    print(f"🤖 Serveur LLM simulé sur {url} (OpenAI: {url}/v1/chat/completions, Ollama: {url}/api/generate)")
+    print("   Ctrl+C pour arrêter")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n📊 {mock.stats}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
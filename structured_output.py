@@ -0,0 +1,284 @@
+"""
+Structured Output
+=================
+Turns raw LLM answers into validated extraction results, without asking
+the model again:
+- JSON modes per provider (strict JSON schema where supported, plain
+  JSON object mode elsewhere)
+- Local repair parser: code fences and surrounding prose, trailing
+  commas, truncated strings / arrays / objects, Python-style quoting
+- Validation against RELATIONS_SCHEMA, with key aliases ("inspirations",
+  "influenced_by", "students"...) mapped to the two expected keys
+- None when nothing usable can be recovered, so callers can tell an
+  unusable answer from a genuine "no relations found"
+- RelationsStreamParser: reports each name of a streamed answer as soon
+  as its string is complete
+"""
+
+import ast
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+# Schéma d'un résultat d'extraction (un scientifique)
+RELATIONS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "inspired_by": {"type": "array", "items": {"type": "string"}},
+        "inspired": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["inspired_by", "inspired"],
+    "additionalProperties": False,
+}
+
+# Clés renvoyées par les modèles à la place des deux clés attendues
+KEY_ALIASES = {
+    "inspired_by": "inspired_by",
+    "inspiredby": "inspired_by",
+    "inspirations": "inspired_by",
+    "influenced_by": "inspired_by",
+    "influences": "inspired_by",
+    "mentors": "inspired_by",
+    "teachers": "inspired_by",
+    "predecessors": "inspired_by",
+    "inspired": "inspired",
+    "inspired_people": "inspired",
+    "influenced": "inspired",
+    "students": "inspired",
+    "successors": "inspired",
+    "disciples": "inspired",
+}
+
+_KEY_SEPARATORS = re.compile(r"[\s\-]+")
+_FENCE = re.compile(r"```(?:json)?", re.IGNORECASE)
+# Clé (ou clé + valeur littérale tronquée) restée en fin de texte : ', "key": tru'
+_DANGLING_KEY = re.compile(r',?\s*"(?:[^"\\]|\\.)*"\s*:\s*[\w.+\-]*$')
+
+
+# ============================================================
+# MODES JSON DES FOURNISSEURS
+# ============================================================
+
+def response_format(provider: str, schema: Optional[dict]) -> dict:
+    """
+    `response_format` of an OpenAI-compatible chat completion request.
+    Strict schema where the provider supports it (Cerebras), JSON object mode otherwise;
+    requests without a fixed schema (batches keyed by scientist) always use JSON object mode.
+    """
+    if schema is not None and provider == "cerebras":
+        return {"type": "json_schema", "json_schema": {"name": "relations", "strict": True, "schema": schema}}
+    return {"type": "json_object"}
+
+
+def ollama_format(schema: Optional[dict]):
+    """`format` of an Ollama /api/generate request: the JSON schema itself, or "json"."""
+    return schema if schema is not None else "json"
+
+
+# ============================================================
+# RÉPARATION
+# ============================================================
+
+def _strip_trailing_comma(out: List[str]) -> None:
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def _balance(body: str) -> str:
+    """
+    Cut `body` after its first complete top-level value, dropping trailing commas;
+    if the text is truncated, drop the unfinished element and close what is open.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escaped = False
+    string_start = 0
+
+    for ch in body:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+            string_start = len(out)
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            _strip_trailing_comma(out)
+            if not stack:
+                break
+            # Le délimiteur attendu remplace un éventuel délimiteur mal apparié
+            out.append(stack.pop())
+            if not stack:
+                return "".join(out)
+            continue
+        out.append(ch)
+
+    # Réponse tronquée : une chaîne inachevée (nom partiel) est supprimée, pas complétée
+    if in_string:
+        del out[string_start:]
+    text = _DANGLING_KEY.sub("", "".join(out).rstrip())
+    out = list(text)
+    while stack:
+        _strip_trailing_comma(out)
+        out.append(stack.pop())
+    return "".join(out)
+
+
+def repair_json(response: Optional[str]) -> Optional[Any]:
+    """Parse the JSON object in an LLM answer, repairing it if needed. None if unrecoverable."""
+    if not response:
+        return None
+    start = response.find("{")
+    if start == -1:
+        return None
+    body = _FENCE.sub("", response[start:])
+
+    # Cas courant : JSON valide, éventuellement entouré de texte
+    end = body.rfind("}") + 1
+    if end > 0:
+        try:
+            return json.loads(body[:end])
+        except json.JSONDecodeError:
+            pass
+
+    candidate = _balance(body)
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        pass
+    # Dictionnaire Python (guillemets simples, True/None) : évaluation littérale sans exécution
+    try:
+        return ast.literal_eval(candidate)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+# ============================================================
+# VALIDATION
+# ============================================================
+
+def _names(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    names = []
+    for item in value:
+        # Certains modèles renvoient des objets {"name": ..., "reason": ...}
+        if isinstance(item, dict):
+            item = item.get("name")
+        if isinstance(item, str) and item.strip():
+            names.append(item.strip())
+    return list(dict.fromkeys(names))
+
+
+def normalize_relations(data: Any) -> Optional[Dict[str, List[str]]]:
+    """
+    Validate `data` against RELATIONS_SCHEMA, mapping key aliases and dropping non-name items.
+    Returns {"inspired_by": [...], "inspired": [...]}, or None if no expected key is present.
+    """
+    if not isinstance(data, dict):
+        return None
+    result: Dict[str, List[str]] = {}
+    for key, value in data.items():
+        canonical = KEY_ALIASES.get(_KEY_SEPARATORS.sub("_", str(key).strip().lower()))
+        if canonical is not None:
+            result[canonical] = list(dict.fromkeys(result.get(canonical, []) + _names(value)))
+    if result:
+        return {"inspired_by": result.get("inspired_by", []), "inspired": result.get("inspired", [])}
+
+    # Résultat enveloppé : {"Albert Einstein": {"inspired_by": ...}} ou {"result": {...}}
+    nested = [value for value in data.values() if isinstance(value, dict)]
+    if len(data) == 1 and len(nested) == 1:
+        return normalize_relations(nested[0])
+    return None
+
+
+def parse_relations(response: Optional[str]) -> Optional[Dict[str, List[str]]]:
+    """Repaired and validated result of a single-scientist answer, or None."""
+    return normalize_relations(repair_json(response))
+
+
+def parse_object(response: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Repaired JSON object of a batch answer (one key per scientist), or None."""
+    data = repair_json(response)
+    return data if isinstance(data, dict) else None
+
+
+# ============================================================
+# LECTURE INCRÉMENTALE (RÉPONSES EN STREAMING)
+# ============================================================
+
+class RelationsStreamParser:
+    """
+    Incremental scanner of a streamed single-scientist answer: calls
+    on_name(relation, name) as soon as a string of an "inspired_by" / "inspired"
+    array (or alias) is complete. The final result still comes from
+    parse_relations(parser.text), which validates and repairs the whole answer.
+    """
+
+    def __init__(self, on_name):
+        self.on_name = on_name
+        self.text = ""
+        self._stack: List[Optional[str]] = []   # relation de chaque tableau / objet ouvert (None sinon)
+        self._kinds: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._string: List[str] = []
+        self._last_string: Optional[str] = None
+        self._value_key: Optional[str] = None
+        self._emitted = set()
+
+    def feed(self, chunk: str) -> None:
+        self.text += chunk
+        for ch in chunk:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                    self._string.append(ch)
+                elif ch == "\\":
+                    self._escaped = True
+                    self._string.append(ch)
+                elif ch == '"':
+                    self._in_string = False
+                    self._end_string()
+                else:
+                    self._string.append(ch)
+            elif ch == '"':
+                self._in_string = True
+                self._string = []
+            elif ch == ":" and self._kinds and self._kinds[-1] == "{":
+                # La dernière chaîne lue dans un objet était une clé
+                key = _KEY_SEPARATORS.sub("_", (self._last_string or "").strip().lower())
+                self._value_key = KEY_ALIASES.get(key)
+            elif ch in "{[":
+                self._kinds.append(ch)
+                self._stack.append(self._value_key if ch == "[" else None)
+                self._value_key = None
+            elif ch in "}]":
+                if self._kinds:
+                    self._kinds.pop()
+                    self._stack.pop()
+            elif ch == ",":
+                self._value_key = None
+
+    def _end_string(self) -> None:
+        try:
+            value = json.loads('"' + "".join(self._string) + '"')
+        except json.JSONDecodeError:
+            value = "".join(self._string)
+        self._last_string = value
+        relation = self._stack[-1] if self._kinds and self._kinds[-1] == "[" else None
+        name = value.strip()
+        if relation is not None and name and (relation, name) not in self._emitted:
+            self._emitted.add((relation, name))
+            self.on_name(relation, name)
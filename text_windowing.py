@@ -0,0 +1,156 @@
+"""
+Relevance Windowing
+===================
+Selects the parts of a biography most likely to describe influences
+before it is sent to the LLM:
+- The text is split into paragraphs, each tagged with its section title
+- Paragraphs are scored with cheap signals: section names ("Influences",
+  "Students", "Legacy", "Doctoral advisor"...), linked person titles
+  from the page links, and trigger verbs ("studied under", "influenced"...)
+- The introduction is always kept; the best paragraphs fill the rest of
+  the token budget and are returned in their original order
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from config import LLM_TEXT_TOKEN_BUDGET
+
+# Sections dont le titre annonce des relations maître/élève
+SECTION_KEYWORDS = re.compile(
+    r"influenc|student|legacy|doctoral|advis|mentor|teacher|education|academic|"
+    r"career|collaborat|school of|disciple|successor|research|work|later life|early life",
+    re.IGNORECASE,
+)
+
+# Verbes et expressions déclencheurs d'une relation d'influence
+TRIGGER_WORDS = re.compile(
+    r"\b(?:influenc\w*|inspir\w*|studied (?:under|with)|student of|pupil|mentor\w*|"
+    r"advis(?:or|er)|supervis\w*|taught|teacher|disciple|protég[ée]|apprentice\w*|"
+    r"successor|collaborat\w*|worked (?:with|under)|doctoral|followers?|admir\w*|"
+    r"correspond\w*|assistant to|under the direction)\b",
+    re.IGNORECASE,
+)
+
+HEADING = re.compile(r"^\s*=+\s*(.*?)\s*=+\s*$")
+LABEL = re.compile(r"^\w[\w ]*:\n")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def split_paragraphs(text: str) -> List[Tuple[str, str]]:
+    """(section title, paragraph) pairs; the introduction has an empty section title."""
+    paragraphs = []
+    section = ""
+    for block in re.split(r"\n\s*\n", text):
+        lines = block.strip().split("\n")
+        body = []
+        for line in lines:
+            match = HEADING.match(line)
+            if match:
+                if body:
+                    paragraphs.append((section, "\n".join(body)))
+                    body = []
+                section = match.group(1)
+            else:
+                body.append(line)
+        if body and "".join(body).strip():
+            paragraphs.append((section, "\n".join(body)))
+    return paragraphs
+
+
+def person_link_titles(links: Optional[List[str]]) -> List[str]:
+    """
+    Page links that look like person names (at least two words, capitalised, no namespace),
+    without their disambiguation suffix, deduplicated in link order.
+    """
+    names = (
+        re.sub(r"\s*\(.*\)$", "", link) for link in (links or [])
+        if ":" not in link and re.match(r"^[A-ZÀ-Ý][^\s]+(?: [^\s]+)+", link)
+    )
+    return list(dict.fromkeys(names))
+
+
+def _link_pattern(links: Optional[List[str]]) -> Optional[re.Pattern]:
+    # Seuls les titres qui ressemblent à des noms de personnes (au moins deux mots capitalisés)
+    names = person_link_titles(links)
+    if not names:
+        return None
+    alternation = "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternation})\b")
+
+
+def score_paragraph(section: str, paragraph: str, link_pattern: Optional[re.Pattern]) -> float:
+    score = 0.0
+    if section and SECTION_KEYWORDS.search(section):
+        score += 3
+    score += min(len(set(m.group(0).lower() for m in TRIGGER_WORDS.finditer(paragraph))), 5) * 2
+    if link_pattern is not None:
+        score += min(len(set(link_pattern.findall(paragraph))), 10)
+    return score
+
+
+def select_relevant_windows(text: str, links: Optional[List[str]] = None, token_budget: int = LLM_TEXT_TOKEN_BUDGET) -> str:
+    """
+    Best paragraphs of `text` fitting in `token_budget`, in original order.
+    Texts already within the budget are returned unchanged.
+    """
+    if estimate_tokens(text) <= token_budget:
+        return text
+
+    paragraphs = split_paragraphs(text)
+    link_pattern = _link_pattern(links)
+
+    # Déduplication (le résumé est souvent répété au début du texte détaillé)
+    seen = set()
+    candidates = []
+    for position, (section, paragraph) in enumerate(paragraphs):
+        key = LABEL.sub("", paragraph).strip()
+        if key in seen:
+            continue
+        seen.add(key)
+        candidates.append((position, section, paragraph))
+
+    selected = []
+    used = 0
+    # 1. Introduction (avant le premier titre de section) : toujours conservée
+    for position, section, paragraph in candidates:
+        if section:
+            break
+        cost = estimate_tokens(paragraph)
+        if used + cost > token_budget and selected:
+            break
+        if cost > token_budget:
+            paragraph = paragraph[:token_budget * 4]
+            cost = token_budget
+        selected.append((position, section, paragraph))
+        used += cost
+
+    # 2. Meilleurs paragraphes des sections, dans la limite du budget
+    chosen = {position for position, _, _ in selected}
+    ranked = sorted(
+        ((score_paragraph(section, paragraph, link_pattern), position, section, paragraph)
+         for position, section, paragraph in candidates if position not in chosen),
+        key=lambda item: (-item[0], item[1]),
+    )
+    for score, position, section, paragraph in ranked:
+        if score <= 0:
+            break
+        cost = estimate_tokens(paragraph)
+        if used + cost > token_budget:
+            continue
+        selected.append((position, section, paragraph))
+        used += cost
+
+    # 3. Réassemblage dans l'ordre du texte, avec le titre de section de chaque fenêtre
+    windows = []
+    current_section = None
+    for position, section, paragraph in sorted(selected):
+        if section and section != current_section:
+            windows.append(f"== {section} ==")
+        current_section = section
+        windows.append(paragraph)
+    return "\n\n".join(windows)
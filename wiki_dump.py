@@ -0,0 +1,246 @@
+"""
+Offline Wikipedia Dump Backend
+==============================
+Serves PageBundle objects from a local dump instead of the live API:
+- Input: JSON Lines dump (one page per line) or MediaWiki XML export (.xml / .xml.bz2)
+- Pages are stored zlib-compressed in `<dump>.pages`
+- A sorted, fixed-width title-hash -> (offset, length) index lives in `<dump>.idx`
+- Both files are memory-mapped, so a lookup is a binary search plus one decompression
+
+JSON Lines record format:
+    {"title": "...", "text": "...", "summary": "...", "links": [...], "categories": [...], "revision_id": 123}
+    {"title": "Einstein", "redirect": "Albert Einstein"}
+
+Usage:
+    python wiki_dump.py build path/to/dump.jsonl
+    python wiki_dump.py get path/to/dump.jsonl "Albert Einstein"
+"""
+
+import bz2
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import zlib
+from typing import Iterator, Optional, Dict, Any, Tuple
+
+from wikipedia_client import PageBundle
+
+INDEX_MAGIC = b"EPIDX001"
+INDEX_HEADER = struct.Struct("<8sQ")      # magic, nombre d'entrées
+INDEX_ENTRY = struct.Struct("<QQI")       # hash du titre, offset, longueur compressée
+
+
+def title_key(title: str) -> int:
+    """64-bit key of a normalised title (case-insensitive, '_' == ' ')."""
+    normalised = title.replace("_", " ").strip().casefold()
+    return int.from_bytes(hashlib.blake2b(normalised.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# ============================================================
+# LECTURE DES DUMPS SOURCES
+# ============================================================
+
+def _iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+_WIKI_LINK = re.compile(r"\[\[([^\]|#]+)(?:#[^\]|]*)?(?:\|([^\]]*))?\]\]")
+_CATEGORY = re.compile(r"\[\[Category:([^\]|]+)(?:\|[^\]]*)?\]\]", re.IGNORECASE)
+_TEMPLATE = re.compile(r"\{\{[^{}]*\}\}")
+_REF = re.compile(r"<ref[^>/]*/>|<ref[^>]*>.*?</ref>", re.DOTALL)
+_TAG = re.compile(r"<[^>]+>")
+
+
+def _wikitext_to_plain(wikitext: str) -> str:
+    """Very small wikitext -> plain text conversion (enough for LLM extraction)."""
+    text = _REF.sub("", wikitext)
+    # Les modèles peuvent être imbriqués : on retire de l'intérieur vers l'extérieur
+    previous = None
+    while previous != text:
+        previous = text
+        text = _TEMPLATE.sub("", text)
+    text = _CATEGORY.sub("", text)
+    text = re.sub(r"\[\[(?:File|Image):[^\]]*\]\]", "", text, flags=re.IGNORECASE)
+    text = _WIKI_LINK.sub(lambda m: m.group(2) or m.group(1), text)
+    text = _TAG.sub("", text)
+    text = text.replace("'''", "").replace("''", "")
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _iter_xml(path: str) -> Iterator[Dict[str, Any]]:
+    import xml.etree.ElementTree as ET
+
+    opener = bz2.open if path.endswith(".bz2") else open
+    with opener(path, "rb") as f:
+        for _, elem in ET.iterparse(f, events=("end",)):
+            if not elem.tag.endswith("}page") and elem.tag != "page":
+                continue
+            ns = elem.tag[:-len("page")]
+            title = elem.findtext(f"{ns}title") or ""
+            namespace = elem.findtext(f"{ns}ns") or "0"
+            redirect = elem.find(f"{ns}redirect")
+
+            if namespace == "0":
+                if redirect is not None:
+                    yield {"title": title, "redirect": redirect.get("title")}
+                else:
+                    revision = elem.find(f"{ns}revision")
+                    wikitext = revision.findtext(f"{ns}text") if revision is not None else ""
+                    wikitext = wikitext or ""
+                    revision_id = revision.findtext(f"{ns}id") if revision is not None else None
+                    yield {
+                        "title": title,
+                        "text": _wikitext_to_plain(wikitext),
+                        "links": sorted({m.group(1).strip() for m in _WIKI_LINK.finditer(wikitext) if ":" not in m.group(1)}),
+                        "categories": [f"Category:{c.strip()}" for c in _CATEGORY.findall(wikitext)],
+                        "revision_id": int(revision_id) if revision_id else None,
+                    }
+            elem.clear()
+
+
+def iter_dump(path: str) -> Iterator[Dict[str, Any]]:
+    """Pages of a dump, whatever its format."""
+    if path.endswith((".xml", ".xml.bz2")):
+        return _iter_xml(path)
+    return _iter_jsonl(path)
+
+
+# ============================================================
+# CONSTRUCTION DE L'INDEX
+# ============================================================
+
+def index_paths(dump_path: str) -> Tuple[str, str]:
+    return f"{dump_path}.pages", f"{dump_path}.idx"
+
+
+def build_index(dump_path: str) -> int:
+    """Compress every page of the dump and write the sorted title index. Returns the entry count."""
+    pages_path, index_path = index_paths(dump_path)
+    entries = {}        # clé du titre -> (offset, longueur)
+    redirects = []      # (clé de la redirection, titre cible)
+
+    print(f"📚 Indexation du dump: {dump_path}")
+    with open(pages_path + ".tmp", "wb") as out:
+        for page in iter_dump(dump_path):
+            if page.get("redirect"):
+                redirects.append((title_key(page["title"]), page["redirect"]))
+                continue
+            blob = zlib.compress(json.dumps(page, ensure_ascii=False).encode("utf-8"), 6)
+            entries[title_key(page["title"])] = (out.tell(), len(blob))
+            out.write(blob)
+
+    # Les redirections pointent vers l'enregistrement de leur cible
+    for key, target in redirects:
+        if key not in entries and title_key(target) in entries:
+            entries[key] = entries[title_key(target)]
+
+    with open(index_path + ".tmp", "wb") as out:
+        out.write(INDEX_HEADER.pack(INDEX_MAGIC, len(entries)))
+        for key in sorted(entries):
+            offset, length = entries[key]
+            out.write(INDEX_ENTRY.pack(key, offset, length))
+
+    # Remplacement atomique : un crash pendant la construction ne laisse pas d'index à moitié écrit
+    os.replace(pages_path + ".tmp", pages_path)
+    os.replace(index_path + ".tmp", index_path)
+    print(f"   ✅ {len(entries)} titres indexés ({len(redirects)} redirections)")
+    return len(entries)
+
+
+# ============================================================
+# BACKEND
+# ============================================================
+
+class DumpBackend:
+    """Same interface as MediaWikiBackend, backed by a memory-mapped local dump."""
+
+    def __init__(self, dump_path: str):
+        pages_path, index_path = index_paths(dump_path)
+        stale = (
+            not os.path.exists(index_path)
+            or os.path.getmtime(index_path) < os.path.getmtime(dump_path)
+        )
+        if stale:
+            build_index(dump_path)
+
+        self._pages_file = open(pages_path, "rb")
+        self._index_file = open(index_path, "rb")
+        self._pages = mmap.mmap(self._pages_file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(pages_path) else b""
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self._count = INDEX_HEADER.unpack_from(self._index, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"Index de dump invalide: {index_path}")
+
+    def _entry(self, i: int) -> Tuple[int, int, int]:
+        return INDEX_ENTRY.unpack_from(self._index, INDEX_HEADER.size + i * INDEX_ENTRY.size)
+
+    def _read(self, title: str) -> Optional[Dict[str, Any]]:
+        key = title_key(title)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo >= self._count:
+            return None
+        found_key, offset, length = self._entry(lo)
+        if found_key != key:
+            return None
+        return json.loads(zlib.decompress(self._pages[offset:offset + length]))
+
+    def search_bundle(self, query: str) -> Optional[PageBundle]:
+        """Offline "search": exact title lookup (case-insensitive, redirects included)."""
+        return self.fetch_bundle(query)
+
+    def fetch_bundle(self, title: str) -> Optional[PageBundle]:
+        page = self._read(title)
+        if page is None:
+            return None
+        text = page.get("text", "")
+        summary = page.get("summary") or re.split(r"\n\n?==", text, 1)[0].strip()
+        return PageBundle(
+            title=page["title"],
+            summary=summary,
+            text=text,
+            links=page.get("links", []),
+            categories=page.get("categories", []),
+            revision_id=page.get("revision_id"),
+        )
+
+    def fetch_categories(self, titles: list) -> dict:
+        found = {}
+        for requested in titles:
+            page = self._read(requested)
+            if page is not None:
+                found[requested] = (page["title"], page.get("categories", []))
+        return found
+
+    def __len__(self) -> int:
+        return self._count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("build", "get"):
+        print(__doc__)
+        sys.exit(1)
+
+    command, path = sys.argv[1], sys.argv[2]
+    if command == "build":
+        build_index(path)
+    else:
+        bundle = DumpBackend(path).fetch_bundle(sys.argv[3])
+        if bundle is None:
+            print("❌ Page introuvable dans le dump.")
+        else:
+            print(f"{bundle.title}\n{bundle.summary[:500]}\n\n{len(bundle.links)} liens, {len(bundle.categories)} catégories")
@@ -1,204 +1,413 @@
-import wikipediaapi
-import wikipedia
+import os
+import requests
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import Optional
-from config import WIKIPEDIA_LANGUAGE
+from config import WIKIPEDIA_LANGUAGE, WIKIPEDIA_DUMP
+from metadata_store import PersonStore, TitleIndex, STORE_DIR
+from rate_limiter import throttle
+from name_filter import get_name_filter
+from category_classifier import CategoryVerdict, get_classifier
 
-class WikipediaClient:
-    def __init__(self):
-        # User-Agent requis par Wikipedia API
-        self.wiki = wikipediaapi.Wikipedia(
-            user_agent='StudentGraphProject/1.0 (contact@example.university.edu)',
-            language=WIKIPEDIA_LANGUAGE
+USER_AGENT = 'StudentGraphProject/1.0 (contact@example.university.edu)'
+
+# Nombre de pages gardées en mémoire (une page = résumé + texte + liens + catégories)
+BUNDLE_CACHE_SIZE = 128
+
+# Verdicts de catégories gardés en mémoire (quelques octets par titre)
+VERDICT_CACHE_SIZE = 65536
+
+# Nombre maximum de titres par requête MediaWiki (limite de l'API pour les clients anonymes)
+BATCH_TITLES = 50
+
+
+@dataclass
+class PageBundle:
+    """
+    Tout ce dont le crawler a besoin pour une page, récupéré en UNE requête
+    (résumé, texte, liens, catégories, révision).
+    """
+    title: str
+    summary: str = ""
+    text: str = ""
+    links: list = field(default_factory=list)
+    categories: list = field(default_factory=list)
+    revision_id: Optional[int] = None
+
+
+class MediaWikiBackend:
+    """Accès en ligne à l'API MediaWiki (une requête par page, requêtes groupées pour les catégories)."""
+
+    def __init__(self, language: str = WIKIPEDIA_LANGUAGE):
+        self.api_url = f"https://{language}.wikipedia.org/w/api.php"
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+
+    def search_bundle(self, query: str) -> Optional[PageBundle]:
+        """Meilleur résultat de la recherche plein texte, avec son contenu (une seule requête)."""
+        return self._query_bundle({
+            "generator": "search",
+            "gsrsearch": query,
+            "gsrlimit": 1,
+            "gsrnamespace": 0,
+        })
+
+    def fetch_bundle(self, title: str) -> Optional[PageBundle]:
+        """Page au titre exact (redirections suivies)."""
+        return self._query_bundle({"titles": title, "redirects": 1})
+
+    def _query_bundle(self, params: dict) -> Optional[PageBundle]:
+        """Une requête MediaWiki : extraits + liens + catégories + révision de la page ciblée."""
+        throttle(self.api_url)
+        response = self.session.get(self.api_url, params={
+            "action": "query",
+            "format": "json",
+            "formatversion": 2,
+            "prop": "extracts|links|categories|info",
+            "explaintext": 1,
+            "exsectionformat": "wiki",
+            "pllimit": "max",
+            "plnamespace": 0,
+            "cllimit": "max",
+            **params,
+        }, timeout=30)
+        response.raise_for_status()
+
+        pages = response.json().get("query", {}).get("pages", [])
+        if not pages or pages[0].get("missing") or pages[0].get("invalid"):
+            return None
+
+        page = pages[0]
+        text = page.get("extract", "")
+        # Le résumé est l'introduction : tout ce qui précède le premier titre de section
+        summary = text.split("\n\n== ", 1)[0].strip()
+
+        return PageBundle(
+            title=page["title"],
+            summary=summary,
+            text=text,
+            links=[link["title"] for link in page.get("links", [])],
+            categories=[cat["title"] for cat in page.get("categories", [])],
+            revision_id=page.get("lastrevid"),
         )
-        # Configurer la langue pour la recherche fuzzy
-        wikipedia.set_lang(WIKIPEDIA_LANGUAGE)
-    
-    def get_scientist_text(self, name: str) -> tuple[Optional[str], list]:
+
+    def fetch_categories(self, titles: list) -> dict:
         """
-        Récupère le texte Wikipedia d'un scientifique.
-        Utilise une recherche fuzzy pour trouver la bonne page.
-        Retourne le résumé + début du contenu pour ne pas surcharger le LLM.
+        Une requête prop=pageprops|categories pour plusieurs titres (suit les redirections).
+        Retourne {titre demandé: (titre résolu, catégories)} pour les pages trouvées
+        (les pages d'homonymie sont ignorées).
         """
-        # 1. Recherche floue (Fuzzy Search) pour trouver le vrai titre
-        best_match = name
+        params = {
+            "action": "query",
+            "format": "json",
+            "formatversion": 2,
+            "prop": "pageprops|categories",
+            "ppprop": "disambiguation",
+            "cllimit": "max",
+            "redirects": 1,
+            "titles": "|".join(titles),
+        }
+        pages = {}
+        aliases = {}
+        while True:
+            throttle(self.api_url)
+            response = self.session.get(self.api_url, params=params, timeout=30)
+            response.raise_for_status()
+            data = response.json()
+            query = data.get("query", {})
+
+            for entry in query.get("normalized", []) + query.get("redirects", []):
+                aliases[entry["from"]] = entry["to"]
+            for page in query.get("pages", []):
+                merged = pages.setdefault(page["title"], {"missing": False, "disambiguation": False, "categories": []})
+                merged["missing"] |= bool(page.get("missing") or page.get("invalid"))
+                merged["disambiguation"] |= "disambiguation" in page.get("pageprops", {})
+                merged["categories"] += [cat["title"] for cat in page.get("categories", [])]
+
+            # Les catégories de 50 pages dépassent souvent une réponse : on suit la pagination
+            if "continue" not in data:
+                break
+            params = {**params, **data["continue"]}
+
+        found = {}
+        for requested in titles:
+            title = requested
+            # normalisation puis redirection (au plus deux sauts)
+            for _ in range(2):
+                title = aliases.get(title, title)
+            page = pages.get(title)
+            if page is None or page["missing"] or page["disambiguation"]:
+                continue
+            found[requested] = (title, page["categories"])
+        return found
+
+
+class WikipediaClient:
+    def __init__(self, dump_path: str = WIKIPEDIA_DUMP):
+        # Source des pages : dump local (hors-ligne, reproductible) ou API Wikipedia en ligne
+        if dump_path:
+            from wiki_dump import DumpBackend
+            self.backend = DumpBackend(dump_path)
+        else:
+            self.backend = MediaWikiBackend(WIKIPEDIA_LANGUAGE)
+
+        # Cache LRU nom demandé -> PageBundle (None = page introuvable)
+        # Partagé entre les threads du crawler, d'où le verrou
+        self._bundles = OrderedDict()
+        self._bundles_lock = threading.Lock()
+        # Pages en cours de chargement : un second thread (préchargement, worker) attend le premier
+        self._loading = {}
+
+        # Classification des catégories (un seul passage regex), mémorisée par titre résolu
+        self.classifier = get_classifier()
+        self._verdicts = OrderedDict()
+
+        # Dates de naissance/mort persistées entre les exécutions
+        # Résolutions fuzzy (acceptées ET rejetées) persistées : une recherche par nom, une seule fois
+        # En mode dump, des stores séparés pour ne pas mélanger résultats en ligne et hors-ligne
+        if dump_path:
+            self.people = PersonStore(os.path.join(STORE_DIR, "dump", "persons.jsonl"))
+            self.titles = TitleIndex(os.path.join(STORE_DIR, "dump", "titles.jsonl"))
+        else:
+            self.people = PersonStore()
+            self.titles = TitleIndex()
+
+    def get_page_bundle(self, name: str) -> Optional[PageBundle]:
+        """
+        Résout le titre (recherche fuzzy) et récupère résumé, texte, liens et catégories
+        en une seule requête. Le résultat est mémorisé : get_scientist_text, is_scientist,
+        get_scientific_field et extract_years partagent le même bundle.
+        Retourne None si aucune page n'existe.
+        """
+        while True:
+            with self._bundles_lock:
+                if name in self._bundles:
+                    self._bundles.move_to_end(name)
+                    return self._bundles[name]
+                loading = self._loading.get(name)
+                if loading is None:
+                    loading = self._loading[name] = threading.Event()
+                    break
+            loading.wait()
+            # Chargement terminé (ou échoué) : on relit le cache, sinon on prend le relais
+
+        try:
+            bundle = self._load_bundle(name)
+            with self._bundles_lock:
+                self._bundles[name] = bundle
+                if len(self._bundles) > BUNDLE_CACHE_SIZE:
+                    self._bundles.popitem(last=False)
+        finally:
+            with self._bundles_lock:
+                del self._loading[name]
+            loading.set()
+        return bundle
+
+    def _load_bundle(self, name: str) -> Optional[PageBundle]:
+        # 0. Nom déjà résolu (lors de cette exécution ou d'une précédente) : pas de recherche
+        title = self.titles.resolved(name)
+        if title is not None:
+            return self.backend.fetch_bundle(title)
+
+        # 1. Recherche floue (Fuzzy Search) + contenu du meilleur résultat dans la même requête
         try:
-            search_results = wikipedia.search(name, results=1)
-            if search_results:
-                candidate = search_results[0]
-                
+            candidate = self.backend.search_bundle(name)
+            if candidate:
                 # Validation ANTI-VOL D'IDENTITÉ 🛡️
                 # Si le nom original est "Humphrey Newton" et le résultat est "Isaac Newton",
                 # c'est probablement faux. On vérifie la similarité.
                 import difflib
-                similarity = difflib.SequenceMatcher(None, name.lower(), candidate.lower()).ratio()
-                
+                similarity = difflib.SequenceMatcher(None, name.lower(), candidate.title.lower()).ratio()
+
                 # Seuil de tolérance :
                 # - Si > 0.6 : C'est probablement une correction typo ou Prénom manquant (Curie -> Marie Curie)
                 # - Si < 0.6 : C'est suspect (Humphrey Newton -> Isaac Newton = 0.5)
-                
-                if similarity > 0.6 or (name in candidate or candidate in name):
-                    best_match = candidate
-                    if best_match != name:
-                         print(f"  ✨ Correction: '{name}' -> '{best_match}' (Sim: {similarity:.2f})")
-                else:
-                    print(f"  ⚠️ Correction rejetée: '{name}' -> '{candidate}' (Trop différent, Sim: {similarity:.2f})")
-                    best_match = name # On garde le nom original pour tenter le coup ou échouer proprement
-            
+
+                if similarity > 0.6 or (name in candidate.title or candidate.title in name):
+                    if candidate.title != name:
+                        print(f"  ✨ Correction: '{name}' -> '{candidate.title}' (Sim: {similarity:.2f})")
+                    self.titles.set_resolution(name, candidate.title, candidate.title, True, similarity)
+                    return candidate
+                print(f"  ⚠️ Correction rejetée: '{name}' -> '{candidate.title}' (Trop différent, Sim: {similarity:.2f})")
+                # On garde le nom original pour tenter le coup ou échouer proprement
+                self.titles.set_resolution(name, name, candidate.title, False, similarity)
+            else:
+                self.titles.set_resolution(name, name, None, False)
+
         except Exception as e:
             print(f"  ⚠️ Erreur recherche fuzzy: {e}. Essai avec le nom brut.")
-            best_match = name
 
         # 2. Chargement de la page avec le titre exact
-        page = self.wiki.page(best_match)
+        return self.backend.fetch_bundle(name)
+
+    def lookup_years(self, names: list) -> dict:
+        """
+        Années (naissance, mort) pour une liste de noms, via le PersonStore.
+        Les noms absents du store sont résolus par requêtes groupées (50 titres par requête) ;
+        ceux qui restent introuvables, ou dont les catégories ne donnent aucune année,
+        passent par extract_years (résumé, recherche fuzzy).
+        Seuls les résultats avec au moins une année sont enregistrés : les autres seront retentés.
+        Retourne {nom: (birth_year, death_year)}.
+        """
+        years = {}
+        misses = []
+        for name in dict.fromkeys(names):
+            record = self.people.get(name)
+            # Les enregistrements sans aucune année (anciennes exécutions) sont redemandés
+            if record is not None and (record["birth_year"] is not None or record["death_year"] is not None):
+                years[name] = (record["birth_year"], record["death_year"])
+            else:
+                misses.append(name)
+
+        for i in range(0, len(misses), BATCH_TITLES):
+            chunk = misses[i:i + BATCH_TITLES]
+            # Si le titre est déjà connu de l'index (recherche fuzzy passée), on interroge directement celui-ci
+            targets = {name: self.titles.resolved(name) or name for name in chunk}
+            try:
+                found = self.backend.fetch_categories(list(dict.fromkeys(targets.values())))
+            except Exception as e:
+                print(f"  ⚠️ Erreur requête groupée ({len(chunk)} titres): {e}")
+                found = {}
+
+            for name in chunk:
+                if targets[name] in found:
+                    title, categories = found[targets[name]]
+                    birth_year, death_year = self._years_from_categories(categories)
+                    if birth_year is None and death_year is None:
+                        # Catégories sans années (page récente ou mal catégorisée) : résumé de la page
+                        birth_year, death_year = self.extract_years(title)
+                else:
+                    # Pas de page à ce titre exact (ou homonymie) : recherche fuzzy
+                    bundle = self.get_page_bundle(name)
+                    title = bundle.title if bundle else None
+                    birth_year, death_year = self.extract_years(name)
+                if birth_year is not None or death_year is not None:
+                    self.people.set_person(name, title, birth_year, death_year)
+                years[name] = (birth_year, death_year)
+
+        return years
+
+    def lookup_fields(self, names: list) -> dict:
+        """
+        Domaine scientifique pour une liste de noms, par requêtes groupées de catégories
+        (50 titres par requête) ; les noms introuvables passent par get_scientific_field.
+        Retourne {nom: domaine ou None}.
+        """
+        fields = {}
+        names = list(dict.fromkeys(names))
+        for i in range(0, len(names), BATCH_TITLES):
+            chunk = names[i:i + BATCH_TITLES]
+            targets = {name: self.titles.resolved(name) or name for name in chunk}
+            try:
+                found = self.backend.fetch_categories(list(dict.fromkeys(targets.values())))
+            except Exception as e:
+                print(f"  ⚠️ Erreur requête groupée ({len(chunk)} titres): {e}")
+                found = {}
+
+            for name in chunk:
+                if targets[name] in found:
+                    title, categories = found[targets[name]]
+                    fields[name] = self._classify_categories(title, categories).field
+                else:
+                    fields[name] = self.get_scientific_field(name)
+
+        return fields
+
+    def get_scientist_text(self, name: str) -> tuple[Optional[str], list]:
+        """
+        Récupère le texte Wikipedia d'un scientifique.
+        Utilise une recherche fuzzy pour trouver la bonne page.
+        Retourne le résumé + début du contenu pour ne pas surcharger le LLM.
+        """
+        page = self.get_page_bundle(name)
+        if page is None:
+            return None
         
         # Validation ANTI-CONCEPT 🛡️
         # Si le titre de la page contient "method", "theorem", "law", etc., ce n'est pas une personne.
-        from config import EXCLUSION_PATTERNS
-        import re
-        
-        if page.exists():
-            for pattern in EXCLUSION_PATTERNS:
-                if re.search(pattern, page.title, re.IGNORECASE):
-                     print(f"  🚫 Rejet: La page '{page.title}' semble être un concept, pas une personne.")
-                     return None
-        
-        if not page.exists():
-             return None
+        if get_name_filter().matches_exclusion(page.title):
+            print(f"  🚫 Rejet: La page '{page.title}' semble être un concept, pas une personne.")
+            return None
             
         # On construit un texte riche mais concis
         # 1. Le résumé est crucial (contient souvent les dates, nationalité, domaine)
         content = f"Titre: {page.title}\n\nRésumé:\n{page.summary}\n\n"
         
-        # 2. On ajoute les 25000 premiers caractères (compromis Vitesse/Exhaustivité)
-        # Lire tout le texte est trop lent et cause des timeouts.
-        content += f"Détails:\n{page.text[:25000]}"
+        # 2. On ajoute le texte complet : LLMExtractor n'en garde que les passages pertinents
+        # (text_windowing), les sections d'influence en fin d'article ne sont donc plus perdues.
+        content += f"Détails:\n{page.text}"
         
         # 3. Récupérer les liens (c'est très utile pour aider le LLM à identifier les noms corrects)
-        links = list(page.links.keys())[:300]
+        links = page.links[:300]
         
         return content, links
     
     def page_exists(self, name: str) -> bool:
-        """Vérifie si une page existe pour ce nom."""
-        return self.wiki.page(name).exists()
+        """Vérifie si une page existe pour ce nom (bundle mémorisé et titre résolu réutilisés)."""
+        return self.get_page_bundle(name) is not None
     
+    def classify(self, name: str) -> Optional[CategoryVerdict]:
+        """
+        Verdict scientifique et scores par domaine, calculés en une passe sur les catégories
+        et mémorisés par titre résolu (partagés par is_scientist et get_scientific_field).
+        Retourne None si la page n'existe pas.
+        """
+        page = self.get_page_bundle(name)
+
+        if page is None:
+            return None
+
+        return self._classify_categories(page.title, page.categories)
+
+    def _classify_categories(self, title: str, categories: list) -> CategoryVerdict:
+        with self._bundles_lock:
+            verdict = self._verdicts.get(title)
+            if verdict is not None:
+                self._verdicts.move_to_end(title)
+                return verdict
+
+        verdict = self.classifier.classify(categories)
+        with self._bundles_lock:
+            self._verdicts[title] = verdict
+            if len(self._verdicts) > VERDICT_CACHE_SIZE:
+                self._verdicts.popitem(last=False)
+        return verdict
+
     def is_scientist(self, name: str) -> bool:
         """
         Vérifie si une personne est un scientifique via les catégories Wikipedia.
         Retourne True si c'est un scientifique, False sinon.
         """
-        # Recherche fuzzy pour trouver la bonne page
         try:
-            search_results = wikipedia.search(name, results=1)
-            if search_results:
-                name = search_results[0]
-        except:
-            pass
+            verdict = self.classify(name)
+        except Exception as e:
+            print(f"  ⚠️ Erreur vérification scientifique ({name}): {e}")
+            return True  # Fail open : une erreur réseau ne doit pas exclure un voisin
 
-        page = self.wiki.page(name)
-        
-        if not page.exists():
+        if verdict is None:
             return True  # Fail open si la page n'existe pas (sera filtré plus tard)
-        
-        # Racines de mots qui indiquent un scientifique (matchent singulier ET pluriel)
-        # Ex: 'physic' match 'physicist', 'physicists', 'physics'
-        # NOTE: 'philosoph' trop large (inclut Gandhi) - on limite aux philosophes des sciences
-        SCIENTIST_STEMS = [
-            'physic', 'chemi', 'mathematic', 'biolog', 'astronom',
-            'engineer', 'computer scien', 'genetic', 'geolog',
-            'neuroscien', 'biochem', 'astrophysic', 'pharmacolog',
-            'microbiolog', 'ecolog', 'botan', 'zoolog',
-            'crystallograph', 'immunolog', 'virolog', 'inventor',
-            'logician', 'statistic', 'epidemiolog',
-            'paleontolog', 'anatom', 'physiolog', 'patholog',
-            'naturalist', 'cosmolog', 'oceanograph', 'meteorolog',
-            'scientist', 'women in science', 'nobel laureate',
-            # Philosophes des sciences spécifiquement
-            'philosophy of science', 'analytic philosoph', 'philosophy of mind',
-            'philosophy of math', 'epistemolog'
-        ]
-        
-        # Racines qui excluent (définitivement pas un scientifique)
-        EXCLUDE_STEMS = [
-            'actor', 'actress', 'film director', 'screenwriter', 'television',
-            'singer', 'musician', 'composer', 'rapper', 'songwriter',
-            'politician', 'diplomat', 'monarch', 'king of', 'queen of', 'emperor',
-            'military', 'general of', 'admiral', 'colonel', 'soldier',
-            'president of', 'prime minister', 'governors of', 'senator', 'minister of',
-            'journalist', 'editor', 'newspaper', 'broadcaster',
-            'novelist', 'poet', 'playwright', 'literary',
-            'athlete', 'footballer', 'cricketer', 'basketball', 'tennis player',
-            'religious leader', 'bishop', 'cardinal', 'pope', 'imam', 'rabbi',
-            'businesspeople', 'entrepreneur', 'banker',
-            'criminal', 'murderer', 'revolutionary leader'
-        ]
-        
-        # Récupérer les catégories
-        categories = [cat.lower() for cat in page.categories.keys()]
-        categories_text = ' '.join(categories)
-        
-        # PRIORITÉ AUX SCIENTIFIQUES : si on trouve une catégorie scientifique, on accepte
-        # Cela permet à des scientifiques ayant aussi servi dans l'armée (ex: Poincaré) d'être inclus
-        for stem in SCIENTIST_STEMS:
-            if stem in categories_text:
-                return True
-        
-        # Si pas de catégorie scientifique, vérifier les exclusions
-        for exclude in EXCLUDE_STEMS:
-            if exclude in categories_text:
-                return False
-        
-        # Si aucun match, on accepte par défaut (fail open)
-        # Cela permet d'inclure des scientifiques moins connus
-        return True
+
+        # Catégorie scientifique prioritaire (ex: Poincaré, aussi militaire), puis exclusions,
+        # sinon accepté par défaut (voir category_classifier.py)
+        return verdict.is_scientist
     
     def get_scientific_field(self, name: str) -> Optional[str]:
         """
         Extrait le domaine scientifique à partir des catégories Wikipedia.
         Retourne le domaine principal (ex: 'Physics', 'Biology', 'Mathematics').
         """
-        # Recherche fuzzy ici aussi pour être cohérent
         try:
-            search_results = wikipedia.search(name, results=1)
-            if search_results:
-                name = search_results[0]
-        except:
-            pass
+            verdict = self.classify(name)
+        except Exception as e:
+            print(f"  ⚠️ Erreur récupération domaine ({name}): {e}")
+            return None
 
-        page = self.wiki.page(name)
-        
-        if not page.exists():
+        if verdict is None:
             return None
-        
-        # Dictionnaire de mapping catégories → domaines
-        field_keywords = {
-            'Physics': ['physicist', 'physics', 'quantum', 'relativity', 'thermodynamics'],
-            'Mathematics': ['mathematician', 'mathematics', 'geometry', 'algebra', 'topology'],
-            'Chemistry': ['chemist', 'chemistry', 'chemical', 'molecule'],
-            'Biology': ['biologist', 'biology', 'evolution', 'genetics', 'botany', 'zoology'],
-            'Computer Science': ['computer scientist', 'computer science', 'programming', 'algorithm'],
-            'Medicine': ['physician', 'medical', 'medicine', 'anatomist'],
-            'Astronomy': ['astronomer', 'astronomy', 'astrophysics', 'cosmology'],
-            'Engineering': ['engineer', 'engineering'],
-            'Philosophy': ['philosopher', 'philosophy'],
-            'Economics': ['economist', 'economics']
-        }
-        
-        # Récupérer les catégories
-        categories = [cat.lower() for cat in page.categories.keys()]
-        
-        # Chercher le domaine qui matche le plus
-        field_scores = {}
-        for field, keywords in field_keywords.items():
-            score = sum(1 for cat in categories for kw in keywords if kw in cat)
-            if score > 0:
-                field_scores[field] = score
-        
-        if field_scores:
-            # Retourner le domaine avec le meilleur score
-            return max(field_scores, key=field_scores.get)
-        
-        return None
+
+        # Domaine avec le meilleur score (nombre de couples catégorie / mot-clé)
+        return verdict.field
     
     def extract_years(self, name: str) -> tuple[Optional[int], Optional[int]]:
         """
@@ -208,17 +417,13 @@ class WikipediaClient:
         """
         import re
         
-        # Recherche fuzzy ici aussi
         try:
-            search_results = wikipedia.search(name, results=1)
-            if search_results:
-                name = search_results[0]
-        except:
-            pass
+            page = self.get_page_bundle(name)
+        except Exception as e:
+            print(f"  ⚠️ Erreur récupération dates ({name}): {e}")
+            return None, None
 
-        page = self.wiki.page(name)
-        
-        if not page.exists():
+        if page is None:
             return None, None
         
         birth_year = None
@@ -248,7 +453,19 @@ class WikipediaClient:
             death_year = int(match.group(1))
         
         # Pattern 4: Look in categories for birth/death years
-        categories = list(page.categories.keys())
+        cat_birth, cat_death = self._years_from_categories(page.categories)
+        birth_year = cat_birth or birth_year
+        death_year = cat_death or death_year
+        
+        return birth_year, death_year
+
+    @staticmethod
+    def _years_from_categories(categories: list) -> tuple[Optional[int], Optional[int]]:
+        """Birth/death years from "1879 births" / "1955 deaths" categories."""
+        import re
+
+        birth_year = None
+        death_year = None
         for cat in categories:
             cat_lower = cat.lower()
             